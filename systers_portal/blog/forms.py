@@ -1,7 +1,6 @@
 from common.forms import ModelFormWithHelper
 from common.helpers import SubmitCancelFormHelper
 from blog.models import News, Resource, Tag, ResourceType
-from users.models import SystersUser
 
 
 class AddNewsForm(ModelFormWithHelper):
@@ -27,7 +26,7 @@ class AddNewsForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add author and community to the instance."""
         instance = super(AddNewsForm, self).save(commit=False)
-        instance.author = SystersUser.objects.get(user=self.author)
+        instance.author = self.author.systersuser
         instance.community = self.community
         if commit:
             instance.save()
@@ -68,7 +67,7 @@ class AddResourceForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add author and community to the instance."""
         instance = super(AddResourceForm, self).save(commit=False)
-        instance.author = SystersUser.objects.get(user=self.author)
+        instance.author = self.author.systersuser
         instance.community = self.community
         if commit:
             instance.save()
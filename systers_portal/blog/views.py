@@ -7,6 +7,8 @@ from django.views.generic.detail import SingleObjectMixin
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 
 from common.mixins import UserDetailsMixin
+from common.middleware import get_cached_object_or_404
+from common.permissions import has_perm
 from community.mixins import CommunityMenuMixin
 from community.models import Community
 from blog.forms import (AddNewsForm, EditNewsForm, AddResourceForm,
@@ -14,7 +16,6 @@ from blog.forms import (AddNewsForm, EditNewsForm, AddResourceForm,
 from blog.mixins import ResourceTypesMixin
 from blog.models import News, Resource, ResourceType, Tag
 
-from users.models import SystersUser
 
 from blog.models import UserPins
 
@@ -113,8 +114,8 @@ class AddCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("add_community_news", self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "add_community_news", self.community)
 
 
 class EditCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -144,8 +145,8 @@ class EditCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("change_community_news", self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "change_community_news", self.community)
 
 
 class DeleteCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -175,8 +176,8 @@ class DeleteCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("delete_community_news", self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "delete_community_news", self.community)
 
 
 class CommunityResourceListView(UserDetailsMixin, CommunityMenuMixin,
@@ -233,7 +234,7 @@ class CommunityResourceView(UserDetailsMixin, CommunityMenuMixin, DetailView):
         context["community"] = self.object
         resource_slug = self.kwargs['resource_slug']
         if self.request.user.is_authenticated:
-            user = SystersUser.objects.get(user=self.request.user)
+            user = self.request.systers_user
             user_pins = UserPins.objects.filter(user=user)
             if user_pins:
                 context['pins'] = user_pins.first().pins.all()
@@ -292,8 +293,8 @@ class AddCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         resource. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("add_community_resource", self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "add_community_resource", self.community)
 
 
 class EditCommunityResourcesView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -324,9 +325,8 @@ class EditCommunityResourcesView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("change_community_resource",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "change_community_resource", self.community)
 
 
 class DeleteCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -356,9 +356,8 @@ class DeleteCommunityResourceView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         resource. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("delete_community_resource",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "delete_community_resource", self.community)
 
 
 class AddTagView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -380,8 +379,8 @@ class AddTagView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         """Add Community object to the context"""
         context = super(AddTagView, self).get_context_data(**kwargs)
-        context['community'] = get_object_or_404(Community,
-                                                 slug=self.kwargs['slug'])
+        context['community'] = get_cached_object_or_404(self.request, Community,
+                                                        slug=self.kwargs['slug'])
         context['tag_type'] = "tag"
         return context
 
@@ -406,8 +405,8 @@ class AddResourceTypeView(LoginRequiredMixin, PermissionRequiredMixin,
     def get_context_data(self, **kwargs):
         """Add Community object to the context"""
         context = super(AddResourceTypeView, self).get_context_data(**kwargs)
-        context['community'] = get_object_or_404(Community,
-                                                 slug=self.kwargs['slug'])
+        context['community'] = get_cached_object_or_404(self.request, Community,
+                                                        slug=self.kwargs['slug'])
         context['tag_type'] = "Resource Type"
         return context
 
@@ -418,10 +417,10 @@ class UserPinView(LoginRequiredMixin, ListView):
 
     def post(self, request, resource_slug, slug):
         if request.method == "POST":
-            community = get_object_or_404(Community, slug=slug)
+            community = get_cached_object_or_404(self.request, Community, slug=slug)
             resource = get_object_or_404(Resource, community=community,
                                          slug=resource_slug)
-            user = SystersUser.objects.get(user=self.request.user)
+            user = self.request.systers_user
             user_pins = UserPins.objects.filter(user=user)
             if user_pins:
                 user_pins.first().add_pin(resource)
@@ -438,10 +437,10 @@ class RemovePinView(LoginRequiredMixin, ListView):
     def post(self, request, resource_slug, slug):
         if request.method == "POST":
             status_code = 200
-            community = get_object_or_404(Community, slug=slug)
+            community = get_cached_object_or_404(self.request, Community, slug=slug)
             resource = get_object_or_404(Resource, community=community,
                                          slug=resource_slug)
-            user = SystersUser.objects.get(user=self.request.user)
+            user = self.request.systers_user
             user_pins = UserPins.objects.filter(user=user)
             if resource in user_pins.first().pins.all():
                 user_pins.first().remove_pin(resource)
@@ -456,7 +455,7 @@ class RemovePinFromListView(LoginRequiredMixin, TemplateView):
     def post(self, request, username):
         if request.method == "POST":
             status_code = 200
-            user = SystersUser.objects.get(user=self.request.user)
+            user = self.request.systers_user
             user_pins = UserPins.objects.filter(user=user)
             resource = get_object_or_404(Resource, id=request.POST.get('id'))
             if resource in user_pins.first().pins.all():
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from common.models import Comment
+from common.models import Comment, OutgoingEmail
 
 
 admin.site.register(Comment)
+admin.site.register(OutgoingEmail)
@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+from common.permissions import get_permission_checker
+
+
+def permissions_processor(request):
+    """Custom template context preprocessor that injects the object permission
+    checker of the request, so that templates reuse the permissions the view
+    already loaded. Pass it to guardian's get_obj_perms tag as perm_checker."""
+    return {'perm_checker': SimpleLazyObject(lambda: get_permission_checker(request))}
@@ -0,0 +1,89 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from common.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def claim_emails(limit):
+    """Claim due emails of the outbox for this worker. Claimed emails are not due again for
+    EMAIL_OUTBOX_CLAIM_TIMEOUT seconds, so that concurrent workers skip them and emails claimed
+    by a worker which died are retried.
+
+    :param limit: integer maximum number of emails to claim
+    :return: list of OutgoingEmail objects
+    """
+    with transaction.atomic():
+        emails = list(OutgoingEmail.objects.due().select_for_update(skip_locked=True)
+                      .order_by('send_after', 'pk')[:limit])
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            send_after=timezone.now() + timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT))
+    return emails
+
+
+def send_outbox(limit=None, rate=None):
+    """Send due emails of the outbox over a single connection, at most rate emails per second.
+    An email which fails is retried with exponential backoff, starting after
+    EMAIL_OUTBOX_RETRY_DELAY seconds, until it has been tried EMAIL_OUTBOX_MAX_ATTEMPTS times.
+
+    :param limit: integer maximum number of emails to send, defaults to EMAIL_BATCH_SIZE
+    :param rate: float maximum number of emails per second, defaults to EMAIL_OUTBOX_RATE
+    :return: tuple of the numbers of sent and failed emails
+    """
+    emails = claim_emails(limit or settings.EMAIL_BATCH_SIZE)
+    rate = settings.EMAIL_OUTBOX_RATE if rate is None else rate
+    sent = failed = 0
+    if not emails:
+        return sent, failed
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in emails:
+            started = time.monotonic()
+            try:
+                connection.send_messages([email.to_message(connection)])
+            except Exception as error:
+                email.attempts += 1
+                email.last_error = repr(error)
+                email.send_after = timezone.now() + timedelta(
+                    seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1))
+                email.save(update_fields=['attempts', 'last_error', 'send_after'])
+                logger.warning("Failed to send email %d: %r", email.pk, error)
+                failed += 1
+                # Start over with a fresh connection, the server may have dropped this one
+                connection.close()
+                connection.open()
+            else:
+                email.attempts += 1
+                email.date_sent = timezone.now()
+                email.save(update_fields=['attempts', 'date_sent'])
+                sent += 1
+            if rate:
+                time.sleep(max(0, 1 / rate - (time.monotonic() - started)))
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def drain_outbox(batch_size=None, rate=None):
+    """Send due emails of the outbox batch_size at a time until none is left. Emails which
+    fail are not due again within the same run, since they are retried after a delay.
+
+    :param batch_size: integer number of emails claimed at a time, defaults to EMAIL_BATCH_SIZE
+    :param rate: float maximum number of emails per second, defaults to EMAIL_OUTBOX_RATE
+    :return: tuple of the numbers of sent and failed emails
+    """
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_outbox(batch_size, rate)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Started in a fresh interpreter, so that nothing is imported yet
+STARTUP_SCRIPT = """
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+
+class Command(BaseCommand):
+    help = "Report the time it takes to import each app and library when a worker starts, " \
+           "i.e. to set up Django and load the URLconf."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20,
+                            help="Number of packages to report, slowest first.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True)
+        if process.returncode != 0:
+            raise CommandError(process.stderr.strip().splitlines()[-1])
+
+        timings = self.parse(process.stderr)
+        if not timings:
+            raise CommandError("Import times are only reported by Python 3.7 and newer.")
+        app_packages = {app_config.name.split('.')[0] for app_config in apps.get_app_configs()}
+        total = sum(timings.values())
+        self.stdout.write("{0:<30} {1:>10} {2:>7}".format("package", "time (ms)", "share"))
+        for package, time in sorted(timings.items(), key=lambda item: -item[1])[
+                :options['limit']]:
+            name = package + (" (app)" if package in app_packages else "")
+            self.stdout.write("{0:<30} {1:>10.1f} {2:>6.1f}%".format(
+                name, time / 1000, 100 * time / total))
+        self.stdout.write("{0:<30} {1:>10.1f}".format("total", total / 1000))
+
+    @staticmethod
+    def parse(output):
+        """Sum up the self import time of all modules of each top level package
+
+        :param output: string output of `python -X importtime`
+        :return: dict of package name and import time in microseconds
+        """
+        timings = defaultdict(int)
+        for line in output.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            self_time, cumulative, module = line[len('import time:'):].split('|')
+            if not self_time.strip().isdigit():
+                continue
+            timings[module.strip().split('.')[0]] += int(self_time)
+        return timings
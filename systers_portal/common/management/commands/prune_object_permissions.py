@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from common.permissions import prune_object_permissions
+
+
+class Command(BaseCommand):
+    help = "Delete the object permissions of objects which no longer exist."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of objects checked at a time.")
+
+    def handle(self, *args, **options):
+        pruned = prune_object_permissions(options['batch_size'])
+        self.stdout.write("Deleted {0} orphaned object permissions.".format(pruned))
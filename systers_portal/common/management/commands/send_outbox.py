@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.mail import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Send the emails waiting in the outbox. Runs until it is stopped, unless --once " \
+           "is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no email is due instead of waiting for more.")
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_BATCH_SIZE,
+                            help="Number of emails claimed at a time.")
+        parser.add_argument('--rate', type=float, default=settings.EMAIL_OUTBOX_RATE,
+                            help="Maximum number of emails sent per second, 0 for no limit.")
+        parser.add_argument('--interval', type=float,
+                            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+                            help="Seconds to wait for new emails when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            try:
+                sent, failed = drain_outbox(options['batch_size'], options['rate'])
+            except Exception as error:
+                # The mail server may be unreachable; the claimed emails are retried later
+                if options['once']:
+                    raise
+                self.stderr.write("Failed to send emails: {0!r}".format(error))
+                time.sleep(options['interval'])
+                continue
+            total_sent += sent
+            total_failed += failed
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write("Sent {0} emails, {1} failed.".format(total_sent, total_failed))
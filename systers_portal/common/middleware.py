@@ -0,0 +1,32 @@
+from django.shortcuts import get_object_or_404
+
+
+class IdentityMapMiddleware:
+    """Give every request an identity map, so that the objects looked up with
+    get_cached_object_or_404 are fetched once per request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity_map = {}
+        return self.get_response(request)
+
+
+def get_cached_object_or_404(request, klass, **kwargs):
+    """Get an object like get_object_or_404, reusing the object already fetched with the same
+    lookup during the request
+
+    :param request: HttpRequest object
+    :param klass: Model class
+    :param kwargs: lookup of the object, e.g. slug
+    :return: object of klass
+    :raises Http404: if no object matches the lookup
+    """
+    identity_map = getattr(request, 'identity_map', None)
+    if identity_map is None:
+        identity_map = request.identity_map = {}
+    key = (klass, tuple(sorted(kwargs.items())))
+    if key not in identity_map:
+        identity_map[key] = get_object_or_404(klass, **kwargs)
+    return identity_map[key]
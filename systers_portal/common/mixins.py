@@ -1,7 +1,5 @@
 from django.core.exceptions import ImproperlyConfigured
 
-from users.models import SystersUser
-
 
 class UserDetailsMixin(object):
     """Mixin allows to add to the context information about the request user:
@@ -16,7 +14,7 @@ class UserDetailsMixin(object):
         user = self.request.user
         if user.username:
             community = self.get_community()
-            systers_user = SystersUser.objects.get(user=user)
+            systers_user = user.systersuser
             context['is_member'] = systers_user.is_member(community)
             context['join_request'] = systers_user.get_last_join_request(
                 community)
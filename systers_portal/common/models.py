@@ -1,11 +1,73 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
+from django.db.models import Q
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from ckeditor.fields import RichTextField
 
 from users.models import SystersUser
 
 
+class ChangeTrackingMixin(object):
+    """Mixin for models which remembers the values of their tracked_fields as the instance was
+    loaded or created, so that changes can be detected without querying the database. Foreign
+    keys are tracked by their raw id, so the related objects are not fetched."""
+    tracked_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super(ChangeTrackingMixin, self).__init__(*args, **kwargs)
+        self.snapshot()
+
+    def snapshot(self):
+        """Take the current values of the tracked fields as their original values"""
+        self._original_values = {}
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            # Deferred fields are missing from the instance dict until they are loaded
+            if attname in self.__dict__:
+                self._original_values[attname] = self.__dict__[attname]
+
+    def save(self, *args, **kwargs):
+        """Override save to take the saved values as the original values, so that a second save
+        of the instance does not see the same changes again"""
+        super(ChangeTrackingMixin, self).save(*args, **kwargs)
+        self.snapshot()
+
+    def refresh_from_db(self, using=None, fields=None):
+        """Override refresh_from_db to take the reloaded values as the original values"""
+        super(ChangeTrackingMixin, self).refresh_from_db(using=using, fields=fields)
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            if fields is not None and name not in fields and attname not in fields:
+                continue
+            if attname in self.__dict__:
+                self._original_values[attname] = self.__dict__[attname]
+
+    def get_original(self, name):
+        """Get the original value of a tracked field
+
+        :param name: string name of the field
+        :return: value of the field, the id for a foreign key
+        """
+        return self._original_values.get(self._meta.get_field(name).attname)
+
+    def has_changed(self, name):
+        """Check whether a tracked field was assigned a different value
+
+        :param name: string name of the field
+        :return: True if the field changed, False otherwise
+        """
+        attname = self._meta.get_field(name).attname
+        if attname not in self._original_values:
+            # A deferred field which was assigned or loaded may have changed
+            return attname in self.__dict__
+        return self.__dict__.get(attname) != self._original_values[attname]
+
+
 class Post(models.Model):
     """Abstract base class for postings like news and resources.
     This class can't be used in isolation.
@@ -37,3 +99,88 @@ class Comment(models.Model):
 
     def __str__(self):
         return "Comment by {0} to {1}".format(self.author, self.content_object)
+
+
+class OutgoingEmailManager(models.Manager):
+    def enqueue(self, messages, keys=None):
+        """Add emails to the outbox. An email whose deduplication key is already in the outbox
+        is skipped, so that producers can safely enqueue the same notification again.
+
+        :param messages: list of EmailMessage objects
+        :param keys: list of string deduplication keys of the messages, or None
+        :return: list of OutgoingEmail objects
+        """
+        keys = keys or [None] * len(messages)
+        emails = [self.model.from_message(message, key) for message, key in zip(messages, keys)]
+        return self.bulk_create(emails, batch_size=settings.EMAIL_BATCH_SIZE,
+                                ignore_conflicts=True)
+
+    def due(self):
+        """Filter the emails which were not sent yet and are due to be (re)tried"""
+        return self.filter(date_sent__isnull=True, send_after__lte=timezone.now(),
+                           attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+
+    def prune(self, now=None):
+        """Delete the emails which were sent, or given up on, more than EMAIL_OUTBOX_RETENTION
+        seconds ago. Their deduplication keys are released with them.
+
+        :param now: aware datetime object, defaults to the current time
+        :return: integer number of deleted emails
+        """
+        expiry = (now or timezone.now()) - timedelta(seconds=settings.EMAIL_OUTBOX_RETENTION)
+        deleted, _ = self.filter(
+            Q(date_sent__lt=expiry) | Q(date_sent__isnull=True, date_created__lt=expiry,
+                                        attempts__gte=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        ).delete()
+        return deleted
+
+
+class OutgoingEmail(models.Model):
+    """Email waiting in the outbox to be sent by the send_outbox command"""
+    key = models.CharField(max_length=255, unique=True, null=True, blank=True,
+                           verbose_name="Deduplication key")
+    subject = models.TextField(verbose_name="Subject")
+    body = models.TextField(verbose_name="Body")
+    html_body = models.TextField(blank=True, verbose_name="HTML body")
+    from_email = models.CharField(max_length=255, blank=True, verbose_name="From")
+    to = models.TextField(verbose_name="To")
+    date_created = models.DateTimeField(auto_now_add=True, verbose_name="Date created")
+    send_after = models.DateTimeField(default=timezone.now, verbose_name="Send after")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Attempts")
+    last_error = models.TextField(blank=True, verbose_name="Last error")
+    date_sent = models.DateTimeField(null=True, blank=True, verbose_name="Date sent")
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_sent', 'send_after'], name='common_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return "{0} to {1}".format(self.subject, self.to)
+
+    @classmethod
+    def from_message(cls, message, key=None):
+        """Create an unsaved outbox email from an email message
+
+        :param message: EmailMessage object, optionally with an html alternative
+        :param key: string deduplication key
+        :return: OutgoingEmail object
+        """
+        html_body = next((content for content, mimetype in getattr(message, 'alternatives', [])
+                          if mimetype == 'text/html'), '')
+        return cls(key=key, subject=message.subject, body=message.body, html_body=html_body,
+                   from_email=message.from_email or '', to='\n'.join(message.to))
+
+    def to_message(self, connection=None):
+        """Build the email message to send
+
+        :param connection: email backend object to send the message with
+        :return: EmailMultiAlternatives object
+        """
+        message = EmailMultiAlternatives(self.subject, self.body, self.from_email or None,
+                                         self.to.splitlines(), connection=connection)
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
@@ -0,0 +1,135 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from guardian.core import ObjectPermissionChecker
+from guardian.models import GroupObjectPermission, UserObjectPermission
+
+
+def get_permission_checker(request):
+    """Get the object permission checker of the request user. It is created once per request
+    and caches the permissions of every object it looked at, so that views and templates
+    checking permissions on the same objects don't query them again.
+
+    :param request: HttpRequest object
+    :return: guardian ObjectPermissionChecker object
+    """
+    checker = getattr(request, 'permission_checker', None)
+    if checker is None:
+        checker = request.permission_checker = ObjectPermissionChecker(request.user)
+        request.permission_objects = set()
+    return checker
+
+
+def get_object_key(obj):
+    """Get the key of an object in the set of objects whose permissions were loaded
+
+    :param obj: model object
+    :return: tuple of the integer content type id and the string primary key
+    """
+    return ContentType.objects.get_for_model(obj).pk, str(obj.pk)
+
+
+def prefetch_permissions(request, objects):
+    """Load the permissions of the request user on several objects of the same model at once.
+    The objects whose permissions were already loaded for the request are skipped.
+
+    :param request: HttpRequest object
+    :param objects: list of model objects
+    """
+    user = request.user
+    if not objects or not user.is_active or user.is_superuser:
+        return
+    checker = get_permission_checker(request)
+    missing = {}
+    for obj in objects:
+        key = get_object_key(obj)
+        if key not in request.permission_objects:
+            missing[key] = obj
+    if missing:
+        checker.prefetch_perms(list(missing.values()))
+        request.permission_objects.update(missing)
+
+
+def has_perm(request, perm, obj):
+    """Check if the request user has a permission on an object
+
+    :param request: HttpRequest object
+    :param perm: string codename of the permission
+    :param obj: model object
+    :return: True if the user has the permission, False otherwise
+    """
+    checker = get_permission_checker(request)
+    request.permission_objects.add(get_object_key(obj))
+    return checker.has_perm(perm, obj)
+
+
+def has_perms(request, perms, obj):
+    """Check if the request user has all permissions of a list on an object
+
+    :param request: HttpRequest object
+    :param perms: list of permission codenames
+    :param obj: model object
+    :return: True if the user has all the permissions, False otherwise
+    """
+    checker = get_permission_checker(request)
+    request.permission_objects.add(get_object_key(obj))
+    return all(checker.has_perm(perm, obj) for perm in perms)
+
+
+def has_perm_on_any(request, perm, objects):
+    """Check if the request user has a permission on at least one of several objects of the
+    same model. The permissions on all of them are loaded at once.
+
+    :param request: HttpRequest object
+    :param perm: string codename of the permission
+    :param objects: list of model objects
+    :return: True if the user has the permission on any object, False otherwise
+    """
+    prefetch_permissions(request, objects)
+    checker = get_permission_checker(request)
+    return any(checker.has_perm(perm, obj) for obj in objects)
+
+
+def prune_object_permissions(batch_size=1000):
+    """Delete the rows of the generic guardian permission tables which refer to objects that
+    no longer exist. The objects are checked batch_size at a time, one query per batch.
+
+    :param batch_size: integer number of object ids checked at a time
+    :return: integer number of deleted permissions
+    """
+    pruned = 0
+    for permission_model in (UserObjectPermission, GroupObjectPermission):
+        permissions = permission_model.objects.all()
+        content_type_ids = permissions.values_list('content_type', flat=True).distinct()
+        for content_type_id in list(content_type_ids):
+            content_type = ContentType.objects.get_for_id(content_type_id)
+            model = content_type.model_class()
+            rows = permissions.filter(content_type=content_type)
+            if model is None:
+                # The model was removed, so none of its objects exist
+                pruned += rows.delete()[0]
+                continue
+            object_pks = list(rows.values_list('object_pk', flat=True).distinct())
+            for start in range(0, len(object_pks), batch_size):
+                batch = object_pks[start:start + batch_size]
+                existing = set(str(pk) for pk in model._default_manager.filter(
+                    pk__in=get_valid_pks(model, batch)).values_list('pk', flat=True))
+                orphans = [pk for pk in batch if pk not in existing]
+                if orphans:
+                    pruned += rows.filter(object_pk__in=orphans).delete()[0]
+    return pruned
+
+
+def get_valid_pks(model, object_pks):
+    """Filter out the object ids which are not valid primary keys of a model
+
+    :param model: Model class
+    :param object_pks: list of string object ids
+    :return: list of primary keys
+    """
+    pks = []
+    for object_pk in object_pks:
+        try:
+            pks.append(model._meta.pk.to_python(object_pk))
+        except ValidationError:
+            pass
+    return pks
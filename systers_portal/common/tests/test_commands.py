@@ -0,0 +1,96 @@
+import sys
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import Group, User
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import assign_perm
+
+from common.management.commands.importtime import Command
+from common.models import OutgoingEmail
+
+
+class ImportTimeCommandTestCase(SimpleTestCase):
+    def test_parse(self):
+        """Test that import times are summed up per top level package"""
+        output = "import time: self [us] | cumulative | imported package\n" \
+                 "import time:       100 |        100 |   meetup.models\n" \
+                 "import time:        20 |        120 | meetup\n" \
+                 "import time:        30 |         30 | gensim\n"
+        self.assertEqual(Command.parse(output), {'meetup': 120, 'gensim': 30})
+
+    @skipIf(sys.version_info < (3, 7), "python -X importtime requires Python 3.7")
+    def test_importtime(self):
+        """Test that the import time of apps is reported"""
+        out = StringIO()
+        call_command('importtime', limit=100, stdout=out)
+        self.assertIn('meetup (app)', out.getvalue())
+        self.assertNotIn('gensim', out.getvalue())
+
+
+class SendOutboxCommandTestCase(TestCase):
+    def setUp(self):
+        OutgoingEmail.objects.enqueue([EmailMessage('Foo {0}'.format(i), 'Bar', 'foo@test.com',
+                                                    ['bar@test.com']) for i in range(3)])
+
+    def test_send_outbox(self):
+        """Test that the queued emails are sent and marked as sent"""
+        out = StringIO()
+        call_command('send_outbox', once=True, rate=0, batch_size=2, stdout=out)
+        self.assertIn("Sent 3 emails, 0 failed.", out.getvalue())
+        self.assertEqual([email.subject for email in mail.outbox], ['Foo 0', 'Foo 1', 'Foo 2'])
+        self.assertFalse(OutgoingEmail.objects.due().exists())
+
+        call_command('send_outbox', once=True, rate=0, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_send_outbox_retry(self):
+        """Test that emails which failed to send are retried after a delay"""
+        send_messages = EmailBackend.send_messages
+
+        def flaky_send_messages(backend, messages):
+            if messages[0].subject == 'Foo 1':
+                raise ConnectionError()
+            return send_messages(backend, messages)
+
+        out = StringIO()
+        with mock.patch.object(EmailBackend, 'send_messages', flaky_send_messages):
+            call_command('send_outbox', once=True, rate=0, stdout=out)
+        self.assertIn("Sent 2 emails, 1 failed.", out.getvalue())
+        failed = OutgoingEmail.objects.get(subject='Foo 1')
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('ConnectionError', failed.last_error)
+        self.assertIsNone(failed.date_sent)
+        self.assertGreater(failed.send_after, timezone.now())
+
+        OutgoingEmail.objects.filter(pk=failed.pk).update(send_after=timezone.now())
+        call_command('send_outbox', once=True, rate=0, stdout=StringIO())
+        self.assertEqual([email.subject for email in mail.outbox], ['Foo 0', 'Foo 2', 'Foo 1'])
+
+
+class PruneObjectPermissionsCommandTestCase(TestCase):
+    def test_prune_object_permissions(self):
+        """Test that the permissions on deleted objects are deleted"""
+        user = User.objects.create_user(username='foo', password='foobar')
+        groups = [Group.objects.create(name=name) for name in ("Foo", "Bar", "Baz")]
+        for group in groups:
+            assign_perm('auth.change_group', user, group)
+        # bulk_create skips save(), which would look up the object
+        UserObjectPermission.objects.bulk_create([UserObjectPermission(
+            user=user, permission=UserObjectPermission.objects.first().permission,
+            content_type=ContentType.objects.get_for_model(Group), object_pk='foo')])
+        groups[0].delete()
+
+        out = StringIO()
+        call_command('prune_object_permissions', batch_size=1, stdout=out)
+        self.assertIn("Deleted 2 orphaned object permissions.", out.getvalue())
+        self.assertCountEqual(
+            UserObjectPermission.objects.values_list('object_pk', flat=True),
+            [str(groups[1].pk), str(groups[2].pk)])
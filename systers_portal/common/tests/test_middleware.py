@@ -0,0 +1,90 @@
+from collections import Counter
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from common.middleware import get_cached_object_or_404
+from common.models import Comment
+from community.models import Community
+from meetup.models import Meetup, RequestMeetup
+from users.models import SystersUser
+
+
+class IdentityMapTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+
+    def test_get_cached_object_or_404(self):
+        """Test that an object is fetched once per request"""
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(1):
+            systers_user = get_cached_object_or_404(request, SystersUser, user=self.user)
+            self.assertIs(get_cached_object_or_404(request, SystersUser, user=self.user),
+                          systers_user)
+        self.assertEqual(systers_user, self.systers_user)
+        with self.assertRaises(Http404):
+            get_cached_object_or_404(request, SystersUser, pk=0)
+
+
+class RequestQueriesTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        self.user = User.objects.create_superuser(username='foo', email='foo@test.com',
+                                                  password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  location=location, admin=self.systers_user)
+        self.meetup = Meetup.objects.create(title='Foo Bar Baz', slug='foo-bar-baz',
+                                            date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            description='This is test Meetup',
+                                            meetup_location=location,
+                                            created_by=self.systers_user,
+                                            leader=self.systers_user)
+        self.comment = Comment.objects.create(
+            author=self.systers_user, body='Bar',
+            content_type=ContentType.objects.get(app_label='meetup', model='meetup'),
+            object_id=self.meetup.id)
+        self.client.login(username='foo', password='foobar')
+
+    def assertNoRepeatedLookups(self, url, status_code=200):
+        """Assert that a view looks up the request user's SystersUser and the objects in the
+        URL at most once"""
+        lookups = ('FROM "users_systersuser" WHERE "users_systersuser"."user_id" =',
+                   'FROM "meetup_meetup" WHERE "meetup_meetup"."slug" =',
+                   'FROM "community_community" WHERE "community_community"."slug" =')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status_code)
+        counts = Counter(query['sql'] for query in queries.captured_queries
+                         if any(lookup in query['sql'] for lookup in lookups))
+        for sql, count in counts.items():
+            self.assertEqual(count, 1, "{0} ran {1} times for {2}".format(sql, count, url))
+
+    def test_meetup_views(self):
+        """Test that the meetup views do not fetch the same rows twice"""
+        self.assertNoRepeatedLookups(reverse('view_meetup', kwargs={'slug': 'foo-bar-baz'}))
+        for name in ('edit_meetup', 'add_meetup_comment', 'rsvp_meetup'):
+            self.assertNoRepeatedLookups(reverse(name, kwargs={'meetup_slug': 'foo-bar-baz'}))
+        self.assertNoRepeatedLookups(reverse('edit_meetup_comment', kwargs={
+            'meetup_slug': 'foo-bar-baz', 'comment_pk': self.comment.pk}))
+        RequestMeetup.objects.create(title='Bar', slug='bar', date=timezone.now().date(),
+                                     time=timezone.now().time(), description='Bar',
+                                     created_by=self.systers_user)
+        self.assertNoRepeatedLookups(
+            reverse('approve_meetup_request', kwargs={'meetup_slug': 'bar'}), 302)
+
+    def test_community_views(self):
+        """Test that the community views do not fetch the same rows twice"""
+        for name in ('view_community_profile', 'view_community_news_list',
+                     'add_community_news', 'community_users'):
+            self.assertNoRepeatedLookups(reverse(name, kwargs={'slug': 'foo'}))
@@ -1,10 +1,15 @@
+from datetime import timedelta
+
 from cities_light.models import Country, City
+from django.conf import settings
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
 
 from blog.models import News
-from common.models import Comment
+from common.models import Comment, OutgoingEmail
 from community.models import Community
 from users.models import SystersUser
 
@@ -32,3 +37,41 @@ class CommentModelTestCase(TestCase):
                                          content_type=related_object_type)
         self.assertEqual(str(comment),
                          "Comment by foo to Bar of Foo Community")
+
+
+class OutgoingEmailModelTestCase(TestCase):
+    def setUp(self):
+        self.message = EmailMultiAlternatives('Foo', 'Bar', 'foo@test.com', ['bar@test.com'])
+        self.message.attach_alternative('<p>Bar</p>', 'text/html')
+
+    def test_enqueue(self):
+        """Test that emails are queued once per deduplication key"""
+        OutgoingEmail.objects.enqueue([self.message, self.message], ['foo', None])
+        OutgoingEmail.objects.enqueue([self.message], ['foo'])
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+        self.assertEqual(OutgoingEmail.objects.due().count(), 2)
+
+    def test_prune(self):
+        """Test that only emails sent or given up on before the retention period are pruned"""
+        now = timezone.now()
+        expired = now - timedelta(seconds=settings.EMAIL_OUTBOX_RETENTION + 1)
+        OutgoingEmail.objects.enqueue([self.message] * 4, ['foo', 'bar', 'baz', 'qux'])
+        OutgoingEmail.objects.filter(key='foo').update(date_sent=expired)
+        OutgoingEmail.objects.filter(key='bar').update(date_sent=now)
+        OutgoingEmail.objects.filter(key='baz').update(
+            date_created=expired, attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        OutgoingEmail.objects.filter(key='qux').update(date_created=expired)
+        self.assertEqual(OutgoingEmail.objects.prune(now), 2)
+        self.assertCountEqual(OutgoingEmail.objects.values_list('key', flat=True),
+                              ['bar', 'qux'])
+        OutgoingEmail.objects.enqueue([self.message], ['foo'])
+        self.assertEqual(OutgoingEmail.objects.filter(key='foo').count(), 1)
+
+    def test_to_message(self):
+        """Test that a queued email is sent as it was enqueued"""
+        email = OutgoingEmail.from_message(self.message, 'foo')
+        self.assertEqual(str(email), 'Foo to bar@test.com')
+        message = email.to_message()
+        self.assertEqual((message.subject, message.body, message.from_email, message.to),
+                         ('Foo', 'Bar', 'foo@test.com', ['bar@test.com']))
+        self.assertEqual(message.alternatives, [('<p>Bar</p>', 'text/html')])
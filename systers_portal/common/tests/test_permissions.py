@@ -0,0 +1,105 @@
+from unittest import mock
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from guardian.core import ObjectPermissionChecker
+from guardian.models import GroupObjectPermission, UserObjectPermission
+from guardian.shortcuts import assign_perm
+
+from common.permissions import (get_permission_checker, has_perm, has_perm_on_any,
+                                has_perms, prefetch_permissions)
+from community.models import (Community, CommunityGroupObjectPermission,
+                              CommunityUserObjectPermission)
+from community.signals import manage_community_groups
+from users.models import SystersUser
+
+
+class PermissionsTestCase(TestCase):
+    def setUp(self):
+        post_save.connect(manage_community_groups, sender=Community,
+                          dispatch_uid="manage_groups")
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        admin = User.objects.create_user(username='bar', password='foobar')
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        self.communities = [
+            Community.objects.create(name=name, slug=name.lower(), order=order,
+                                     location=location, admin=admin.systersuser)
+            for order, name in enumerate(["Foo", "Bar", "Baz"])]
+        self.systers_user.join_group(
+            self.communities[1].get_group("user_content_manager"))
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+
+    def test_get_permission_checker(self):
+        """Test that the permission checker is shared by the request"""
+        checker = get_permission_checker(self.request)
+        self.assertIs(get_permission_checker(self.request), checker)
+
+    def test_has_perm(self):
+        """Test that the permissions on an object are loaded once per request"""
+        foo, bar, baz = self.communities
+        perms = ["add_community_systersuser", "change_community_systersuser",
+                 "delete_community_systersuser"]
+        self.assertTrue(has_perms(self.request, perms, bar))
+        with self.assertNumQueries(0):
+            self.assertTrue(has_perm(self.request, "change_community_systersuser", bar))
+            self.assertFalse(has_perm(self.request, "change_community", bar))
+        self.assertFalse(has_perms(self.request, perms, foo))
+
+    def test_has_perm_on_any(self):
+        """Test that the permissions on several objects are loaded at once"""
+        with self.assertNumQueries(2):
+            self.assertTrue(has_perm_on_any(self.request, "change_community_systersuser",
+                                            self.communities))
+        with self.assertNumQueries(0):
+            self.assertFalse(has_perm_on_any(self.request, "change_community",
+                                             self.communities))
+            self.assertFalse(has_perm(self.request, "change_community_systersuser",
+                                      self.communities[2]))
+        self.assertFalse(has_perm_on_any(self.request, "change_community_systersuser", []))
+
+    def test_prefetch_permissions(self):
+        """Test that the permissions loaded for a request are not loaded again"""
+        foo, bar, baz = self.communities
+        self.assertTrue(has_perm(self.request, "change_community_systersuser", bar))
+        with mock.patch.object(ObjectPermissionChecker, 'prefetch_perms') as prefetch_perms:
+            prefetch_permissions(self.request, self.communities)
+            prefetch_perms.assert_called_once_with([foo, baz])
+            prefetch_permissions(self.request, [foo, bar])
+            prefetch_perms.assert_called_once()
+
+    def test_user_profile_view(self):
+        """Test that the profile of a member can be edited by a user manager of any of their
+        communities"""
+        user = User.objects.create_user(username='baz', password='foobar')
+        for community in self.communities:
+            community.add_member(user.systersuser)
+        self.client.login(username='foo', password='foobar')
+        url = reverse('user_profile', kwargs={'username': 'baz'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        self.communities[1].remove_member(user.systersuser)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete_community(self):
+        """Test that the permissions on a community are stored in its own tables and deleted
+        along with it"""
+        foo, bar, baz = self.communities
+        assign_perm("change_community", self.user, bar)
+        assign_perm("change_community", self.user, baz)
+        self.assertTrue(self.user.has_perm("change_community", bar))
+        self.assertFalse(UserObjectPermission.objects.exists())
+        self.assertFalse(GroupObjectPermission.objects.exists())
+        bar.delete()
+        self.assertSequenceEqual(
+            CommunityUserObjectPermission.objects.values_list('content_object', flat=True),
+            [baz.pk])
+        self.assertFalse(CommunityGroupObjectPermission.objects.filter(
+            content_object_id=bar.pk).exists())
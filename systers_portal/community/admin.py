@@ -1,7 +1,7 @@
 from django.contrib import admin
 from guardian.admin import GuardedModelAdmin
 
-from community.models import Community, CommunityPage, RequestCommunity
+from community.models import Community, CommunityGroup, CommunityPage, RequestCommunity
 
 
 class CommunityAdmin(GuardedModelAdmin):
@@ -17,3 +17,4 @@ class CommunityAdmin(GuardedModelAdmin):
 admin.site.register(RequestCommunity)
 admin.site.register(Community, CommunityAdmin)
 admin.site.register(CommunityPage)
+admin.site.register(CommunityGroup)
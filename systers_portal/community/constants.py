@@ -3,6 +3,8 @@ CONTENT_CONTRIBUTOR = "{0}: Content Contributor"
 CONTENT_MANAGER = "{0}: Content Manager"
 USER_CONTENT_MANAGER = "{0}: User and Content Manager"
 COMMUNITY_ADMIN = "{0}: Community Admin"
+# key of the community admin group in community.permissions.groups_templates
+COMMUNITY_ADMIN_ROLE = "community_admin"
 
 # community
 DEFAULT_COMMUNITY_ACTIVE_PAGE = 'news'
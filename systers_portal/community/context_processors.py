@@ -1,9 +1,11 @@
-from community.models import Community
+from django.utils.functional import SimpleLazyObject
+
+from community.navigation import get_nav_communities
 
 
 def communities_processor(request):
     """Custom template context preprocessor that allows to inject into every
     request the list of all communities. This is necessary in order to display
-    the list of communities in the navigation bar."""
-    communities = Community.objects.all().order_by("order")
-    return {'communities': communities}
+    the list of communities in the navigation bar. The list is cached and only
+    loaded if a template uses it."""
+    return {'communities': SimpleLazyObject(get_nav_communities)}
@@ -1,13 +1,11 @@
 from django import forms
 from django.forms import ValidationError
-from django.contrib.auth.models import Group
 
 from common.forms import ModelFormWithHelper
 from common.helpers import SubmitCancelFormHelper
-from community.constants import COMMUNITY_ADMIN, COMMUNITY_PRESENCE_CHOICES
+from community.constants import COMMUNITY_ADMIN_ROLE, COMMUNITY_PRESENCE_CHOICES
 from community.models import Community, CommunityPage, RequestCommunity
 from community.utils import get_groups
-from users.models import SystersUser
 
 
 class AddCommunityForm(ModelFormWithHelper):
@@ -73,7 +71,7 @@ class RequestCommunityForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add user to the instance"""
         instance = super(RequestCommunityForm, self).save(commit=False)
-        instance.user = SystersUser.objects.get(user=self.user)
+        instance.user = self.user.systersuser
         if commit:
             instance.save()
         return instance
@@ -179,7 +177,7 @@ class AddCommunityPageForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add author and community to the instance"""
         instance = super(AddCommunityPageForm, self).save(commit=False)
-        instance.author = SystersUser.objects.get(user=self.author)
+        instance.author = self.author.systersuser
         instance.community = self.community
         if commit:
             instance.save()
@@ -207,29 +205,21 @@ class PermissionGroupsForm(forms.Form):
 
         # get all community groups and remove community admin group
         # from the list of choices
-        self.groups = list(get_groups(community.name))
-        admin_group = Group.objects.get(
-            name=COMMUNITY_ADMIN.format(community.name))
-        self.groups.remove(admin_group)
+        self.groups = list(get_groups(community).exclude(
+            community_roles__role=COMMUNITY_ADMIN_ROLE))
         choices = [(group.pk, group.name) for group in self.groups]
         self.fields['groups'] = forms. \
             MultipleChoiceField(choices=choices, label="", required=False,
                                 widget=forms.CheckboxSelectMultiple)
-        self.member_groups = self.user.get_member_groups(self.groups)
-        self.fields['groups'].initial = [group.pk for group in
-                                         self.member_groups]
+        self.member_group_ids = self.user.get_group_ids(self.groups)
+        self.fields['groups'].initial = [group.pk for group in self.groups
+                                         if group.pk in self.member_group_ids]
 
         self.helper = SubmitCancelFormHelper(
             self, cancel_href="{% url 'community_users' community.slug %}")
 
     def save(self):
         """Update the groups of which the user is member of"""
-        group_pks = [int(pk) for pk in self.cleaned_data['groups']]
-        for member_group in self.member_groups:
-            if member_group.pk not in group_pks:
-                self.user.leave_group(member_group)
-
-        for pk in group_pks:
-            group = Group.objects.get(pk=pk)
-            if not self.user.is_group_member(group.name):
-                self.user.join_group(group)
+        group_pks = {int(pk) for pk in self.cleaned_data['groups']}
+        self.user.update_groups(join=group_pks - self.member_group_ids,
+                                leave=self.member_group_ids - group_pks)
@@ -0,0 +1,53 @@
+# Generated by Django 3.0.9 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Group name templates by role, as in community.permissions.groups_templates
+GROUPS_TEMPLATES = {
+    'content_contributor': "{0}: Content Contributor",
+    'content_manager': "{0}: Content Manager",
+    'user_content_manager': "{0}: User and Content Manager",
+    'community_admin': "{0}: Community Admin",
+}
+
+
+def map_community_groups(apps, schema_editor):
+    """Map the existing communities to the groups named after them"""
+    Community = apps.get_model('community', 'Community')
+    CommunityGroup = apps.get_model('community', 'CommunityGroup')
+    Group = apps.get_model('auth', 'Group')
+    communities = list(Community.objects.only('pk', 'name'))
+    names = {}
+    for community in communities:
+        for role, group_name in GROUPS_TEMPLATES.items():
+            names[group_name.format(community.name)] = (community, role)
+    groups = Group.objects.filter(name__in=list(names)).only('pk', 'name')
+    CommunityGroup.objects.bulk_create(
+        [CommunityGroup(community=names[group.name][0], group=group, role=names[group.name][1])
+         for group in groups.iterator()],
+        batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('community', '0002_auto_20200724_2045'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityGroup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=50, verbose_name='Role')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='role_groups', to='community.Community', verbose_name='Community')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='community_roles', to='auth.Group', verbose_name='Group')),
+            ],
+            options={
+                'unique_together': {('community', 'role')},
+            },
+        ),
+        migrations.RunPython(map_community_groups, migrations.RunPython.noop),
+    ]
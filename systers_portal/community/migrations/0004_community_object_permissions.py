@@ -0,0 +1,95 @@
+# Generated by Django 3.0.9 on 2026-10-18 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Generic guardian permission models, the community models replacing them and their owner field
+PERMISSION_MODELS = [
+    ('UserObjectPermission', 'CommunityUserObjectPermission', 'user_id'),
+    ('GroupObjectPermission', 'CommunityGroupObjectPermission', 'group_id'),
+]
+
+
+def get_community_content_type(apps):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    return ContentType.objects.filter(app_label='community', model='community').first()
+
+
+def move_to_community_tables(apps, schema_editor):
+    """Move the object permissions on communities out of the generic guardian tables. The
+    permissions on communities which no longer exist are dropped."""
+    content_type = get_community_content_type(apps)
+    if content_type is None:
+        return
+    Community = apps.get_model('community', 'Community')
+    community_ids = {str(pk): pk for pk in Community.objects.values_list('pk', flat=True)}
+    for generic_name, model_name, owner in PERMISSION_MODELS:
+        GenericPermission = apps.get_model('guardian', generic_name)
+        CommunityPermission = apps.get_model('community', model_name)
+        rows = GenericPermission.objects.filter(content_type=content_type)
+        CommunityPermission.objects.bulk_create(
+            [CommunityPermission(permission_id=row['permission_id'],
+                                 content_object_id=community_ids[row['object_pk']],
+                                 **{owner: row[owner]})
+             for row in rows.values('permission_id', 'object_pk', owner).iterator()
+             if row['object_pk'] in community_ids],
+            batch_size=1000, ignore_conflicts=True)
+        rows.delete()
+
+
+def move_to_generic_tables(apps, schema_editor):
+    """Move the object permissions on communities back to the generic guardian tables"""
+    content_type = get_community_content_type(apps)
+    if content_type is None:
+        return
+    for generic_name, model_name, owner in PERMISSION_MODELS:
+        GenericPermission = apps.get_model('guardian', generic_name)
+        CommunityPermission = apps.get_model('community', model_name)
+        GenericPermission.objects.bulk_create(
+            [GenericPermission(permission_id=row['permission_id'], content_type=content_type,
+                               object_pk=str(row['content_object_id']), **{owner: row[owner]})
+             for row in CommunityPermission.objects.values(
+                 'permission_id', 'content_object_id', owner).iterator()],
+            batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0011_update_proxy_permissions'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('guardian', '0001_initial'),
+        ('community', '0003_communitygroup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityUserObjectPermission',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='community.Community')),
+                ('permission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='auth.Permission')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('user', 'permission', 'content_object')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CommunityGroupObjectPermission',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='community.Community')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='auth.Group')),
+                ('permission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='auth.Permission')),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('group', 'permission', 'content_object')},
+            },
+        ),
+        migrations.RunPython(move_to_community_tables, move_to_generic_tables),
+    ]
@@ -1,9 +1,10 @@
 from django.contrib.auth.models import Group
 from django.urls import reverse
 from django.db import models
+from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 
-from common.models import Post
-from community.constants import (COMMUNITY_ADMIN,
+from common.models import ChangeTrackingMixin, Post
+from community.constants import (COMMUNITY_ADMIN_ROLE,
                                  COMMUNITY_TYPES_CHOICES, COMMUNITY_CHANNEL_CHOICES,
                                  YES_NO_CHOICES)
 from membership.constants import NOT_MEMBER, OK
@@ -11,7 +12,7 @@ from users.models import SystersUser
 from cities_light.models import City
 
 
-class Community(models.Model):
+class Community(ChangeTrackingMixin, models.Model):
     """Model to represent Systers community or subcommunity"""
     name = models.CharField(max_length=255, verbose_name="Name")
     slug = models.SlugField(max_length=150, unique=True, verbose_name="Slug")
@@ -36,8 +37,7 @@ class Community(models.Model):
                                  verbose_name="Google+")
     twitter = models.URLField(max_length=255, blank=True,
                               verbose_name="Twitter")
-    __original_name = None
-    __original_admin = None
+    tracked_fields = ('name', 'admin')
 
     class Meta:
         verbose_name_plural = "Communities"
@@ -63,19 +63,14 @@ class Community(models.Model):
     def __str__(self):
         return self.name
 
-    def __init__(self, *args, **kwargs):
-        super(Community, self).__init__(*args, **kwargs)
-        self.__original_name = self.name
-        if self.admin_id is not None:
-            self.__original_admin = self.admin
-
     @property
     def original_name(self):
-        return self.__original_name
+        return self.get_original('name')
 
     @property
     def original_admin(self):
-        return self.__original_admin
+        admin_id = self.get_original('admin')
+        return SystersUser.objects.get(pk=admin_id) if admin_id is not None else None
 
     def get_absolute_url(self):
         """Absolute url to a Community main page"""
@@ -86,14 +81,14 @@ class Community(models.Model):
 
         :return: True if community changed name, False otherwise
         """
-        return self.name != self.original_name
+        return self.has_changed('name')
 
     def has_changed_admin(self):
         """Check if community has a new admin
 
         :return: True if community changed admin, False otherwise
         """
-        return self.admin != self.original_admin
+        return self.has_changed('admin')
 
     def add_member(self, systers_user):
         """Add community member
@@ -118,8 +113,18 @@ class Community(models.Model):
         return [(field.name, getattr(self, field.name)) for field in
                 Community._meta.fields]
 
+    def get_group(self, role):
+        """Get the group of the community members with a role
+
+        :param role: string key of the role in community.permissions.groups_templates
+        :return: Group object
+        """
+        return Group.objects.get(community_roles__community=self,
+                                 community_roles__role=role)
+
     def set_new_admin(self, new_admin):
-        """Transfer the admin role from the old to the new admin
+        """Transfer the admin role from the old to the new admin. The admin
+        group is handed over by the post_save signal of the community.
 
         :param new_admin: SystersUser object new admin of the community
         :return: OK if setting was successful, NOT_MEMBER if settings was
@@ -128,14 +133,20 @@ class Community(models.Model):
         """
         if not new_admin.is_member(self):
             return NOT_MEMBER
-        name = COMMUNITY_ADMIN.format(self.name)
-        admin_group = Group.objects.get(name=name)
-        self.admin.leave_group(admin_group)
-        new_admin.join_group(admin_group)
         self.admin = new_admin
         self.save()
         return OK
 
+    def transfer_admin_group(self, old_admin, new_admin):
+        """Move the community admin group membership from one user to another
+
+        :param old_admin: SystersUser object previous admin of the community
+        :param new_admin: SystersUser object new admin of the community
+        """
+        admin_group = self.get_group(COMMUNITY_ADMIN_ROLE)
+        old_admin.update_groups(leave=[admin_group])
+        new_admin.update_groups(join=[admin_group])
+
 
 class RequestCommunity(models.Model):
     """Model to represent new community requests"""
@@ -236,3 +247,28 @@ class CommunityPage(Post):
 
     def __str__(self):
         return "Page {0} of {1}".format(self.title, self.community)
+
+
+class CommunityGroup(models.Model):
+    """Model to map a community to the group of its members with a role"""
+    community = models.ForeignKey(Community, related_name='role_groups',
+                                  verbose_name="Community", on_delete=models.CASCADE)
+    group = models.ForeignKey(Group, related_name='community_roles',
+                              verbose_name="Group", on_delete=models.CASCADE)
+    role = models.CharField(max_length=50, verbose_name="Role")
+
+    class Meta:
+        unique_together = ('community', 'role')
+
+    def __str__(self):
+        return "{0} group of {1}".format(self.role, self.community)
+
+
+class CommunityUserObjectPermission(UserObjectPermissionBase):
+    """Object permission of a user on a community, removed along with the community"""
+    content_object = models.ForeignKey(Community, on_delete=models.CASCADE)
+
+
+class CommunityGroupObjectPermission(GroupObjectPermissionBase):
+    """Object permission of a group on a community, removed along with the community"""
+    content_object = models.ForeignKey(Community, on_delete=models.CASCADE)
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from community.models import Community
+
+NAV_CACHE_KEY = 'community_nav'
+NAV_VERSION_KEY = 'community_nav_version'
+
+
+def get_nav_version():
+    """Get the current version of the cached navigation list. A missing version, e.g. after
+    the cache was cleared, is replaced by a new one, so that no stale list can be served.
+
+    :return: integer version
+    """
+    return cache.get_or_set(NAV_VERSION_KEY, lambda: int(time.time() * 1000), None)
+
+
+def get_nav_communities():
+    """Get the communities listed in the navigation bar, ordered by their order. The list is
+    cached until a community is saved or deleted.
+
+    :return: list of dicts with the slug, name, order and parent slug of a community
+    """
+    version = get_nav_version()
+    communities = cache.get(NAV_CACHE_KEY, version=version)
+    if communities is None:
+        communities = list(Community.objects.order_by('order').values(
+            'slug', 'name', 'order', parent=F('parent_community__slug')))
+        cache.set(NAV_CACHE_KEY, communities, settings.COMMUNITY_NAV_CACHE_TIMEOUT,
+                  version=version)
+    return communities
+
+
+def invalidate_nav_communities():
+    """Drop the cached navigation list by moving on to a new version"""
+    try:
+        cache.incr(NAV_VERSION_KEY)
+    except ValueError:
+        # No version is stored, so the next lookup starts a new one anyway
+        pass
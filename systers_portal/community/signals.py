@@ -1,11 +1,9 @@
-from django.contrib.auth.models import Group
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.shortcuts import get_object_or_404
 
-from community.constants import COMMUNITY_ADMIN
-from community.utils import (create_groups, assign_permissions, remove_groups,
-                             rename_groups)
+from community.constants import COMMUNITY_ADMIN_ROLE
+from community.navigation import invalidate_nav_communities
+from community.utils import create_groups, assign_permissions, remove_groups
 from community.permissions import (groups_templates, group_permissions)
 
 
@@ -13,33 +11,31 @@ from community.permissions import (groups_templates, group_permissions)
           dispatch_uid="manage_groups")
 def manage_community_groups(sender, instance, created, **kwargs):
     """Manage user groups and user permissions for a particular Community"""
-    name = instance.name
     if created:
-        groups = create_groups(name, groups_templates)
+        groups = create_groups(instance, groups_templates)
         assign_permissions(
             instance, groups, groups_templates, group_permissions)
-        community_admin_group = next(
-            g for g in groups if g.name == COMMUNITY_ADMIN.format(name))
-        instance.admin.join_group(community_admin_group)
+        instance.admin.join_group(groups[COMMUNITY_ADMIN_ROLE])
         instance.add_member(instance.admin)
         instance.save()
-    else:
-        if name != instance.original_name and instance.original_name:
-            rename_groups(instance.original_name, instance.name)
-        if instance.admin != instance.original_admin and \
-           instance.original_admin is not None:
-            community_admin_group = \
-                get_object_or_404(Group, name=COMMUNITY_ADMIN.format(name))
-            instance.original_admin.leave_group(
-                community_admin_group)
-            instance.admin.join_group(community_admin_group)
-            if instance.admin not in instance.members.all():
-                instance.add_member(instance.admin)
-                instance.save()
+    elif instance.has_changed_admin() and \
+            instance.get_original('admin') is not None:
+        instance.transfer_admin_group(instance.original_admin,
+                                      instance.admin)
+        if not instance.admin.is_member(instance):
+            instance.add_member(instance.admin)
 
 
-@receiver(post_delete, sender='community.Community',
+@receiver(pre_delete, sender='community.Community',
           dispatch_uid="remove_groups")
 def remove_community_groups(sender, instance, **kwargs):
-    """Remove user groups for a particular Community instance"""
-    remove_groups(instance.name)
+    """Remove user groups for a particular Community instance. This runs before
+    the deletion, while the groups are still mapped to the community."""
+    remove_groups(instance)
+
+
+@receiver(post_save, sender='community.Community', dispatch_uid="invalidate_nav")
+@receiver(post_delete, sender='community.Community', dispatch_uid="invalidate_nav")
+def invalidate_community_nav(sender, **kwargs):
+    """Drop the cached list of communities of the navigation bar"""
+    invalidate_nav_communities()
@@ -1,6 +1,8 @@
+from unittest import mock
+
 from cities_light.models import City, Country
 from django.contrib.auth.models import User, Group
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, pre_delete
 from django.test import TestCase
 
 from community.constants import COMMUNITY_ADMIN
@@ -43,8 +45,8 @@ class CommunityModelTestCase(TestCase):
     def setUp(self):
         post_save.disconnect(manage_community_groups, sender=Community,
                              dispatch_uid="manage_groups")
-        post_delete.disconnect(remove_community_groups, sender=Community,
-                               dispatch_uid="remove_groups")
+        pre_delete.disconnect(remove_community_groups, sender=Community,
+                              dispatch_uid="remove_groups")
         self.user = User.objects.create(username='foo', password='foobar')
         self.systers_user = SystersUser.objects.get(user=self.user)
         country = Country.objects.create(name='Bar', continent='AS')
@@ -66,17 +68,20 @@ class CommunityModelTestCase(TestCase):
         user = User.objects.create(username="bar", password="barfoo")
         systers_user2 = SystersUser.objects.get(user=user)
         self.community.admin = systers_user2
-        self.community.save()
         self.assertEqual(self.community.original_name, "Foo")
         self.assertEqual(self.community.original_admin,
                          self.systers_user)
+        self.community.save()
+        self.assertEqual(self.community.original_name, "Bar")
+        self.assertEqual(self.community.original_admin, systers_user2)
 
     def test_has_changed_name(self):
         """Test has_changed_name method of Community"""
         self.assertFalse(self.community.has_changed_name())
         self.community.name = "Bar"
-        self.community.save()
         self.assertTrue(self.community.has_changed_name())
+        self.community.save()
+        self.assertFalse(self.community.has_changed_name())
 
     def test_has_changed_admin(self):
         """Test has_changed_admin method of Community"""
@@ -84,8 +89,15 @@ class CommunityModelTestCase(TestCase):
         user = User.objects.create(username="bar", password="barfoo")
         systers_user2 = SystersUser.objects.get(user=user)
         self.community.admin = systers_user2
-        self.community.save()
         self.assertTrue(self.community.has_changed_admin())
+        self.community.save()
+        self.assertFalse(self.community.has_changed_admin())
+
+    def test_load_without_admin(self):
+        """Test that loading communities does not fetch their admins"""
+        with self.assertNumQueries(1):
+            community = Community.objects.get(pk=self.community.pk)
+            self.assertFalse(community.has_changed_admin())
 
     def test_add_remove_member(self):
         """Test adding and removing Community members"""
@@ -108,8 +120,8 @@ class CommunityModelTestCase(TestCase):
         """Test setting a new admin to a community"""
         post_save.connect(manage_community_groups, sender=Community,
                           dispatch_uid="manage_groups")
-        post_delete.connect(remove_community_groups, sender=Community,
-                            dispatch_uid="remove_groups")
+        pre_delete.connect(remove_community_groups, sender=Community,
+                           dispatch_uid="remove_groups")
         community = Community.objects.create(name="Bar", slug="bar",
                                              order=2, location=self.location,
                                              admin=self.systers_user)
@@ -128,6 +140,11 @@ class CommunityModelTestCase(TestCase):
                                  [admin_group])
         self.assertSequenceEqual(self.systers_user.user.groups.all(), [])
 
+        # Saving the community again does not hand over the admin group again
+        with mock.patch.object(Community, 'transfer_admin_group') as transfer_admin_group:
+            community.save()
+        transfer_admin_group.assert_not_called()
+
 
 class CommunityPageModelTestCase(TestCase):
     def setUp(self):
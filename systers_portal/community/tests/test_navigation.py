@@ -0,0 +1,55 @@
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from community.context_processors import communities_processor
+from community.models import Community
+from community.navigation import get_nav_communities
+from users.models import SystersUser
+
+
+class NavigationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Foo', display_name='Foo',
+                                            country=country)
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=2, location=self.location,
+                                                  admin=self.systers_user)
+
+    def test_get_nav_communities(self):
+        """Test that the navigation list is cached until a community changes"""
+        with self.assertNumQueries(1):
+            self.assertEqual(get_nav_communities(),
+                             [{'slug': 'foo', 'name': "Foo", 'order': 2, 'parent': None}])
+        with self.assertNumQueries(0):
+            get_nav_communities()
+
+        bar = Community.objects.create(name="Bar", slug="bar", order=1,
+                                       location=self.location, admin=self.systers_user,
+                                       parent_community=self.community)
+        self.assertEqual(get_nav_communities(),
+                         [{'slug': 'bar', 'name': "Bar", 'order': 1, 'parent': 'foo'},
+                          {'slug': 'foo', 'name': "Foo", 'order': 2, 'parent': None}])
+
+        self.community.name = "Baz"
+        self.community.save()
+        self.assertEqual([c['name'] for c in get_nav_communities()], ["Bar", "Baz"])
+
+        bar.delete()
+        self.assertEqual([c['slug'] for c in get_nav_communities()], ['foo'])
+
+    def test_communities_processor(self):
+        """Test that the context processor only loads the list when it is used"""
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(0):
+            context = communities_processor(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(context['communities']), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(communities_processor(request)['communities'][0]['slug'], 'foo')
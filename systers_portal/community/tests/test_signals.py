@@ -1,9 +1,9 @@
 from cities_light.models import City, Country
 from django.test import TestCase
 from django.contrib.auth.models import Group, User
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, pre_delete
 
-from community.constants import COMMUNITY_ADMIN
+from community.constants import COMMUNITY_ADMIN, COMMUNITY_ADMIN_ROLE
 from community.models import Community
 from community.signals import (manage_community_groups, remove_community_groups)
 from users.models import SystersUser
@@ -13,8 +13,8 @@ class SignalsTestCase(TestCase):
     def setUp(self):
         post_save.connect(manage_community_groups, sender=Community,
                           dispatch_uid="manage_groups")
-        post_delete.connect(remove_community_groups, sender=Community,
-                            dispatch_uid="remove_groups")
+        pre_delete.connect(remove_community_groups, sender=Community,
+                           dispatch_uid="remove_groups")
 
     def test_manage_community_groups(self):
         """Test handling of operations required when saving a Community
@@ -40,13 +40,11 @@ class SignalsTestCase(TestCase):
         community.name = "Bar"
         community.admin = systers_user2
         community.save()
-        removed_groups_count = Group.objects.filter(
-            name__startswith="Foo").count()
-        self.assertEqual(removed_groups_count, 0)
-        new_groups_count = Group.objects.filter(name__startswith="Bar").count()
-        self.assertEqual(new_groups_count, 4)
-        community_admin_group = Group.objects.get(
-            name=COMMUNITY_ADMIN.format("Bar"))
+        # The groups keep their names, they are found through the community
+        self.assertEqual(Group.objects.filter(name__startswith="Foo").count(), 4)
+        self.assertEqual(Group.objects.filter(name__startswith="Bar").count(), 0)
+        self.assertEqual(community.get_group(COMMUNITY_ADMIN_ROLE),
+                         community_admin_group)
         self.assertEqual(user2.groups.get(), community_admin_group)
         self.assertNotEqual(list(user1.groups.all()), [community_admin_group])
         self.assertCountEqual(Community.objects.get().members.all(),
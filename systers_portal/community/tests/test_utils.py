@@ -1,85 +1,115 @@
 from cities_light.models import Country, City
+from django.db import connection
+from django.db.models.signals import post_save
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Group, User
 from guardian.shortcuts import get_perms
 
 from community.models import Community
 from community.permissions import groups_templates, group_permissions
+from community.signals import manage_community_groups
 from community.utils import (
-    create_groups, assign_permissions, remove_groups, rename_groups, get_groups)
+    create_groups, assign_permissions, remove_groups, get_groups)
 from users.models import SystersUser
 
 
 class UtilsTestCase(TestCase):
+    def setUp(self):
+        post_save.disconnect(manage_community_groups, sender=Community,
+                             dispatch_uid="manage_groups")
+        self.addCleanup(post_save.connect, manage_community_groups,
+                        sender=Community, dispatch_uid="manage_groups")
+        self.user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Foo', display_name='Foo',
+                                            country=country)
+
+    def create_community(self, name, order=1):
+        return Community.objects.create(name=name, slug=name.lower(),
+                                        order=order, location=self.location,
+                                        admin=self.systers_user)
+
     def test_create_groups(self):
-        """Test the creation of groups according to a name"""
+        """Test the creation of the groups of a community"""
         name = "Foo"
-        groups = create_groups(name, groups_templates)
+        community = self.create_community(name)
+        groups = create_groups(community, groups_templates)
         expected_group_names = []
         for key, group_name in groups_templates.items():
             expected_group_names.append(group_name.format(name))
         group_names = []
-        for group in groups:
+        for group in groups.values():
             group_names.append(group.name)
         self.assertCountEqual(list(expected_group_names), group_names)
 
         community_groups = Group.objects.filter(name__startswith=name)
-        self.assertCountEqual(community_groups, groups)
+        self.assertCountEqual(community_groups, groups.values())
+        self.assertCountEqual(community.role_groups.values_list('role', flat=True),
+                              groups_templates.keys())
+        self.assertEqual(create_groups(community, groups_templates), groups)
+
+    def test_create_groups_same_name(self):
+        """Test that communities with the same name do not share groups"""
+        community = self.create_community("Foo")
+        groups = create_groups(community, groups_templates)
+        other_community = Community.objects.create(name="Foo", slug="foo-2", order=2,
+                                                   location=self.location,
+                                                   admin=self.systers_user)
+        other_groups = create_groups(other_community, groups_templates)
+        for key, group_name in groups_templates.items():
+            self.assertEqual(other_groups[key].name, "{0} ({1})".format(
+                group_name.format("Foo"), other_community.pk))
+        self.assertCountEqual(get_groups(other_community), other_groups.values())
+        remove_groups(other_community)
+        self.assertCountEqual(get_groups(community), groups.values())
 
     def test_remove_groups(self):
-        """Test the removal of groups according to a name"""
-        name = "Foo"
-        create_groups(name, groups_templates)
-        remove_groups(name)
-        community_groups = Group.objects.filter(name__startswith=name)
+        """Test the removal of the groups of a community"""
+        community = self.create_community("Foo")
+        create_groups(community, groups_templates)
+        remove_groups(community)
+        community_groups = Group.objects.filter(name__startswith="Foo")
         self.assertEqual(list(community_groups), [])
 
     def test_get_groups(self):
-        """Test getting groups according to community name"""
-        groups = get_groups("Foo")
+        """Test getting the groups of a community"""
+        community = self.create_community("Bar")
+        groups = get_groups(community)
         self.assertSequenceEqual(groups, [])
-        name = "Bar"
-        create_groups(name, groups_templates)
+        create_groups(community, groups_templates)
         community_groups = Group.objects.all()
-        groups = get_groups("Bar")
+        groups = get_groups(community)
         self.assertCountEqual(community_groups, groups)
-        create_groups("New", groups_templates)
-        groups = get_groups("Bar")
+        create_groups(self.create_community("New", order=2), groups_templates)
+        groups = get_groups(community)
         self.assertCountEqual(community_groups, groups)
 
-    def test_rename_groups(self):
-        """Test the renaming of groups according to a new name"""
-        old_name = "Foo"
-        new_name = "Bar"
-        create_groups(old_name, groups_templates)
-        groups = rename_groups(old_name, new_name)
-        expected_group_names = []
-        for key, group_name in groups_templates.items():
-            expected_group_names.append(group_name.format(new_name))
-        group_names = []
-        for group in groups:
-            group_names.append(group.name)
-        self.assertCountEqual(expected_group_names, group_names)
-
-        community_groups = Group.objects.filter(name__startswith=new_name)
-        self.assertCountEqual(community_groups, groups)
-        old_community_groups = Group.objects.filter(name__startswith=old_name)
-        self.assertSequenceEqual(old_community_groups, [])
+    def test_renamed_community_groups(self):
+        """Test that a renamed community keeps its groups and that a new community with its
+        former name gets groups of its own"""
+        community = self.create_community("Foo")
+        groups = create_groups(community, groups_templates)
+        community.name = "Bar"
+        community.save()
+        self.assertCountEqual(get_groups(community), groups.values())
+        new_community = Community.objects.create(name="Foo", slug="foo-2", order=2,
+                                                 location=self.location,
+                                                 admin=self.systers_user)
+        new_groups = create_groups(new_community, groups_templates)
+        self.assertFalse(set(new_groups.values()) & set(groups.values()))
+        self.assertCountEqual(get_groups(community), groups.values())
 
     def test_assign_permissions(self):
         """Test assignment of permissions to community"""
-        self.user = User.objects.create(username='foo', password='foobar')
-        systers_user = SystersUser.objects.get(user=self.user)
-        country = Country.objects.create(name='Bar', continent='AS')
-        location = City.objects.create(name='Foo', display_name='Foo',
-                                       country=country)
-        community = Community.objects.create(name="Foo", slug="foo",
-                                                  order=1, location=location,
-                                                  admin=systers_user)
+        community = self.create_community("Foo")
         name = community.name
-        groups = create_groups(name, groups_templates)
-        assign_permissions(community, groups,
-                           groups_templates, group_permissions)
+        with CaptureQueriesContext(connection) as queries:
+            groups = create_groups(community, groups_templates)
+            assign_permissions(community, groups,
+                               groups_templates, group_permissions)
+        self.assertLessEqual(len(queries), 12)
         for key, value in group_permissions.items():
             group = Group.objects.get(name=groups_templates[key].format(name))
             group_perms = [p.codename for p in
@@ -1,7 +1,7 @@
 from cities_light.models import City, Country
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, pre_delete
 from django.test import TestCase
 
 from community.constants import USER_CONTENT_MANAGER
@@ -404,8 +404,8 @@ class EditCommunityProfileViewTestCase(TestCase):
     def setUp(self):
         post_save.connect(manage_community_groups, sender=Community,
                           dispatch_uid="manage_groups")
-        post_delete.connect(remove_community_groups, sender=Community,
-                            dispatch_uid="remove_groups")
+        pre_delete.connect(remove_community_groups, sender=Community,
+                           dispatch_uid="remove_groups")
         self.user = User.objects.create_user(username='foo', password='foobar')
         self.systers_user = SystersUser.objects.get(user=self.user)
         country = Country.objects.create(name='Bar', continent='AS')
@@ -1,75 +1,114 @@
 from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
-from guardian.shortcuts import assign_perm
+from django.db.models import Q
+
+
+def create_role_groups(owner, names, mapping_model):
+    """Create the role groups of a community or meetup and map them to it. Groups already
+    mapped to the owner are reused. A name taken by a group of another owner, e.g. of one with
+    the same name or which was renamed, gets the primary key of the owner appended, so that no
+    two owners share a group.
+
+    :param owner: Community or Meetup object
+    :param names: dict of group names by role
+    :param mapping_model: model mapping the owner to its groups, like CommunityGroup
+    :return: dict of Group objects by role
+    """
+    owner_field = owner._meta.model_name
+    related = mapping_model._meta.get_field('group').remote_field.related_name
+    free = Q(**{related + '__isnull': True}) | Q(**{related + '__' + owner_field: owner})
+    groups = {}
+    for suffix in ('', ' ({0})'.format(owner.pk)):
+        roles = {name + suffix: role for role, name in names.items() if role not in groups}
+        if not roles:
+            break
+        Group.objects.bulk_create([Group(name=name) for name in roles], ignore_conflicts=True)
+        groups.update((roles[group.name], group)
+                      for group in Group.objects.filter(free, name__in=roles).distinct())
+    mapping_model.objects.bulk_create(
+        [mapping_model(group=group, role=role, **{owner_field: owner})
+         for role, group in groups.items()],
+        ignore_conflicts=True)
+    return groups
 
 
 @transaction.atomic
-def create_groups(community_name, groups_templates):
-    """Create groups for a particular Community instance using its name
+def create_groups(community, groups_templates):
+    """Create the role groups of a Community instance, named after it, and map
+    them to the community
 
-    :param community_name: string name of community object
-    :return: list of community Group objects
+    :param community: Community object
+    :param groups_templates: dict of group name templates by role
+    :return: dict of community Group objects by role
     """
-    community_groups = []
-    for key, group_name in groups_templates.items():
-        group, created = Group.objects.get_or_create(
-            name=group_name.format(community_name))
-        community_groups.append(group)
-    return community_groups
+    from community.models import CommunityGroup
+    names = {role: group_name.format(community.name)
+             for role, group_name in groups_templates.items()}
+    return create_role_groups(community, names, CommunityGroup)
 
 
 @transaction.atomic
-def remove_groups(community_name):
-    """Remove groups for a particular Community instance using its name
+def remove_groups(community):
+    """Remove the role groups of a Community instance
 
-    :param community_name: string name of community object
+    :param community: Community object
     """
-    name = "{0}:".format(community_name)
-    Group.objects.filter(name__startswith=name).delete()
+    get_groups(community).delete()
 
 
-def get_groups(community_name):
-    """Get groups of a particular Community instance using its name
+def get_groups(community):
+    """Get the role groups of a Community instance
 
-    :param community_name: string name of Community
-    :return: list of Group objects
+    :param community: Community object
+    :return: QuerySet of Group objects
     """
-    name = "{0}:".format(community_name)
-    return Group.objects.filter(name__startswith=name)
+    return Group.objects.filter(community_roles__community=community)
 
 
-@transaction.atomic
-def rename_groups(old_community_name, new_community_name):
-    """Rename groups bound to a Community instance
+def is_global_permission(codename):
+    """Check if a community group permission is granted for all objects of a
+    model rather than for the community object
 
-    :param old_community_name: string old name of the community
-    :param new_community_name: string new name of the community
-    :return: list of community new Group objects
+    :param codename: string codename of the permission
+    :return: True for tag and resource type permissions, False otherwise
     """
-    name = "{0}:".format(old_community_name)
-    groups = Group.objects.filter(name__startswith=name)
-    new_community_groups = []
-    for group in groups:
-        old_name, group_name = group.name.rsplit(":", 1)
-        group.name = "{0}:{1}".format(new_community_name, group_name)
-        group.save()
-        new_community_groups.append(group)
-    return new_community_groups
+    return codename.endswith('tag') or codename.endswith('resourcetype')
 
 
+@transaction.atomic
 def assign_permissions(community, groups, groups_templates, group_permissions):
     """Assign row-level permissions to community groups and
-       community object
+       community object. All permissions are looked up in a single query and
+       granted in bulk.
 
     :param community: Community object
-    :param groups: list of Group objects
+    :param groups: dict of Group objects by role
     """
-    for key, group_name in groups_templates.items():
-        group = next(
-            g for g in groups if g.name == group_name.format(community.name))
+    from community.models import CommunityGroupObjectPermission
+    content_type = ContentType.objects.get_for_model(community)
+    codenames = set(perm for perms in group_permissions.values()
+                    for perm in perms)
+    permissions = {}
+    for permission in Permission.objects.filter(
+            codename__in=codenames).order_by('pk'):
+        if is_global_permission(permission.codename):
+            permissions.setdefault(permission.codename, permission)
+        elif permission.content_type_id == content_type.id:
+            permissions[permission.codename] = permission
+
+    group_perms = []
+    object_perms = []
+    for key, group in groups.items():
         for perm in group_permissions[key]:
-            if perm.endswith('tag') or perm.endswith('resourcetype'):
-                group.permissions.add(Permission.objects.get(codename=perm))
-                group.save()
+            if is_global_permission(perm):
+                group_perms.append(Group.permissions.through(
+                    group=group, permission=permissions[perm]))
             else:
-                assign_perm(perm, group, community)
+                object_perms.append(CommunityGroupObjectPermission(
+                    group=group, permission=permissions[perm],
+                    content_object=community))
+    Group.permissions.through.objects.bulk_create(group_perms,
+                                                  ignore_conflicts=True)
+    CommunityGroupObjectPermission.objects.bulk_create(object_perms,
+                                                       ignore_conflicts=True)
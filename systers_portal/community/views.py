@@ -13,6 +13,8 @@ from community.constants import (ORDER_NULL_MSG, ORDER_ALREADY_EXISTS_MSG,
                                  SLUG_ALREADY_EXISTS, ORDER_ALREADY_EXISTS, OK,
                                  SUCCESS_MSG)
 from common.mixins import UserDetailsMixin
+from common.middleware import get_cached_object_or_404
+from common.permissions import has_perm, has_perms
 from community.forms import (EditCommunityForm, AddCommunityPageForm,
                              EditCommunityPageForm, PermissionGroupsForm,
                              RequestCommunityForm, EditCommunityRequestForm,
@@ -38,8 +40,7 @@ class RequestCommunityView(LoginRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         """Add the communities requested by the user to the context"""
         context = super(RequestCommunityView, self).get_context_data(**kwargs)
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.request.systers_user
         self.community_requests = RequestCommunity.objects.filter(
             user=self.systersuser)
         context['community_requests'] = self.community_requests
@@ -82,8 +83,7 @@ class ViewCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
         The permission holds true for superusers."""
         self.community_request = get_object_or_404(
             RequestCommunity, slug=self.kwargs['slug'])
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.request.systers_user
         return self.systersuser == self.community_request.user or request.user.is_superuser
 
 
@@ -111,8 +111,7 @@ class EditCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
         The permission holds true for superusers."""
         self.community_request = get_object_or_404(
             RequestCommunity, slug=self.kwargs['slug'])
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.request.systers_user
         return self.systersuser == self.community_request.user or request.user.is_superuser
 
 
@@ -144,7 +143,7 @@ class ApproveRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin,
 
         self.systersuser = community_request.user
         new_community.admin = self.systersuser
-        self.admin = get_object_or_404(SystersUser, user=self.request.user)
+        self.admin = self.request.systers_user
         status, message, level = self.process_request()
         if status == OK:
             new_community.save()
@@ -211,8 +210,7 @@ class NewCommunityRequestsListView(LoginRequiredMixin, StaffuserRequiredMixin, L
         """Add RequestCommunity object to the context"""
         context = super(NewCommunityRequestsListView,
                         self).get_context_data(**kwargs)
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = self.request.systers_user
         context['requestor'] = self.systersuser
         return context
 
@@ -235,7 +233,7 @@ class CommunityLandingView(RedirectView):
         * if a Community has at least one page, redirect to the page with the
           lowest order (aka first page)
         """
-        community = get_object_or_404(Community, slug=kwargs['slug'])
+        community = get_cached_object_or_404(self.request, Community, slug=kwargs['slug'])
         community_pages = CommunityPage.objects.filter(
             community=community).order_by('order')
         if community_pages.exists():
@@ -273,8 +271,8 @@ class EditCommunityProfileView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to change community
         profile. The permission holds true for superusers."""
-        community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("change_community", community)
+        community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "change_community", community)
 
 
 class CommunityPageView(UserDetailsMixin, CommunityMenuMixin, DetailView):
@@ -329,7 +327,7 @@ class AddCommunityView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     def check_permissions(self, request):
         """Check if the request user has the permissions to add a new community.
         The permission holds true for superusers."""
-        self.systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.systersuser = request.systers_user
         return request.user.has_perm("add_community")
 
 
@@ -370,8 +368,8 @@ class AddCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         page. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("add_community_page", self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "add_community_page", self.community)
 
 
 class EditCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -401,9 +399,8 @@ class EditCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("change_community_page",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "change_community_page", self.community)
 
 
 class DeleteCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -433,8 +430,8 @@ class DeleteCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         page. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("delete_community_page", self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "delete_community_page", self.community)
 
 
 class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -461,14 +458,10 @@ class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
         """Check if the request user has the permission to manage community
         users (add, change, delete). The permission holds true for
         superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        add_perm = request.user.has_perm("add_community_systersuser",
-                                         self.community)
-        change_perm = request.user.has_perm("change_community_systersuser",
-                                            self.community)
-        delete_perm = request.user.has_perm("delete_community_systersuser",
-                                            self.community)
-        return add_perm and change_perm and delete_perm
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perms(request, ["add_community_systersuser",
+                                   "change_community_systersuser",
+                                   "delete_community_systersuser"], self.community)
 
 
 class UserPermissionGroupsView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -512,9 +505,8 @@ class UserPermissionGroupsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permission to change user
         permission groups. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("change_community_systersuser",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "change_community_systersuser", self.community)
 
 
 class CommunitySearch(ListView):
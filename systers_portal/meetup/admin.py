@@ -2,10 +2,12 @@ from django.contrib import admin
 
 from meetup.models import (Meetup, Rsvp, SupportRequest, RequestMeetup)
 
-from meetup.models import MeetupImages
+from meetup.models import MeetupImages, GeocodedLocation, MeetupGroup
 
 admin.site.register(Meetup)
 admin.site.register(Rsvp)
 admin.site.register(SupportRequest)
 admin.site.register(RequestMeetup)
 admin.site.register(MeetupImages)
+admin.site.register(GeocodedLocation)
+admin.site.register(MeetupGroup)
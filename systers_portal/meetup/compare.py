@@ -1,59 +1,101 @@
-import gensim
-import numpy as np
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
+import threading
+import time
+from importlib import import_module
 
+from django.core.cache import cache
 
-def clean(word_tokens):
-    """Cleaning Data for tf-idf"""
-    filtered_sentence = []
-    stop_words = set(stopwords.words('english'))
-    for w in word_tokens:
-        if w not in stop_words:
-            filtered_sentence.append(w)
-    data = ' '.join(filtered_sentence)
-    return data
+# Version of the meetups in the suggested meetups index, moved on whenever a meetup is saved or
+# deleted so that the indexes of other processes sync with the database on their next lookup
+INDEX_VERSION_KEY = 'meetup_index_version'
 
 
-def sentence_tokenize(data):
-    """Tokenize text into sentences"""
-    sent = []
-    tokens = sent_tokenize(data)
-    for line in tokens:
-        sent.append(line)
-    return sent
+def get_index_version():
+    """Get the current version of the meetups in the suggested meetups index
+
+    :return: integer version or None if no meetup changed since the cache was cleared
+    """
+    return cache.get(INDEX_VERSION_KEY)
+
+
+def invalidate_index():
+    """Move the suggested meetups index on to a new version"""
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_VERSION_KEY, int(time.time() * 1000), None)
+
+
+def _similarity():
+    """Import the similarity implementation on first use. It depends on gensim, nltk and
+    numpy, which are slow to import and use a lot of memory, so processes that never compare
+    meetup descriptions don't load them."""
+    return import_module('meetup.similarity')
 
 
 def compare(data1, data2):
     """Calculate and Return percentage similarity"""
-    sent1 = []
-    sent2 = []
-    avg_simscore = []
-    word_tokens1 = word_tokenize(data1)
-    word_tokens2 = word_tokenize(data2)
-    data1 = clean(word_tokens1)
-    data2 = clean(word_tokens2)
-    if len(data1) < len(data2):
-        data1, data2 = data2, data1
-    sent1 = sentence_tokenize(data1)
-    sent2 = sentence_tokenize(data2)
-    gen_docs = [[w.lower() for w in word_tokenize(text)]
-                for text in sent1]
-    dictionary = gensim.corpora.Dictionary(gen_docs)
-    corpus = [dictionary.doc2bow(gen_doc) for gen_doc in gen_docs]
-    # Creating tf-df document and similarity object to compare with the other tf-idf document
-    tf_idf = gensim.models.TfidfModel(corpus)
-    sims = gensim.similarities.Similarity('workdir', tf_idf[corpus],
-                                          num_features=len(dictionary))
-    for line in sent2:
-        query_doc = [w.lower() for w in word_tokenize(line)]
-        query_doc_bow = dictionary.doc2bow(query_doc)
-        query_doc_tf_idf = tf_idf[query_doc_bow]
-        sum_of_sims = (np.sum(sims[query_doc_tf_idf], dtype=np.float32))
-        avg = sum_of_sims / len(sent1)
-        avg_simscore.append(avg)
-    total_avg = np.sum(avg_simscore, dtype=np.float)
-    percentage_of_similarity = round(float(total_avg) * 100)
-    if percentage_of_similarity >= 100:
-        percentage_of_similarity = 100
-    return percentage_of_similarity
+    return _similarity().compare(data1, data2)
+
+
+def compare_many(data, candidates):
+    """Calculate and Return percentage similarity of a text to each of the candidate texts.
+    Suggested meetups are looked up in meetup_index instead, which keeps the upcoming meetups
+    indexed between requests."""
+    return _similarity().compare_many(data, candidates)
+
+
+class LazySimilarityIndex(object):
+    """Suggested meetups index which is only created on the first lookup.
+
+    Updates and removals are dropped until then, since the index reads the descriptions
+    of all upcoming meetups from the database when it is first used. They still move the
+    index version on, for the indexes of other processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+
+    def __len__(self):
+        return len(self._index) if self._index is not None else 0
+
+    def __contains__(self, meetup_id):
+        return self._index is not None and meetup_id in self._index
+
+    def update(self, meetup):
+        """Add a meetup to the index or replace its indexed description
+
+        :param meetup: Meetup object
+        """
+        if self._index is not None:
+            self._index.update(meetup)
+        invalidate_index()
+
+    def remove(self, meetup_id):
+        """Remove a meetup from the index
+
+        :param meetup_id: primary key of a Meetup object
+        """
+        if self._index is not None:
+            self._index.remove(meetup_id)
+        invalidate_index()
+
+    def top_k(self, meetup, k=3):
+        """Find the upcoming meetups most similar to a meetup
+
+        :param meetup: Meetup object
+        :param k: maximum number of meetups to return
+        :return: list of Meetup primary keys, the most similar one first. Meetups with
+                 nothing in common with the meetup are left out.
+        """
+        return self._get_index().top_k(meetup, k)
+
+    def _get_index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = _similarity().SimilarityIndex()
+        return self._index
+
+
+meetup_index = LazySimilarityIndex()
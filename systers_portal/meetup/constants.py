@@ -2,6 +2,8 @@
 COMMUNITY_MEMBER = "{0}: Community Member"
 COMMUNITY_MODERATOR = "{0}: Community Moderator"
 COMMUNITY_LEADER = "{0}: Community Leader"
+# key of the community leader group in meetup.permissions.groups_templates
+COMMUNITY_LEADER_ROLE = "community_leader"
 
 # STATUS constants
 LOCATION_ALREADY_EXISTS = "location_already_exists"
@@ -18,3 +20,20 @@ ERROR_MSG = "Something went wrong. Please try again"
 
 # messages for the approval of a meetup request
 SUCCESS_MEETUP_MSG = "Meetup sucessfully created!"
+
+# states of the Zoom meeting of a virtual meetup
+MEETING_PROVISIONING = "provisioning"
+MEETING_READY = "ready"
+MEETING_FAILED = "failed"
+MEETING_STATUS_CHOICES = [
+    (MEETING_PROVISIONING, 'Provisioning'),
+    (MEETING_READY, 'Ready'),
+    (MEETING_FAILED, 'Failed'),
+]
+
+# results of an RSVP to a meetup, which may have a limited capacity
+RSVP_CONFIRMED = "confirmed"
+RSVP_WAITLISTED = "waitlisted"
+RSVP_FULL = "full"
+RSVP_WAITLISTED_MSG = "The meetup is full, you are on the waitlist."
+RSVP_FULL_MSG = "The meetup is full, there is no seat left for a plus one."
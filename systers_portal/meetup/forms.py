@@ -6,14 +6,12 @@ from common.helpers import SubmitCancelFormHelper
 from meetup.models import (Meetup, Rsvp, SupportRequest,
                            RequestMeetup)
 from multiupload.fields import MultiFileField
-from users.models import SystersUser
 from common.models import Comment
 
 from meetup.models import MeetupImages
 
-from meetup.utils import create_meetup
-
-from meetup.utils import edit_meetup, get_meetup
+from meetup.tasks import provision_meeting_on_commit
+from meetup.utils import save_rsvp
 
 
 class RequestMeetupForm(ModelFormWithHelper):
@@ -34,7 +32,7 @@ class RequestMeetupForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add admin to the instance"""
         instance = super(RequestMeetupForm, self).save(commit=False)
-        instance.created_by = SystersUser.objects.get(user=self.user)
+        instance.created_by = self.user.systersuser
         if commit:
             instance.save()
         return instance
@@ -70,7 +68,7 @@ class AddMeetupForm(ModelFormWithHelper):
     class Meta:
         model = Meetup
         fields = ('title', 'slug', 'date', 'time', 'is_virtual', 'meetup_location',
-                  'venue', 'description', 'resources')
+                  'venue', 'capacity', 'description', 'resources')
         widgets = {'date': forms.DateInput(attrs={'type': 'text', 'class': 'datepicker'}),
                    'time': forms.TimeInput(attrs={'type': 'text', 'class': 'timepicker'})}
         helper_class = SubmitCancelFormHelper
@@ -86,15 +84,12 @@ class AddMeetupForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add created_by and meetup_location to the instance"""
         instance = super(AddMeetupForm, self).save(commit=False)
-        instance.created_by = SystersUser.objects.get(user=self.created_by)
-        instance.leader = SystersUser.objects.get(user=self.created_by)
-        if instance.is_virtual:
-            meet_data = create_meetup(instance)
-            instance.meet_link = meet_data['join_url']
-            instance.start_url = meet_data['start_url']
-            instance.meeting_id = meet_data['id']
+        instance.created_by = self.created_by.systersuser
+        instance.leader = self.created_by.systersuser
         if commit:
             instance.save()
+            if instance.is_virtual:
+                provision_meeting_on_commit(instance)
         if self.cleaned_data['images']:
             for img in self.cleaned_data['images']:
                 MeetupImages.objects.create(image=img, meetup=instance)
@@ -123,9 +118,12 @@ class EditMeetupForm(ModelFormWithHelper):
 
     images = MultiFileField(required=False)
 
+    # Fields which are copied to the Zoom meeting of a virtual meetup
+    ZOOM_FIELDS = frozenset(['title', 'date', 'time', 'description'])
+
     class Meta:
         model = Meetup
-        fields = ('title', 'slug', 'date', 'time', 'description', 'venue',)
+        fields = ('title', 'slug', 'date', 'time', 'description', 'venue', 'capacity',)
         widgets = {'date': forms.DateInput(attrs={'type': 'date', 'class': 'datepicker'}),
                    'time': forms.TimeInput(attrs={'type': 'time', 'class': 'timepicker'})}
         helper_class = SubmitCancelFormHelper
@@ -138,12 +136,9 @@ class EditMeetupForm(ModelFormWithHelper):
         if self.cleaned_data['images']:
             for img in self.cleaned_data['images']:
                 MeetupImages.objects.create(image=img, meetup=instance)
-        if instance.is_virtual:
-            edit_meetup(instance)
-            meet_data = get_meetup(instance)
-            instance.meet_link = meet_data['join_url']
-            instance.start_url = meet_data['start_url']
-            instance.meeting_id = meet_data['id']
+        if commit and instance.is_virtual and (
+                not instance.meeting_id or self.ZOOM_FIELDS.intersection(self.changed_data)):
+            provision_meeting_on_commit(instance)
         return instance
 
 
@@ -165,7 +160,7 @@ class AddMeetupCommentForm(ModelFormWithHelper):
         """Override save to add content_object and author to the instance"""
         instance = super(AddMeetupCommentForm, self).save(commit=False)
         instance.content_object = self.content_object
-        instance.author = SystersUser.objects.get(user=self.author)
+        instance.author = self.author.systersuser
         if commit:
             instance.save()
         return instance
@@ -196,12 +191,15 @@ class RsvpForm(ModelFormWithHelper):
         super(RsvpForm, self).__init__(*args, **kwargs)
 
     def save(self, commit=True):
-        """Override save to add user and meetup to the instance"""
+        """Override save to add user and meetup to the instance. The RSVP is saved against the
+        capacity of the meetup, the outcome is stored in the status attribute of the form."""
         instance = super(RsvpForm, self).save(commit=False)
-        instance.user = SystersUser.objects.get(user=self.user)
+        instance.user = self.user.systersuser
         instance.meetup = self.meetup
         if commit:
-            instance.save()
+            instance, self.status = save_rsvp(self.meetup, instance.user,
+                                              instance.coming, instance.plus_one)
+            self.instance = instance
         return instance
 
 
@@ -223,7 +221,7 @@ class AddSupportRequestForm(ModelFormWithHelper):
         """Override save to add volunteer and meetup to the instance. Also, send notification to
          all organizers."""
         instance = super(AddSupportRequestForm, self).save(commit=False)
-        instance.volunteer = SystersUser.objects.get(user=self.volunteer)
+        instance.volunteer = self.volunteer.systersuser
         instance.meetup = self.meetup
         if commit:
             instance.save()
@@ -259,7 +257,7 @@ class AddSupportRequestCommentForm(ModelFormWithHelper):
         """Override save to add content_object and author to the instance"""
         instance = super(AddSupportRequestCommentForm, self).save(commit=False)
         instance.content_object = self.content_object
-        instance.author = SystersUser.objects.get(user=self.author)
+        instance.author = self.author.systersuser
         if commit:
             instance.save()
         return instance
@@ -312,7 +310,7 @@ class RequestVirtualMeetupForm(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add admin to the instance"""
         instance = super(RequestVirtualMeetupForm, self).save(commit=False)
-        instance.created_by = SystersUser.objects.get(user=self.user)
+        instance.created_by = self.user.systersuser
         instance.is_virtual = True
         if commit:
             instance.save()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from meetup.utils import recount_rsvps
+
+
+class Command(BaseCommand):
+    help = "Recount the RSVPs of the meetups whose RSVP counters drifted."
+
+    def handle(self, *args, **options):
+        repaired = recount_rsvps()
+        self.stdout.write("Repaired the RSVP counters of {0} meetups.".format(repaired))
@@ -0,0 +1,31 @@
+# Generated by Django 3.0.9 on 2026-10-18 12:40
+
+from django.db import migrations
+
+
+def create_city_name_index(apps, schema_editor):
+    """Index the upper-cased city names with trigrams, so that the case-insensitive prefix
+    queries of the city lookup do not scan the whole table. Other databases use a scan."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute('CREATE INDEX IF NOT EXISTS cities_light_city_name_trgm '
+                          'ON cities_light_city USING gin (UPPER(name::text) gin_trgm_ops)')
+
+
+def drop_city_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS cities_light_city_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cities_light', '0009_add_subregion'),
+        ('meetup', '0009_geocodedlocation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_city_name_index, drop_city_name_index),
+    ]
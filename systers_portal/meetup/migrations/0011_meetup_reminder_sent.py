@@ -0,0 +1,22 @@
+# Generated by Django 3.0.9 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0010_city_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='reminder_sent',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Reminder sent'),
+        ),
+        migrations.AddIndex(
+            model_name='meetup',
+            index=models.Index(fields=['reminder_sent', 'date'], name='meetup_reminder_due_idx'),
+        ),
+    ]
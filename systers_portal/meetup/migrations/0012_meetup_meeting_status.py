@@ -0,0 +1,34 @@
+# Generated by Django 3.0.9 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+def mark_meetings(apps, schema_editor):
+    """Mark the existing meetings as ready and the virtual meetups without one as pending, so
+    that their meetings get provisioned"""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Meetup.objects.filter(is_virtual=True, meeting_id__isnull=False).update(
+        meeting_status='ready')
+    Meetup.objects.filter(is_virtual=True, meeting_id__isnull=True).update(
+        meeting_status='provisioning')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0011_meetup_reminder_sent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='meeting_status',
+            field=models.CharField(blank=True, choices=[('provisioning', 'Provisioning'), ('ready', 'Ready'), ('failed', 'Failed')], editable=False, max_length=20, verbose_name='Meeting status'),
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='meeting_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(mark_meetings, migrations.RunPython.noop),
+    ]
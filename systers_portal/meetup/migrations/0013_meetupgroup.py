@@ -0,0 +1,74 @@
+# Generated by Django 3.0.9 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Group name templates by role, as in meetup.permissions.groups_templates
+GROUPS_TEMPLATES = {
+    'community_member': "{0}: Community Member",
+    'community_moderator': "{0}: Community Moderator",
+    'community_leader': "{0}: Community Leader",
+}
+
+
+def map_meetup_groups(apps, schema_editor):
+    """Map the existing meetups to the groups named after their titles. Meetups with the same
+    title shared their groups, which are left to the oldest of them; the others get groups of
+    their own, with the same permissions and their leader in the leader group."""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    MeetupGroup = apps.get_model('meetup', 'MeetupGroup')
+    Group = apps.get_model('auth', 'Group')
+    GroupPermission = Group.permissions.through
+    Membership = apps.get_model('auth', 'User').groups.through
+    SystersUser = apps.get_model('users', 'SystersUser')
+    owners, copies = {}, []
+    for meetup in Meetup.objects.only('pk', 'title', 'leader_id').order_by('pk').iterator():
+        for role, group_name in GROUPS_TEMPLATES.items():
+            name = group_name.format(meetup.title)
+            if name in owners:
+                copies.append((meetup, role, name))
+            else:
+                owners[name] = (meetup.pk, role)
+    groups = {group.name: group for group in
+              Group.objects.filter(name__in=list(owners)).only('pk', 'name').iterator()}
+    MeetupGroup.objects.bulk_create(
+        [MeetupGroup(meetup_id=meetup_id, group=groups[name], role=role)
+         for name, (meetup_id, role) in owners.items() if name in groups],
+        batch_size=1000, ignore_conflicts=True)
+    leaders = dict(SystersUser.objects.filter(
+        pk__in=[meetup.leader_id for meetup, role, name in copies]).values_list('pk', 'user_id'))
+    for meetup, role, name in copies:
+        if name not in groups:
+            continue
+        group = Group.objects.create(name="{0} ({1})".format(name, meetup.pk))
+        MeetupGroup.objects.create(meetup_id=meetup.pk, group=group, role=role)
+        GroupPermission.objects.bulk_create(
+            [GroupPermission(group_id=group.pk, permission_id=permission_id)
+             for permission_id in GroupPermission.objects.filter(
+                 group_id=groups[name].pk).values_list('permission_id', flat=True)])
+        if role == 'community_leader' and meetup.leader_id in leaders:
+            Membership.objects.create(group_id=group.pk, user_id=leaders[meetup.leader_id])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('meetup', '0012_meetup_meeting_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetupGroup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=50, verbose_name='Role')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meetup_roles', to='auth.Group', verbose_name='Group')),
+                ('meetup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='role_groups', to='meetup.Meetup', verbose_name='Meetup')),
+            ],
+            options={
+                'unique_together': {('meetup', 'role')},
+            },
+        ),
+        migrations.RunPython(map_meetup_groups, migrations.RunPython.noop),
+    ]
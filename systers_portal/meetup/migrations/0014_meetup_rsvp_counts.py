@@ -0,0 +1,39 @@
+# Generated by Django 3.0.9 on 2026-10-18 20:15
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_rsvps(apps, schema_editor):
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Rsvp = apps.get_model('meetup', 'Rsvp')
+
+    def get_rsvp_count(**filters):
+        rsvps = Rsvp.objects.filter(meetup=OuterRef('pk'), **filters).order_by().values('meetup')
+        count = rsvps.annotate(count=Count('pk')).values('count')
+        return Coalesce(Subquery(count, output_field=IntegerField()), 0)
+
+    Meetup.objects.update(coming_count=get_rsvp_count(coming=True),
+                          plus_one_count=get_rsvp_count(plus_one=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0013_meetupgroup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='coming_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='plus_one_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_rsvps, migrations.RunPython.noop),
+    ]
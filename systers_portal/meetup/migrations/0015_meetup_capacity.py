@@ -0,0 +1,23 @@
+# Generated by Django 3.0.9 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0014_meetup_rsvp_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Leave empty for no limit', null=True, verbose_name='Capacity'),
+        ),
+        migrations.AddField(
+            model_name='rsvp',
+            name='waitlisted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
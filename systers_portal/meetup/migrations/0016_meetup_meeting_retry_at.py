@@ -0,0 +1,33 @@
+# Generated by Django 3.0.9 on 2026-10-18 22:10
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def queue_unprovisioned_meetings(apps, schema_editor):
+    """Let the sweep pick up the meetings which were being provisioned or failed"""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Meetup.objects.filter(
+        Q(meeting_status='provisioning') | Q(meeting_status='failed'), is_virtual=True,
+    ).update(meeting_retry_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0015_meetup_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='meeting_retry_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meetup',
+            index=models.Index(fields=['meeting_retry_at'], name='meetup_meeting_due_idx'),
+        ),
+        migrations.RunPython(queue_unprovisioned_meetings, migrations.RunPython.noop),
+    ]
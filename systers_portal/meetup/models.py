@@ -1,11 +1,64 @@
-from django.db import models
+import datetime
+import math
+
+from django.contrib.auth.models import Group
+from django.db import models, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
 from cities_light.models import City
 from ckeditor.fields import RichTextField
 
+from common.models import ChangeTrackingMixin
+from meetup.constants import MEETING_STATUS_CHOICES
 from users.models import SystersUser
 
 
-class Meetup(models.Model):
+# mean radius of the Earth in kilometres
+EARTH_RADIUS = 6371.0088
+
+
+class MeetupQuerySet(models.QuerySet):
+    """QuerySet for Meetup model"""
+    def upcoming(self):
+        """Filter meetups which take place today or later"""
+        return self.filter(date__gte=datetime.date.today())
+
+    def within(self, latitude, longitude, radius=None):
+        """Annotate meetups with the great-circle distance of their location from a point, in
+        kilometres, and order them by it, the closest first. The distance is calculated by
+        the database with the haversine formula. Meetups whose location has no coordinates
+        are left out.
+
+        :param latitude: float latitude of the point in degrees
+        :param longitude: float longitude of the point in degrees
+        :param radius: float maximum distance in kilometres, None for no limit
+        :return: MeetupQuerySet with a `distance` attribute on every Meetup object
+        """
+        latitude, longitude = float(latitude), float(longitude)
+        queryset = self.filter(meetup_location__latitude__isnull=False,
+                               meetup_location__longitude__isnull=False)
+        if radius is not None:
+            # cheap bounding box on latitude, one degree of latitude is the same everywhere
+            delta = math.degrees(radius / EARTH_RADIUS)
+            queryset = queryset.filter(meetup_location__latitude__gte=latitude - delta,
+                                       meetup_location__latitude__lte=latitude + delta)
+
+        def radians(value):
+            return Value(math.radians(value), output_field=FloatField())
+
+        location_latitude = Radians(Cast(F('meetup_location__latitude'), FloatField()))
+        location_longitude = Radians(Cast(F('meetup_location__longitude'), FloatField()))
+        latitude_term = Power(Sin((location_latitude - radians(latitude)) / 2), 2)
+        longitude_term = Power(Sin((location_longitude - radians(longitude)) / 2), 2)
+        haversine = latitude_term + Cos(radians(latitude)) * Cos(location_latitude) * longitude_term
+        angle = 2 * ASin(Least(Sqrt(haversine), Value(1.0, output_field=FloatField())))
+        queryset = queryset.annotate(distance=angle * EARTH_RADIUS)
+        if radius is not None:
+            queryset = queryset.filter(distance__lte=radius)
+        return queryset.order_by('distance', 'date', 'time')
+
+
+class Meetup(ChangeTrackingMixin, models.Model):
     """Manage details of Meetups of MeetupLocations"""
     title = models.CharField(max_length=50, verbose_name="Title", )
     slug = models.SlugField(max_length=50, unique=True, verbose_name="Slug")
@@ -29,8 +82,37 @@ class Meetup(models.Model):
                                 max_length=1000,
                                 null=True, blank=True)
     meeting_id = models.CharField(verbose_name="Meeting ID", null=True, blank=True, max_length=200)
+    meeting_status = models.CharField(verbose_name="Meeting status", max_length=20, blank=True,
+                                      choices=MEETING_STATUS_CHOICES, editable=False)
+    meeting_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    # When the provisioning sweep next picks the meeting up, unless it is provisioned before
+    meeting_retry_at = models.DateTimeField(null=True, blank=True, editable=False)
+    reminder_sent = models.DateTimeField(verbose_name="Reminder sent", null=True, blank=True,
+                                         editable=False)
+    capacity = models.PositiveIntegerField(verbose_name="Capacity", null=True, blank=True,
+                                           help_text="Leave empty for no limit")
+    # Number of admitted RSVPs coming and with a plus one, kept up to date as RSVPs are saved
+    # or deleted
+    coming_count = models.PositiveIntegerField(default=0, editable=False)
+    plus_one_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = MeetupQuerySet.as_manager()
+
+    tracked_fields = ('date', 'time', 'meetup_location', 'capacity', 'meet_link', 'start_url',
+                      'meeting_id', 'meeting_status', 'meeting_attempts', 'meeting_retry_at',
+                      'reminder_sent', 'coming_count', 'plus_one_count')
+    # Fields which the reminder sweep, the meeting provisioning and the RSVP counters update in
+    # the database directly. Saving an instance only writes them if they were changed on it, so
+    # that a stale instance does not overwrite them.
+    background_fields = ('meet_link', 'start_url', 'meeting_id', 'meeting_status',
+                         'meeting_attempts', 'meeting_retry_at', 'reminder_sent', 'coming_count',
+                         'plus_one_count')
 
     class Meta:
+        indexes = [
+            models.Index(fields=['reminder_sent', 'date'], name='meetup_reminder_due_idx'),
+            models.Index(fields=['meeting_retry_at'], name='meetup_meeting_due_idx'),
+        ]
         permissions = (
             ("view_meetup_request", "View Meetup Request"),
             ('approve_meetup_request', 'Approve Meetup Request'),
@@ -51,6 +133,37 @@ class Meetup(models.Model):
     def __str__(self):
         return self.title
 
+    def get_seats_left(self):
+        """Get the number of seats left, according to the RSVP counters of the instance
+
+        :return: integer number of seats or None if the meetup has no capacity
+        """
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.coming_count - self.plus_one_count, 0)
+
+    def save(self, *args, **kwargs):
+        """Override save to reset the reminder of a rescheduled meetup and to leave out the
+        background fields that were not changed on the instance when its row is updated. If the
+        row was deleted, the instance is inserted with all its fields, as for any other model."""
+        force_insert, update_fields = kwargs.get('force_insert'), kwargs.get('update_fields')
+        if not self._state.adding and not force_insert and update_fields is None:
+            rescheduled = self.has_changed('date') or self.has_changed('time')
+            if rescheduled:
+                self.reminder_sent = None
+            skipped = {name for name in self.background_fields if not self.has_changed(name)}
+            if rescheduled:
+                skipped.discard('reminder_sent')
+            if skipped:
+                manager = type(self)._base_manager.using(kwargs.get('using'))
+                if manager.filter(pk=self.pk).exists():
+                    kwargs['update_fields'] = [
+                        field.name for field in self._meta.concrete_fields
+                        if not field.primary_key and field.name not in skipped]
+                else:
+                    kwargs['force_insert'] = True
+        super(Meetup, self).save(*args, **kwargs)
+
 
 class RequestMeetup(models.Model):
     """Manage details of Meetup Requests of MeetupLocations"""
@@ -81,12 +194,15 @@ class RequestMeetup(models.Model):
         return self.title
 
 
-class Rsvp(models.Model):
+class Rsvp(ChangeTrackingMixin, models.Model):
     """ Users RSVP for particular meetup """
     user = models.ForeignKey(SystersUser, verbose_name="User", on_delete=models.CASCADE)
     meetup = models.ForeignKey(Meetup, verbose_name="Meetup", on_delete=models.CASCADE)
     coming = models.BooleanField(default=True)
     plus_one = models.BooleanField(default=False)
+    waitlisted = models.BooleanField(default=False, editable=False)
+
+    tracked_fields = ('meetup', 'coming', 'plus_one', 'waitlisted')
 
     class Meta:
         unique_together = (('user', 'meetup'),)
@@ -94,6 +210,20 @@ class Rsvp(models.Model):
     def __str__(self):
         return "{0} RSVP for meetup {1}".format(self.user, self.meetup)
 
+    def save(self, *args, **kwargs):
+        """Override save to update the RSVP counters of the meetup in the same transaction"""
+        with transaction.atomic(savepoint=False):
+            super(Rsvp, self).save(*args, **kwargs)
+
+    def get_seats(self):
+        """Get the seats taken by the RSVP. A waitlisted RSVP takes none.
+
+        :return: tuple of the integer seats of the user and of the plus one
+        """
+        if self.waitlisted:
+            return 0, 0
+        return int(self.coming), int(self.plus_one)
+
 
 class SupportRequest(models.Model):
     """Manage details of various volunteering activities"""
@@ -106,6 +236,44 @@ class SupportRequest(models.Model):
         return "{0} volunteered for meetup {1}".format(self.volunteer, self.meetup)
 
 
+class MeetupGroup(models.Model):
+    """Model to map a meetup to the group of its members with a role"""
+    meetup = models.ForeignKey(Meetup, related_name='role_groups', verbose_name="Meetup",
+                               on_delete=models.CASCADE)
+    group = models.ForeignKey(Group, related_name='meetup_roles', verbose_name="Group",
+                              on_delete=models.CASCADE)
+    role = models.CharField(max_length=50, verbose_name="Role")
+
+    class Meta:
+        unique_together = ('meetup', 'role')
+
+    def __str__(self):
+        return "{0} group of {1}".format(self.role, self.meetup)
+
+
 class MeetupImages(models.Model):
     meetup = models.ForeignKey(Meetup, verbose_name="Meetup", on_delete=models.CASCADE)
     image = models.FileField(upload_to="meetup/images", verbose_name="Meetup Image")
+
+
+class GeocodedLocation(models.Model):
+    """Cache of the coordinates the geocoding service returned for a free-text location.
+    Locations the service could not find are stored without coordinates."""
+    query = models.CharField(max_length=255, unique=True, verbose_name="Query")
+    latitude = models.FloatField(null=True, blank=True, verbose_name="Latitude")
+    longitude = models.FloatField(null=True, blank=True, verbose_name="Longitude")
+    date_updated = models.DateTimeField(auto_now=True, db_index=True,
+                                        verbose_name="Date updated")
+
+    def __str__(self):
+        return self.query
+
+    @property
+    def coordinates(self):
+        """Coordinates of the location
+
+        :return: tuple (latitude, longitude) or None if the location was not found
+        """
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
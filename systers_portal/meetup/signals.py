@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 
-from django.db.models.signals import post_save, post_delete, post_migrate, pre_save
+from django.db.models.signals import post_save, post_delete, post_migrate, pre_delete, pre_save
+from django.db import transaction
 from django.dispatch import receiver
+from django.utils import timezone
 from pinax.notifications.models import NoticeType
 
-from meetup.models import Meetup
-from meetup.constants import COMMUNITY_LEADER
-from meetup.utils import (create_groups, assign_permissions, remove_groups)
+from meetup.compare import meetup_index
+from meetup.models import Meetup, Rsvp
+from meetup.constants import COMMUNITY_LEADER_ROLE
+from meetup.utils import (create_groups, assign_permissions, promote_waitlist,
+                          remove_groups, update_rsvp_counts)
 
 from users.scheduler import scheduler
 from meetup.utils import notify_location, notify_time
@@ -15,20 +19,29 @@ from meetup.utils import notify_location, notify_time
 @receiver(post_save, sender=Meetup, dispatch_uid="manage_groups")
 def manage_meetup_groups(sender, instance, created, **kwargs):
     """Manage user groups and user permissions for a particular MeetupLocation"""
-    name = instance.title
     if created:
-        groups = create_groups(name)
+        groups = create_groups(instance)
         assign_permissions(instance, groups)
-        community_leader_group = next(
-            g for g in groups if g.name == COMMUNITY_LEADER.format(name))
-        instance.leader.join_group(community_leader_group)
+        instance.leader.join_group(groups[COMMUNITY_LEADER_ROLE])
         instance.save()
 
 
-@receiver(post_delete, sender=Meetup, dispatch_uid="remove_groups")
+@receiver(pre_delete, sender=Meetup, dispatch_uid="remove_groups")
 def remove_meetup_groups(sender, instance, **kwargs):
-    """Remove user groups for a particular Meetup Location"""
-    remove_groups(instance.title)
+    """Remove user groups for a particular Meetup, while they are still mapped to it"""
+    remove_groups(instance)
+
+
+@receiver(post_save, sender=Meetup, dispatch_uid="index_meetup")
+def index_meetup(sender, instance, **kwargs):
+    """Update the description of a saved Meetup in the suggested meetups index"""
+    meetup_index.update(instance)
+
+
+@receiver(post_delete, sender=Meetup, dispatch_uid="unindex_meetup")
+def unindex_meetup(sender, instance, **kwargs):
+    """Remove a deleted Meetup from the suggested meetups index"""
+    meetup_index.remove(instance.pk)
 
 
 @receiver(post_migrate, dispatch_uid="create_notice_types")
@@ -46,17 +59,70 @@ def create_notice_types(sender, **kwargs):
 
 @receiver(pre_save, sender=Meetup, dispatch_uid="location_change")
 def notify_change(sender, instance, **kwargs):
-    obj = Meetup.objects.filter(pk=instance.pk)
-    if obj:
-        if obj[0].date != instance.date or obj[0].time != instance.time:
-            name = "Time for {0} Change Notify".format(instance.title)
-            scheduler.add_job(notify_time, "date",
-                              run_date=datetime.now() + timedelta(minutes=5),
-                              args=[instance],
-                              id=name, replace_existing=True)
-        if obj[0].meetup_location != instance.meetup_location:
-            name = "Location for {0} Change Notify".format(instance.title)
-            scheduler.add_job(notify_location, "date",
-                              run_date=datetime.now() + timedelta(minutes=5),
-                              args=[instance],
-                              id=name, replace_existing=True)
+    if instance._state.adding:
+        return
+    changed_at = timezone.now()
+    if instance.has_changed('date') or instance.has_changed('time'):
+        name = "Time for meetup {0} Change Notify".format(instance.pk)
+        scheduler.add_job(notify_time, "date",
+                          run_date=datetime.now() + timedelta(minutes=5),
+                          args=[instance, changed_at],
+                          id=name, replace_existing=True)
+    if instance.has_changed('meetup_location'):
+        name = "Location for meetup {0} Change Notify".format(instance.pk)
+        scheduler.add_job(notify_location, "date",
+                          run_date=datetime.now() + timedelta(minutes=5),
+                          args=[instance, changed_at],
+                          id=name, replace_existing=True)
+
+
+def get_stored_seats(rsvp):
+    """Get the seats an RSVP took as it was loaded or last saved
+
+    :param rsvp: Rsvp object
+    :return: tuple of the integer seats of the user and of the plus one
+    """
+    values = {}
+    for name in ('coming', 'plus_one', 'waitlisted'):
+        value = rsvp.get_original(name)
+        # A deferred field still has its stored value, which is loaded on access
+        values[name] = getattr(rsvp, name) if value is None else value
+    if values['waitlisted']:
+        return 0, 0
+    return int(values['coming']), int(values['plus_one'])
+
+
+@receiver(post_save, sender=Rsvp, dispatch_uid="count_rsvp")
+def count_rsvp(sender, instance, created, raw=False, **kwargs):
+    """Update the RSVP counters of the meetup of a created or changed RSVP"""
+    if raw:
+        return
+    coming, plus_one = instance.get_seats()
+    if not created:
+        stored_coming, stored_plus_one = get_stored_seats(instance)
+        original_meetup_id = instance.get_original('meetup')
+        if original_meetup_id in (None, instance.meetup_id):
+            coming, plus_one = coming - stored_coming, plus_one - stored_plus_one
+        else:
+            # The RSVP moved to another meetup
+            update_rsvp_counts(original_meetup_id, -stored_coming, -stored_plus_one)
+    update_rsvp_counts(instance.meetup_id, coming, plus_one)
+
+
+@receiver(post_delete, sender=Rsvp, dispatch_uid="uncount_rsvp")
+def uncount_rsvp(sender, instance, **kwargs):
+    """Update the RSVP counters of the meetup of a deleted RSVP and let waitlisted RSVPs take
+    the seats it freed"""
+    coming, plus_one = get_stored_seats(instance)
+    update_rsvp_counts(instance.meetup_id, -coming, -plus_one)
+    if coming or plus_one:
+        meetup_id = instance.meetup_id
+        transaction.on_commit(lambda: promote_waitlist(meetup_id))
+
+
+@receiver(post_save, sender=Meetup, dispatch_uid="promote_waitlist")
+def promote_waitlisted_rsvps(sender, instance, created, **kwargs):
+    """Let waitlisted RSVPs take the seats added by raising the capacity of a meetup"""
+    if not created and instance.has_changed('capacity'):
+        meetup_id = instance.pk
+        transaction.on_commit(lambda: promote_waitlist(meetup_id))
@@ -0,0 +1,328 @@
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter
+from functools import lru_cache
+
+import gensim
+import numpy as np
+import scipy.sparse
+from nltk.tokenize import word_tokenize, sent_tokenize
+from nltk.corpus import stopwords
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from meetup.compare import get_index_version
+from meetup.models import Meetup
+
+
+def default_similarity_backend(corpus, num_features, num_documents):
+    """Build a similarity index over a tf-idf corpus. Small corpora are indexed in memory.
+    Larger ones are sharded to a temporary directory private to the index, which is removed
+    once the index is garbage collected.
+
+    :param corpus: iterable of tf-idf vectors
+    :param num_features: int size of the dictionary
+    :param num_documents: int number of vectors in the corpus
+    :return: gensim similarity index
+    """
+    if num_documents <= settings.SIMILARITY_MAX_IN_MEMORY_DOCUMENTS:
+        return gensim.similarities.SparseMatrixSimilarity(
+            corpus, num_features=num_features, num_docs=num_documents)
+    workdir = tempfile.mkdtemp(prefix='meetup-similarity-')
+    sims = gensim.similarities.Similarity(os.path.join(workdir, 'shard'), corpus,
+                                          num_features=num_features)
+    weakref.finalize(sims, shutil.rmtree, workdir, ignore_errors=True)
+    return sims
+
+
+def get_similarity_backend():
+    """Get the similarity backend configured by the SIMILARITY_BACKEND setting
+
+    :return: callable with the signature of default_similarity_backend()
+    """
+    return import_string(settings.SIMILARITY_BACKEND)
+
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    """Load the set of English stopwords once per process"""
+    return frozenset(stopwords.words('english'))
+
+
+def clean(word_tokens):
+    """Cleaning Data for tf-idf"""
+    filtered_sentence = []
+    stop_words = get_stop_words()
+    for w in word_tokens:
+        if w not in stop_words:
+            filtered_sentence.append(w)
+    data = ' '.join(filtered_sentence)
+    return data
+
+
+def sentence_tokenize(data):
+    """Tokenize text into sentences"""
+    sent = []
+    tokens = sent_tokenize(data)
+    for line in tokens:
+        sent.append(line)
+    return sent
+
+
+def tokenize(data):
+    """Tokenize text into lowercase words, leaving out stopwords and punctuation"""
+    stop_words = get_stop_words()
+    words = [w.lower() for w in word_tokenize(data)]
+    return [w for w in words if w.isalnum() and w not in stop_words]
+
+
+def compare(data1, data2):
+    """Calculate and Return percentage similarity"""
+    sent1 = []
+    sent2 = []
+    avg_simscore = []
+    word_tokens1 = word_tokenize(data1)
+    word_tokens2 = word_tokenize(data2)
+    data1 = clean(word_tokens1)
+    data2 = clean(word_tokens2)
+    if len(data1) < len(data2):
+        data1, data2 = data2, data1
+    sent1 = sentence_tokenize(data1)
+    sent2 = sentence_tokenize(data2)
+    gen_docs = [[w.lower() for w in word_tokenize(text)]
+                for text in sent1]
+    dictionary = gensim.corpora.Dictionary(gen_docs)
+    corpus = [dictionary.doc2bow(gen_doc) for gen_doc in gen_docs]
+    # Creating tf-df document and similarity object to compare with the other tf-idf document
+    tf_idf = gensim.models.TfidfModel(corpus)
+    sims = get_similarity_backend()(tf_idf[corpus], len(dictionary), len(corpus))
+    for line in sent2:
+        query_doc = [w.lower() for w in word_tokenize(line)]
+        query_doc_bow = dictionary.doc2bow(query_doc)
+        query_doc_tf_idf = tf_idf[query_doc_bow]
+        sum_of_sims = (np.sum(sims[query_doc_tf_idf], dtype=np.float32))
+        avg = sum_of_sims / len(sent1)
+        avg_simscore.append(avg)
+    total_avg = np.sum(avg_simscore, dtype=float)
+    percentage_of_similarity = round(float(total_avg) * 100)
+    if percentage_of_similarity >= 100:
+        percentage_of_similarity = 100
+    return percentage_of_similarity
+
+
+@lru_cache(maxsize=1024)
+def preprocess(data):
+    """Clean and tokenize a text the same way compare() does
+
+    :param data: string text
+    :return: tuple of the length of the cleaned text and of its sentences, each sentence
+             being a tuple of lowercase words
+    """
+    data = clean(word_tokenize(data))
+    sentences = tuple(tuple(w.lower() for w in word_tokenize(line))
+                      for line in sentence_tokenize(data))
+    return len(data), sentences
+
+
+def compare_many(data, candidates):
+    """Calculate and Return percentage similarity of a text to each of the candidate texts.
+
+    The scores are the ones compare(data, candidate) returns, but all of them are computed
+    with a handful of sparse matrix products. compare() builds a tf-idf model over the
+    sentences of the longer text and sums the cosine similarities between every sentence of
+    the shorter text and every sentence of the longer one, divided by the number of
+    sentences of the longer text. Since the sum of cosine similarities to a set of sentences
+    equals the dot product with the sum of their unit tf-idf vectors, only that sum needs to
+    be kept for each text.
+
+    :param data: string text
+    :param candidates: list of string texts
+    :return: list of int percentage similarities, in the order of the candidates
+    """
+    documents = [preprocess(data)] + [preprocess(candidate) for candidate in candidates]
+    vocabulary = {}
+    rows, columns, counts, owners = [], [], [], []
+    for index, (length, sentences) in enumerate(documents):
+        for sentence in sentences:
+            for word, count in Counter(sentence).items():
+                rows.append(len(owners))
+                columns.append(vocabulary.setdefault(word, len(vocabulary)))
+                counts.append(count)
+            owners.append(index)
+    if not vocabulary:
+        return [0] * len(candidates)
+
+    owners = np.array(owners)
+    num_documents = len(documents)
+    # term frequencies, one row per sentence of every text
+    tf = scipy.sparse.csr_matrix((counts, (rows, columns)),
+                                 shape=(len(owners), len(vocabulary)), dtype=np.float64)
+    # maps every sentence to the text it belongs to
+    membership = scipy.sparse.csr_matrix((np.ones(len(owners)), (np.arange(len(owners)), owners)),
+                                         shape=(len(owners), num_documents))
+    num_sentences = np.bincount(owners, minlength=num_documents)
+
+    # idf of every word within each text, with the text's sentences as the corpus
+    idf = (membership.T @ (tf > 0).astype(np.float64)).tocsr()
+    idf_rows = np.repeat(np.arange(num_documents), np.diff(idf.indptr))
+    idf.data = np.log2(num_sentences[idf_rows] / idf.data)
+    idf.eliminate_zeros()
+
+    # sum of the unit tf-idf vectors of the sentences of each text
+    weights = tf.multiply(membership @ idf).tocsr()
+    centroids = membership.T @ _normalize_rows(weights)
+
+    # sentences of the candidates against the model of the query text
+    candidate_sims = _project(tf, idf[0], centroids[0])[:, 0]
+    candidate_sims[owners == 0] = 0
+    query_as_model = np.bincount(owners, weights=candidate_sims, minlength=num_documents)
+    # sentences of the query text against the model of every candidate
+    query_as_candidate = _project(tf[owners == 0], idf, centroids).sum(axis=0)
+
+    lengths = np.array([length for length, sentences in documents])
+    query_is_longer = lengths[0] >= lengths
+    totals = np.where(query_is_longer, query_as_model, query_as_candidate)
+    model_sentences = np.where(query_is_longer, num_sentences[0], num_sentences)
+    totals = np.divide(totals, model_sentences, out=np.zeros(num_documents),
+                       where=model_sentences > 0)
+    return [min(round(float(total) * 100), 100) for total in totals[1:]]
+
+
+def _normalize_rows(matrix):
+    """Scale every row of a sparse matrix to unit length, leaving empty rows empty"""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return scipy.sparse.diags(scale) @ matrix
+
+
+def _project(tf, idf, centroids):
+    """Weigh sentences by the idf of several tf-idf models and compute their cosine
+    similarity to the sum of the unit vectors of each model's sentences
+
+    :param tf: sparse matrix of term frequencies, one row per sentence
+    :param idf: sparse matrix of idf weights, one row per model
+    :param centroids: sparse matrix of summed unit vectors, one row per model
+    :return: dense array of similarities, one row per sentence and one column per model
+    """
+    dots = (tf @ idf.multiply(centroids).T).toarray()
+    norms = np.sqrt((tf.multiply(tf) @ idf.multiply(idf).T).toarray())
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+class SimilarityIndex(object):
+    """TF-IDF similarity index over the descriptions of upcoming meetups.
+
+    Descriptions are tokenized once, when a meetup is added to the index, and the
+    TF-IDF model is rebuilt lazily on the first lookup after the indexed documents
+    change. Lookups sync the index against the database, comparing the `last_updated`
+    timestamps of upcoming meetups, so that changes made by other processes are picked up
+    as well. The sync only runs when the index version in the cache moved on or after
+    SIMILARITY_SYNC_INTERVAL seconds, which also drops the meetups that took place.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._documents = {}
+        self._versions = {}
+        self._ids = []
+        self._dictionary = None
+        self._tf_idf = None
+        self._sims = None
+        self._dirty = False
+        self._synced_at = None
+        self._synced_version = None
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, meetup_id):
+        return meetup_id in self._documents
+
+    def update(self, meetup):
+        """Add a meetup to the index or replace its indexed description
+
+        :param meetup: Meetup object
+        """
+        tokens = tokenize(meetup.description)
+        with self._lock:
+            self._documents[meetup.pk] = tokens
+            self._versions[meetup.pk] = meetup.last_updated
+            self._dirty = True
+
+    def remove(self, meetup_id):
+        """Remove a meetup from the index
+
+        :param meetup_id: primary key of a Meetup object
+        """
+        with self._lock:
+            if self._documents.pop(meetup_id, None) is not None:
+                self._versions.pop(meetup_id, None)
+                self._dirty = True
+
+    def sync(self, force=False):
+        """Bring the index in line with the upcoming meetups stored in the database. Only
+        meetups which are new or were modified since they were indexed are re-tokenized.
+
+        :param force: bool whether to sync even if the index is up to date
+        """
+        version = get_index_version()
+        now = time.monotonic()
+        with self._lock:
+            fresh = self._synced_at is not None and version == self._synced_version
+            if fresh and not force and now - self._synced_at < settings.SIMILARITY_SYNC_INTERVAL:
+                return
+            self._synced_at, self._synced_version = now, version
+        upcoming = dict(Meetup.objects.filter(
+            date__gte=datetime.date.today()).values_list('id', 'last_updated'))
+        with self._lock:
+            outdated = [pk for pk in self._documents if pk not in upcoming]
+            changed = [pk for pk, version in upcoming.items()
+                       if self._versions.get(pk) != version]
+        for pk in outdated:
+            self.remove(pk)
+        if changed:
+            for meetup in Meetup.objects.filter(pk__in=changed).only(
+                    'id', 'description', 'last_updated'):
+                self.update(meetup)
+
+    def top_k(self, meetup, k=3):
+        """Find the upcoming meetups most similar to a meetup
+
+        :param meetup: Meetup object
+        :param k: maximum number of meetups to return
+        :return: list of Meetup primary keys, the most similar one first. Meetups with
+                 nothing in common with the meetup are left out.
+        """
+        self.sync()
+        query = tokenize(meetup.description)
+        with self._lock:
+            self._build()
+            ids = self._ids
+            if self._sims is None:
+                scores = np.zeros(len(ids))
+            else:
+                scores = self._sims[self._tf_idf[self._dictionary.doc2bow(query)]]
+        ranking = np.argsort(-scores, kind='stable')
+        return [ids[i] for i in ranking if ids[i] != meetup.pk and scores[i] > 0][:k]
+
+    def _build(self):
+        """Rebuild the dictionary, TF-IDF model and similarity matrix if the indexed
+        documents changed since the last build"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._sims = None
+        self._ids = sorted(self._documents)
+        documents = [self._documents[pk] for pk in self._ids]
+        self._dictionary = gensim.corpora.Dictionary(documents)
+        if not len(self._dictionary):
+            return
+        corpus = [self._dictionary.doc2bow(document) for document in documents]
+        self._tf_idf = gensim.models.TfidfModel(corpus)
+        self._sims = get_similarity_backend()(
+            self._tf_idf[corpus], len(self._dictionary), len(corpus))
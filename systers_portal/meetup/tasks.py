@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from apscheduler.schedulers.base import STATE_STOPPED
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from meetup.constants import MEETING_FAILED, MEETING_PROVISIONING, MEETING_READY
+from meetup.models import Meetup
+from meetup.utils import create_meetup, edit_meetup, get_meetup
+from meetup.zoom import ZoomError
+
+
+def claim_meeting(meetup_id, now):
+    """Claim the provisioning of the Zoom meeting of a virtual meetup, if it is due. The claim
+    lasts ZOOM_PROVISION_CLAIM_TIMEOUT seconds, so that the scheduled attempt and the sweep do
+    not provision the meeting at the same time.
+
+    :param meetup_id: integer primary key of the Meetup
+    :param now: aware datetime object
+    :return: True if the meeting was claimed
+    """
+    return Meetup.objects.filter(
+        pk=meetup_id, is_virtual=True, meeting_status__in=[MEETING_PROVISIONING, MEETING_FAILED],
+        meeting_retry_at__lte=now,
+    ).update(meeting_retry_at=now + timedelta(seconds=settings.ZOOM_PROVISION_CLAIM_TIMEOUT))
+
+
+def provision_meeting(meetup_id):
+    """Create the Zoom meeting of a virtual meetup, or update it if it exists. A failed attempt
+    is retried with exponential backoff until ZOOM_PROVISION_ATTEMPTS attempts were made, after
+    which the meeting is marked as failed and left to the sweep.
+
+    :param meetup_id: integer primary key of the Meetup
+    """
+    now = timezone.now()
+    if not claim_meeting(meetup_id, now):
+        return
+    try:
+        meetup = Meetup.objects.get(pk=meetup_id)
+    except Meetup.DoesNotExist:
+        # The meetup was deleted since it was claimed
+        return
+    try:
+        if meetup.meeting_id:
+            edit_meetup(meetup)
+            meet_data = get_meetup(meetup)
+        else:
+            meet_data = create_meetup(meetup)
+    except ZoomError:
+        attempts = meetup.meeting_attempts + 1
+        if attempts < settings.ZOOM_PROVISION_ATTEMPTS:
+            retry_at = now + timedelta(
+                seconds=settings.ZOOM_PROVISION_RETRY_DELAY * 2 ** (attempts - 1))
+            Meetup.objects.filter(pk=meetup_id).update(meeting_attempts=attempts,
+                                                       meeting_retry_at=retry_at)
+            schedule_provisioning(meetup_id, retry_at)
+        else:
+            retry_at = now + timedelta(seconds=settings.ZOOM_PROVISION_FAILED_RETRY_DELAY)
+            Meetup.objects.filter(pk=meetup_id).update(meeting_attempts=attempts,
+                                                       meeting_status=MEETING_FAILED,
+                                                       meeting_retry_at=retry_at)
+        return
+    # Update the row directly, so that the meetup signals do not fire for the link alone
+    Meetup.objects.filter(pk=meetup_id).update(
+        meet_link=meet_data['join_url'], start_url=meet_data['start_url'],
+        meeting_id=meet_data['id'], meeting_status=MEETING_READY, meeting_attempts=0,
+        meeting_retry_at=None)
+
+
+def provision_due_meetings(now=None):
+    """Provision the Zoom meetings of upcoming virtual meetups which are due. These are the
+    attempts whose scheduled job was lost, e.g. because the process which queued it stopped,
+    and the meetings which failed ZOOM_PROVISION_FAILED_RETRY_DELAY seconds ago.
+
+    :param now: aware datetime object of the sweep, defaults to the current time
+    :return: list of integer primary keys of the meetups
+    """
+    now = now or timezone.now()
+    meetup_ids = list(Meetup.objects.filter(
+        is_virtual=True, meeting_status__in=[MEETING_PROVISIONING, MEETING_FAILED],
+        meeting_retry_at__lte=now, date__gte=timezone.localdate(now),
+    ).order_by('meeting_retry_at').values_list('pk', flat=True))
+    for meetup_id in meetup_ids:
+        provision_meeting(meetup_id)
+    return meetup_ids
+
+
+def schedule_provisioning(meetup_id, run_date=None):
+    """Run provision_meeting for a meetup in the scheduler. A scheduler which was never started,
+    e.g. in a management command, would keep the job in memory and lose it on exit, so it is
+    left to the sweep then.
+
+    :param meetup_id: integer primary key of the Meetup
+    :param run_date: aware datetime object, defaults to right away
+    """
+    from users.scheduler import scheduler
+    if scheduler.state == STATE_STOPPED:
+        return
+    scheduler.add_job(provision_meeting, 'date', run_date=run_date or timezone.now(),
+                      args=[meetup_id], id="Provision meeting {0}".format(meetup_id),
+                      replace_existing=True)
+
+
+def provision_meeting_on_commit(meetup):
+    """Mark the Zoom meeting of a virtual meetup as being provisioned and provision it in the
+    background once the current transaction is committed, so that the request only waits
+    for the database. The mark is saved with the meetup, so the sweep picks the meeting up
+    even if the job is lost.
+
+    :param meetup: saved Meetup object
+    """
+    now = timezone.now()
+    meetup.meeting_status = MEETING_PROVISIONING
+    meetup.meeting_attempts = 0
+    meetup.meeting_retry_at = now
+    Meetup.objects.filter(pk=meetup.pk).update(meeting_status=MEETING_PROVISIONING,
+                                               meeting_attempts=0, meeting_retry_at=now)
+    transaction.on_commit(lambda: schedule_provisioning(meetup.pk, now))
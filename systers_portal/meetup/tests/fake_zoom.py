@@ -0,0 +1,154 @@
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import jwt
+
+
+class FakeZoomServer:
+    """Local stand-in for the meetings endpoints of the Zoom API, to test the Zoom client
+    without the network. Use it as a context manager; its url is set while it runs.
+
+    Example::
+
+        with FakeZoomServer() as zoom:
+            client = ZoomClient(zoom.url, zoom.api_key, zoom.api_secret)
+            zoom.fail(500)  # the next request gets a 500 response
+    """
+
+    def __init__(self, api_key='key', api_secret='secret'):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.meetings = {}
+        self.requests = []
+        self.connections = set()
+        self.sockets = []
+        self.failures = []
+        self.drops = 0
+        self.delay = 0
+        self.url = None
+        self.lock = threading.Lock()
+
+    def fail(self, status, times=1):
+        """Answer the next requests with an error
+
+        :param status: integer HTTP status of the error
+        :param times: integer number of requests to fail
+        """
+        self.failures.extend([status] * times)
+
+    def drop(self, times=1):
+        """Process the next requests but close their connections instead of answering, as
+        a server does which closes an idle connection just as a request arrives
+
+        :param times: integer number of requests to drop
+        """
+        self.drops += times
+
+    def close_connections(self):
+        """Close the kept-alive connections, as a server does once they were idle for a while"""
+        with self.lock:
+            sockets, self.sockets = self.sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        server = self
+
+        class Handler(ZoomRequestHandler):
+            zoom = server
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}'.format(self.httpd.server_address[1])
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ZoomRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    zoom = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_api()
+
+    def do_POST(self):
+        self.handle_api()
+
+    def do_PATCH(self):
+        self.handle_api()
+
+    def respond(self, status, data=None):
+        with self.zoom.lock:
+            drop, self.zoom.drops = self.zoom.drops > 0, max(self.zoom.drops - 1, 0)
+        if drop:
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        body = json.dumps(data).encode('utf-8') if data is not None else b''
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting
+            self.close_connection = True
+
+    def handle_api(self):
+        zoom = self.zoom
+        length = int(self.headers.get('Content-Length') or 0)
+        data = json.loads(self.rfile.read(length).decode('utf-8')) if length else None
+        with zoom.lock:
+            zoom.requests.append((self.command, self.path))
+            if self.client_address not in zoom.connections:
+                zoom.sockets.append(self.connection)
+            zoom.connections.add(self.client_address)
+            status = zoom.failures.pop(0) if zoom.failures else None
+        if zoom.delay:
+            time.sleep(zoom.delay)
+        if status is not None:
+            return self.respond(status, {'code': status, 'message': "Fake failure"})
+        try:
+            token = self.headers.get('Authorization', '').split(' ')[-1]
+            claims = jwt.decode(token, zoom.api_secret, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            return self.respond(401, {'code': 124, 'message': "Invalid access token."})
+        if claims.get('iss') != zoom.api_key:
+            return self.respond(401, {'code': 124, 'message': "Invalid access token."})
+
+        if self.command == 'POST' and re.match(r'^/v2/users/[^/]+/meetings$', self.path):
+            with zoom.lock:
+                meeting_id = 1000 + len(zoom.meetings)
+                meeting = dict(data, id=meeting_id,
+                               join_url='https://zoom.us/j/{0}'.format(meeting_id),
+                               start_url='https://zoom.us/s/{0}'.format(meeting_id))
+                zoom.meetings[meeting_id] = meeting
+            return self.respond(201, meeting)
+        match = re.match(r'^/v2/meetings/(\d+)$', self.path)
+        meeting = zoom.meetings.get(int(match.group(1))) if match else None
+        if meeting is None:
+            return self.respond(404, {'code': 3001, 'message': "Meeting does not exist."})
+        if self.command == 'PATCH':
+            meeting.update(data)
+            return self.respond(204)
+        return self.respond(200, meeting)
@@ -0,0 +1,116 @@
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from cities_light.models import City, Country
+
+from meetup.compare import compare, compare_many, invalidate_index, meetup_index
+from meetup.models import Meetup
+from users.models import SystersUser
+
+
+class CompareTestCase(SimpleTestCase):
+    def test_similarity_backend(self):
+        """Test that sharded and in-memory indexes give the same score and that sharding
+        leaves no files behind"""
+        description = "Learn Python with us. We will build a small web app. Bring a laptop!"
+        candidate = "Python workshop for beginners. Bring a laptop."
+        in_memory = compare(description, candidate)
+        with override_settings(SIMILARITY_MAX_IN_MEMORY_DOCUMENTS=0):
+            sharded = compare(description, candidate)
+        self.assertEqual(in_memory, sharded)
+        self.assertEqual(glob.glob('workdir*'), [])
+        self.assertEqual(
+            glob.glob(os.path.join(tempfile.gettempdir(), 'meetup-similarity-*')), [])
+
+    def test_lazy_import(self):
+        """Test that the NLP libraries are not imported along with the meetup views"""
+        script = "import django, sys; django.setup(); import meetup.views; " \
+                 "print(any(m in sys.modules for m in ('gensim', 'nltk')))"
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=settings.BASE_DIR,
+                                         universal_newlines=True)
+        self.assertEqual(output.strip(), 'False')
+
+    def test_compare_many(self):
+        """Test that batch scores are the same as pairwise compare() scores"""
+        description = "Learn Python with us. We will build a small web app. Bring a laptop!"
+        candidates = [
+            "Python workshop for beginners. Bring a laptop.",
+            "An introduction to web development with Django and Python. We will build a blog, "
+            "deploy it and talk about testing. Snacks are provided. Bring a laptop!",
+            "A relaxed knitting circle.",
+            description,
+            "",
+        ]
+        self.assertEqual(compare_many(description, candidates),
+                         [compare(description, candidate) for candidate in candidates])
+
+    def test_compare_many_no_candidates(self):
+        """Test that no scores are returned for no candidates"""
+        self.assertEqual(compare_many("Python workshop.", []), [])
+
+
+class SimilarityIndexTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        self.location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        user = User.objects.create_user(username='foo', password='foobar',
+                                        email='user@test.com')
+        self.systers_user = SystersUser.objects.get(user=user)
+        self.python = self.create_meetup('python', 'Python workshop for beginners.')
+        self.django = self.create_meetup('django', 'Building web apps with Python and Django.')
+        self.knitting = self.create_meetup('knitting', 'A relaxed knitting circle.')
+
+    def create_meetup(self, slug, description, days=1):
+        return Meetup.objects.create(title=slug, slug=slug,
+                                     date=(timezone.now() + timezone.timedelta(days)).date(),
+                                     time=timezone.now().time(),
+                                     description=description,
+                                     meetup_location=self.location,
+                                     created_by=self.systers_user,
+                                     leader=self.systers_user)
+
+    def test_top_k(self):
+        """Test that the most similar upcoming meetups are returned first"""
+        self.assertEqual(meetup_index.top_k(self.python, k=1), [self.django.pk])
+        similar = meetup_index.top_k(self.python, k=3)
+        # Meetups with nothing in common are not suggested
+        self.assertEqual(similar, [self.django.pk])
+        self.assertNotIn(self.python.pk, similar)
+
+    def test_update_on_save(self):
+        """Test that an edited description is reflected in the index"""
+        self.knitting.description = 'Knitting web apps with Django.'
+        self.knitting.save()
+        self.assertEqual(meetup_index.top_k(self.django, k=1), [self.knitting.pk])
+
+    def test_remove_on_delete(self):
+        """Test that a deleted meetup is no longer suggested"""
+        pk = self.django.pk
+        self.django.delete()
+        self.assertNotIn(pk, meetup_index)
+        self.assertEqual(meetup_index.top_k(self.python), [])
+
+    def test_past_meetups_not_indexed(self):
+        """Test that meetups which already took place are left out of the index"""
+        past = self.create_meetup('past', 'Python workshop for beginners.', days=-7)
+        self.assertNotIn(past.pk, meetup_index.top_k(self.python))
+        self.assertNotIn(past.pk, meetup_index)
+
+    def test_sync_throttled(self):
+        """Test that lookups only sync with the database when a meetup changed"""
+        meetup_index.top_k(self.python)
+        with self.assertNumQueries(0):
+            self.assertEqual(meetup_index.top_k(self.python), [self.django.pk])
+        # A change made by another process moves the version on as well
+        Meetup.objects.filter(pk=self.knitting.pk).update(
+            description='Knitting for beginners.', last_updated=timezone.now())
+        invalidate_index()
+        self.assertCountEqual(meetup_index.top_k(self.python, k=3),
+                              [self.django.pk, self.knitting.pk])
@@ -1,10 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 from django.utils import timezone
 from cities_light.models import City, Country
 
+from meetup.constants import RSVP_CONFIRMED, RSVP_FULL, RSVP_WAITLISTED
 from meetup.models import (Meetup, Rsvp, SupportRequest,
                            RequestMeetup)
+from meetup.utils import get_rsvp, lock_meetup, promote_waitlist, save_rsvp
 from users.models import SystersUser
 
 
@@ -32,6 +40,53 @@ class MeetupTestCase(MeetupBaseTestCase, TestCase):
         """Test Meetup object str/unicode representation"""
         self.assertEqual(str(self.meetup), "Test Meetup")
 
+    def test_save_background_fields(self):
+        """Test that saving a stale meetup keeps the fields updated in the background"""
+        with self.assertNumQueries(1):
+            meetup = Meetup.objects.get(pk=self.meetup.pk)
+        Meetup.objects.filter(pk=meetup.pk).update(reminder_sent=timezone.now(),
+                                                   meet_link='https://zoom.us/j/1')
+        meetup.title = "New Title"
+        meetup.save()
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.title, "New Title")
+        self.assertIsNotNone(self.meetup.reminder_sent)
+        self.assertEqual(self.meetup.meet_link, 'https://zoom.us/j/1')
+
+        meetup.date = meetup.date + timezone.timedelta(days=1)
+        meetup.save()
+        self.meetup.refresh_from_db()
+        self.assertIsNone(self.meetup.reminder_sent)
+
+    def test_save_deleted(self):
+        """Test that saving a meetup whose row was deleted inserts it again"""
+        meetup = Meetup.objects.get(pk=self.meetup.pk)
+        Meetup.objects.filter(pk=meetup.pk).delete()
+        meetup.title = "New Title"
+        meetup.save()
+        self.assertEqual(Meetup.objects.get(pk=meetup.pk).title, "New Title")
+
+    def test_within(self):
+        """Test that meetups are ordered and filtered by distance from a point"""
+        self.location.latitude, self.location.longitude = 0, 0
+        self.location.save()
+        far_location = City.objects.create(name='Qux', display_name='Qux',
+                                           country=self.location.country,
+                                           latitude=3, longitude=4)
+        far_meetup = Meetup.objects.create(title="Far Meetup", slug="far",
+                                           date=timezone.now().date(),
+                                           time=timezone.now().time(),
+                                           venue="FooBar colony",
+                                           description="This is a far meetup.",
+                                           meetup_location=far_location,
+                                           created_by=self.systers_user,
+                                           leader=self.systers_user)
+        meetups = list(Meetup.objects.within(3, 4))
+        self.assertEqual(meetups, [far_meetup, self.meetup])
+        self.assertAlmostEqual(meetups[0].distance, 0)
+        self.assertAlmostEqual(meetups[1].distance, 556, delta=1)
+        self.assertEqual(list(Meetup.objects.within(0, 0, radius=100)), [self.meetup])
+
 
 class RequestMeetupTestCase(MeetupBaseTestCase, TestCase):
     def setUp(self):
@@ -69,6 +124,188 @@ class RsvpTestCase(MeetupBaseTestCase, TestCase):
     def test_str(self):
         self.assertEqual(str(self.rsvp), "foo RSVP for meetup Test Meetup")
 
+    def assertCounts(self, coming_count, plus_one_count):
+        self.meetup.refresh_from_db()
+        self.assertEqual((self.meetup.coming_count, self.meetup.plus_one_count),
+                         (coming_count, plus_one_count))
+
+    def test_counts(self):
+        """Test that the RSVP counters follow the RSVPs of the meetup"""
+        self.assertCounts(1, 0)
+        user = User.objects.create(username='bar', password='foobar')
+        rsvp = Rsvp.objects.create(user=SystersUser.objects.get(user=user),
+                                   meetup=self.meetup, plus_one=True)
+        self.assertCounts(2, 1)
+
+        rsvp = Rsvp.objects.get(pk=rsvp.pk)
+        rsvp.coming = False
+        with self.assertNumQueries(2):
+            rsvp.save()
+        self.assertCounts(1, 1)
+        with self.assertNumQueries(1):
+            rsvp.save()
+        self.assertCounts(1, 1)
+
+        # A stale meetup does not overwrite the counters
+        self.meetup.title = "New Title"
+        Rsvp.objects.filter(pk=self.rsvp.pk).delete()
+        self.meetup.save()
+        self.assertCounts(0, 1)
+
+        rsvp.delete()
+        self.assertCounts(0, 0)
+
+    def test_recount(self):
+        """Test that drifted RSVP counters are repaired"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(coming_count=5, plus_one_count=1)
+        out = StringIO()
+        call_command('recount', stdout=out)
+        self.assertIn("Repaired the RSVP counters of 1 meetups.", out.getvalue())
+        self.assertCounts(1, 0)
+        call_command('recount', stdout=out)
+        self.assertIn("Repaired the RSVP counters of 0 meetups.", out.getvalue())
+
+    def test_waitlist(self):
+        """Test that RSVPs beyond the capacity are waitlisted and admitted as seats free up"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(capacity=3)
+        bar, baz, qux = [SystersUser.objects.get(user=User.objects.create(username=name))
+                         for name in ('bar', 'baz', 'qux')]
+        rsvp, status = save_rsvp(self.meetup, bar, True, True)
+        self.assertEqual(status, RSVP_CONFIRMED)
+        self.assertCounts(2, 1)
+        baz_rsvp, status = save_rsvp(self.meetup, baz, True, False)
+        self.assertEqual(status, RSVP_WAITLISTED)
+        qux_rsvp, status = save_rsvp(self.meetup, qux, True, True)
+        self.assertEqual(status, RSVP_WAITLISTED)
+        self.assertCounts(2, 1)
+        self.assertEqual(save_rsvp(self.meetup, self.systers_user, True, True)[1], RSVP_FULL)
+        self.assertFalse(Rsvp.objects.get(pk=self.rsvp.pk).plus_one)
+
+        # Waitlisted RSVPs are admitted in order, as long as they fit
+        rsvp, status = save_rsvp(self.meetup, bar, True, False)
+        self.assertEqual(status, RSVP_CONFIRMED)
+        self.assertFalse(Rsvp.objects.get(pk=baz_rsvp.pk).waitlisted)
+        self.assertTrue(Rsvp.objects.get(pk=qux_rsvp.pk).waitlisted)
+        self.assertCounts(3, 0)
+
+        rsvp.delete()
+        self.rsvp.delete()
+        self.assertEqual(promote_waitlist(self.meetup.pk), [qux_rsvp.pk])
+        self.assertCounts(2, 1)
+        self.assertEqual(promote_waitlist(self.meetup.pk), [])
+
+    def test_waitlist_fewer_seats(self):
+        """Test that a waitlisted user asking for fewer seats is admitted once they fit"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(capacity=2)
+        bar, baz = [SystersUser.objects.get(user=User.objects.create(username=name))
+                    for name in ('bar', 'baz')]
+        bar_rsvp, status = save_rsvp(self.meetup, bar, True, True)
+        self.assertEqual(status, RSVP_WAITLISTED)
+        baz_rsvp, status = save_rsvp(self.meetup, baz, True, True)
+        self.assertEqual(status, RSVP_WAITLISTED)
+
+        # An RSVP which fits is admitted even if an earlier one does not
+        baz_rsvp, status = save_rsvp(self.meetup, baz, True, False)
+        self.assertEqual(status, RSVP_CONFIRMED)
+        self.assertFalse(baz_rsvp.waitlisted)
+        self.assertTrue(Rsvp.objects.get(pk=bar_rsvp.pk).waitlisted)
+        self.assertCounts(2, 0)
+
+    def test_rsvp_created_concurrently(self):
+        """Test that an RSVP created by another request of the same user is updated"""
+        bar = SystersUser.objects.get(user=User.objects.create(username='bar'))
+
+        def get_stale_rsvp(meetup, systers_user):
+            # The RSVP was looked for before the other request created it
+            return Rsvp(user=systers_user, meetup=meetup, coming=False, plus_one=False)
+
+        Rsvp.objects.create(user=bar, meetup=self.meetup, coming=False)
+        lookups = iter([get_stale_rsvp, get_rsvp])
+        with mock.patch('meetup.utils.get_rsvp', side_effect=lambda *args: next(lookups)(*args)):
+            rsvp, status = save_rsvp(self.meetup, bar, True, True)
+        self.assertEqual(status, RSVP_CONFIRMED)
+        self.assertEqual(Rsvp.objects.filter(user=bar).count(), 1)
+        self.assertTrue(Rsvp.objects.get(user=bar).plus_one)
+        self.assertCounts(2, 1)
+
+    def test_interleaved_rsvps(self):
+        """Test that an RSVP waiting for the meetup lock of another RSVP sees its seats"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(capacity=3)
+        bar, baz = [SystersUser.objects.get(user=User.objects.create(username=name))
+                    for name in ('bar', 'baz')]
+        # Both requests loaded the meetup while two seats were left
+        bar_meetup, baz_meetup = Meetup.objects.get(pk=self.meetup.pk), \
+            Meetup.objects.get(pk=self.meetup.pk)
+        results = []
+
+        def lock_after_other_request(meetup_id):
+            # The other request took the lock first, so this one gets it once that one is done
+            if not results:
+                results.append(save_rsvp(baz_meetup, baz, True, True))
+            return lock_meetup(meetup_id)
+
+        with mock.patch('meetup.utils.lock_meetup', side_effect=lock_after_other_request):
+            results.append(save_rsvp(bar_meetup, bar, True, True))
+        self.assertEqual([status for rsvp, status in results], [RSVP_CONFIRMED, RSVP_WAITLISTED])
+        self.assertCounts(2, 1)
+
+    def test_raise_capacity(self):
+        """Test that raising the capacity admits the waitlisted RSVPs"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(capacity=1)
+        bar = SystersUser.objects.get(user=User.objects.create(username='bar'))
+        rsvp, status = save_rsvp(self.meetup, bar, True, False)
+        self.assertEqual(status, RSVP_WAITLISTED)
+        Meetup.objects.filter(pk=self.meetup.pk).update(capacity=None)
+        self.assertEqual(promote_waitlist(self.meetup.pk), [rsvp.pk])
+        self.assertCounts(2, 0)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class RsvpCapacityTestCase(MeetupBaseTestCase, TransactionTestCase):
+    def setUp(self):
+        super(RsvpCapacityTestCase, self).setUp()
+        self.meetup = Meetup.objects.create(title="Test Meetup", slug="baz",
+                                            date=timezone.now().date(), time=timezone.now().time(),
+                                            venue="FooBar colony",
+                                            description="This is a testing meetup.",
+                                            meetup_location=self.location,
+                                            leader=self.systers_user,
+                                            created_by=self.systers_user, capacity=50)
+        self.users = [SystersUser.objects.get(user=User.objects.create(username=str(i)))
+                      for i in range(300)]
+
+    def rsvp_all(self, users, coming=True):
+        try:
+            for i, user in enumerate(users):
+                save_rsvp(self.meetup, user, coming, coming and i % 3 == 0)
+        finally:
+            connection.close()
+
+    def run_concurrently(self, chunks, coming=True):
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            for result in [executor.submit(self.rsvp_all, chunk, coming) for chunk in chunks]:
+                result.result()
+
+    def assertNotOverbooked(self):
+        self.meetup.refresh_from_db()
+        rsvps = Rsvp.objects.filter(meetup=self.meetup, waitlisted=False)
+        seats = sum(int(rsvp.coming) + int(rsvp.plus_one) for rsvp in rsvps)
+        self.assertEqual(self.meetup.coming_count + self.meetup.plus_one_count, seats)
+        self.assertLessEqual(seats, self.meetup.capacity)
+        return seats
+
+    def test_concurrent_rsvps(self):
+        """Test that concurrent RSVPs do not overbook a meetup"""
+        self.run_concurrently([self.users[i::8] for i in range(8)])
+        self.assertGreaterEqual(self.assertNotOverbooked(), self.meetup.capacity - 1)
+        self.assertEqual(Rsvp.objects.filter(meetup=self.meetup).count(), 300)
+
+        # Cancellations let the waitlisted RSVPs in, still without overbooking
+        admitted = Rsvp.objects.filter(meetup=self.meetup, waitlisted=False, coming=True)
+        cancelled = [rsvp.user for rsvp in admitted[:20]]
+        self.run_concurrently([cancelled[i::4] for i in range(4)], coming=False)
+        self.assertGreaterEqual(self.assertNotOverbooked(), self.meetup.capacity - 1)
+
 
 class SupportRequestTestCase(MeetupBaseTestCase, TestCase):
     def setUp(self):
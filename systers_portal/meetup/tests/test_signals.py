@@ -2,7 +2,7 @@ from django.utils import timezone
 
 from django.test import TestCase
 from django.contrib.auth.models import Group, User
-from django.db.models.signals import post_save, post_delete, post_migrate
+from django.db.models.signals import post_save, pre_delete, post_migrate
 from cities_light.models import City, Country
 from pinax.notifications.models import NoticeType
 
@@ -16,8 +16,8 @@ class SignalsTestCase(TestCase):
     def setUp(self):
         post_save.connect(manage_meetup_groups, sender=Meetup,
                           dispatch_uid="manage_groups")
-        post_delete.connect(remove_meetup_groups, sender=Meetup,
-                            dispatch_uid="remove_groups")
+        pre_delete.connect(remove_meetup_groups, sender=Meetup,
+                           dispatch_uid="remove_groups")
         post_migrate.connect(create_notice_types, dispatch_uid="create_notice_types")
         self.password = "foobar"
 
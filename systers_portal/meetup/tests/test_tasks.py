@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from meetup.constants import MEETING_FAILED, MEETING_PROVISIONING, MEETING_READY
+from meetup.models import Meetup
+from meetup.tasks import (provision_due_meetings, provision_meeting,
+                          provision_meeting_on_commit)
+from meetup.tests.fake_zoom import FakeZoomServer
+from meetup.tests.test_models import MeetupBaseTestCase
+from meetup.zoom import ZoomClient
+
+
+@override_settings(ZOOM_PROVISION_ATTEMPTS=2)
+class ProvisionMeetingTestCase(MeetupBaseTestCase, TestCase):
+    def setUp(self):
+        super(ProvisionMeetingTestCase, self).setUp()
+        self.zoom = FakeZoomServer()
+        self.zoom.__enter__()
+        self.addCleanup(self.zoom.__exit__, None, None, None)
+        client = ZoomClient(self.zoom.url, self.zoom.api_key, self.zoom.api_secret,
+                            retries=0, backoff=0)
+        self.addCleanup(client.close)
+        patcher = mock.patch('meetup.utils.get_zoom_client', return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.meetup = Meetup.objects.create(title="Virtual Meetup", slug="foo",
+                                            date=timezone.now().date(),
+                                            time=timezone.now().time(), is_virtual=True,
+                                            description="This is a virtual meetup.",
+                                            created_by=self.systers_user,
+                                            leader=self.systers_user)
+
+    @mock.patch('meetup.tasks.schedule_provisioning')
+    def test_provision_meeting(self, schedule_provisioning):
+        """Test that the meeting is created and then updated in the background"""
+        provision_meeting_on_commit(self.meetup)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.meeting_status, MEETING_PROVISIONING)
+        self.assertEqual(self.meetup.meet_link, None)
+
+        provision_meeting(self.meetup.pk)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.meeting_status, MEETING_READY)
+        self.assertEqual(self.meetup.meet_link, 'https://zoom.us/j/1000')
+        self.assertEqual(self.meetup.meeting_id, '1000')
+
+        provision_meeting(self.meetup.pk)
+        self.assertEqual(len(self.zoom.requests), 1)
+
+        Meetup.objects.filter(pk=self.meetup.pk).update(title="Renamed Meetup")
+        provision_meeting_on_commit(self.meetup)
+        provision_meeting(self.meetup.pk)
+        self.assertEqual(self.zoom.meetings[1000]['topic'], "Renamed Meetup")
+        self.assertEqual(len(self.zoom.meetings), 1)
+        schedule_provisioning.assert_not_called()
+
+    @mock.patch('meetup.tasks.schedule_provisioning')
+    def test_retry(self, schedule_provisioning):
+        """Test that a failed provisioning is retried and then marked as failed"""
+        provision_meeting_on_commit(self.meetup)
+        self.zoom.fail(400, times=2)
+        provision_meeting(self.meetup.pk)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.meeting_attempts, 1)
+        self.assertEqual(schedule_provisioning.call_count, 1)
+        self.assertEqual(schedule_provisioning.call_args[0][0], self.meetup.pk)
+
+        # The retry is not due yet
+        provision_meeting(self.meetup.pk)
+        self.assertEqual(len(self.zoom.requests), 1)
+
+        Meetup.objects.filter(pk=self.meetup.pk).update(meeting_retry_at=timezone.now())
+        provision_meeting(self.meetup.pk)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.meeting_status, MEETING_FAILED)
+        self.assertEqual(schedule_provisioning.call_count, 1)
+        self.assertEqual(self.zoom.meetings, {})
+
+    def test_provision_due_meetings(self):
+        """Test that the sweep provisions lost and failed meetings of upcoming meetups"""
+        # The scheduler of this process was never started, so nothing is scheduled
+        provision_meeting_on_commit(self.meetup)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.meeting_status, MEETING_PROVISIONING)
+        now = timezone.now()
+        self.assertEqual(provision_due_meetings(now), [self.meetup.pk])
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.meeting_status, MEETING_READY)
+        self.assertIsNone(self.meetup.meeting_retry_at)
+        self.assertEqual(provision_due_meetings(now), [])
+
+        Meetup.objects.filter(pk=self.meetup.pk).update(
+            meeting_status=MEETING_FAILED, meeting_attempts=2,
+            meeting_retry_at=now + timezone.timedelta(hours=1))
+        self.assertEqual(provision_due_meetings(now), [])
+        Meetup.objects.filter(pk=self.meetup.pk).update(meeting_retry_at=now)
+        self.assertEqual(provision_due_meetings(now), [self.meetup.pk])
+        self.assertEqual(Meetup.objects.get(pk=self.meetup.pk).meeting_status, MEETING_READY)
+
+        # Meetups which took place are left alone
+        Meetup.objects.filter(pk=self.meetup.pk).update(
+            meeting_status=MEETING_FAILED, meeting_retry_at=now,
+            date=(now - timezone.timedelta(days=2)).date())
+        self.assertEqual(provision_due_meetings(now), [])
+
+    def test_provision_deleted_meetup(self):
+        """Test that a meetup deleted after its meeting was claimed is skipped"""
+        meetup_id = self.meetup.pk
+        self.meetup.delete()
+        with mock.patch('meetup.tasks.claim_meeting', return_value=1):
+            provision_meeting(meetup_id)
+        self.assertEqual(self.zoom.requests, [])
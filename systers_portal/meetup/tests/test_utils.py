@@ -1,38 +1,71 @@
-from django.test import TestCase
+from collections import namedtuple
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Group, User
+from django.core import mail
 from guardian.shortcuts import get_perms
 from cities_light.models import City, Country
 
 from django.utils import timezone
-from meetup.models import Meetup
+from common.mail import send_outbox
+from common.models import OutgoingEmail
+from meetup.models import Meetup, GeocodedLocation, Rsvp
 from meetup.permissions import groups_templates, group_permissions
-from meetup.utils import (create_groups, assign_permissions, remove_groups)
-from users.models import SystersUser
+from meetup.utils import (create_groups, assign_permissions, remove_groups, get_groups, geocode,
+                          get_client_location, locate_ip, notify_time, send_reminder,
+                          send_due_reminders)
+from users.models import SystersUser, UserSetting
 
 
 class UtilsTestCase(TestCase):
+    def create_meetup(self, title):
+        user = User.objects.create_user(username='bar', password='foobar')
+        return Meetup.objects.create(title=title, slug='foo', date=timezone.now().date(),
+                                     time=timezone.now().time(), description='Foo',
+                                     created_by=user.systersuser, leader=user.systersuser)
+
     def test_create_groups(self):
-        """Test the creation of groups according to a name"""
+        """Test the creation of the groups of a meetup"""
         name = "Foo"
-        groups = create_groups(name)
+        meetup = self.create_meetup(name)
+        groups = create_groups(meetup)
         expected_group_names = []
         for key, group_name in groups_templates.items():
             expected_group_names.append(group_name.format(name))
         group_names = []
-        for group in groups:
+        for group in groups.values():
             group_names.append(group.name)
         self.assertCountEqual(list(expected_group_names), group_names)
 
-        meetup_groups = Group.objects.filter(name__startswith=name)
-        self.assertCountEqual(meetup_groups, groups)
+        meetup_groups = Group.objects.filter(meetup_roles__meetup=meetup)
+        self.assertCountEqual(meetup_groups, groups.values())
+        self.assertEqual(meetup.role_groups.count(), len(groups_templates))
+
+    def test_create_groups_same_title(self):
+        """Test that meetups with the same title do not share groups"""
+        meetup = self.create_meetup("Foo")
+        groups = create_groups(meetup)
+        other_meetup = Meetup.objects.create(title="Foo", slug='foo-2', date=meetup.date,
+                                             time=meetup.time, description='Foo',
+                                             created_by=meetup.created_by,
+                                             leader=meetup.leader)
+        other_groups = create_groups(other_meetup)
+        for key, group_name in groups_templates.items():
+            self.assertEqual(other_groups[key].name, "{0} ({1})".format(
+                group_name.format("Foo"), other_meetup.pk))
+        remove_groups(other_meetup)
+        self.assertCountEqual(get_groups(meetup), groups.values())
 
     def test_remove_groups(self):
-        """Test the removal of groups according to a name"""
-        name = "Foo"
-        create_groups(name)
-        remove_groups(name)
-        meetup_groups = Group.objects.filter(name__startswith=name)
-        self.assertEqual(list(meetup_groups), [])
+        """Test the removal of the groups of a meetup"""
+        meetup = self.create_meetup("Foo")
+        create_groups(meetup)
+        remove_groups(meetup)
+        self.assertEqual(list(get_groups(meetup)), [])
+        self.assertEqual(list(Group.objects.filter(name__startswith="Foo")), [])
 
     def test_assign_permissions(self):
         """Test assignment of permissions to meetup location groups"""
@@ -51,11 +84,175 @@ class UtilsTestCase(TestCase):
                                        leader=systers_user,
                                        last_updated=timezone.now())
         title = meetup.title
-        groups = create_groups(title)
-        assign_permissions(meetup, groups)
+        with CaptureQueriesContext(connection) as queries:
+            groups = create_groups(meetup)
+            assign_permissions(meetup, groups)
+        self.assertLessEqual(len(queries), 8)
         for key, value in group_permissions.items():
             group = Group.objects.get(name=groups_templates[key].format(title))
             group_perms = [p.codename for p in
                            list(group.permissions.all())]
             group_perms += get_perms(group, meetup)
             self.assertCountEqual(group_perms, value)
+
+
+class NotificationTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.systers_users = []
+        for i in range(5):
+            user = User.objects.create_user(username='foo{0}'.format(i), password='foobar',
+                                            email='foo{0}@test.com'.format(i))
+            self.systers_users.append(SystersUser.objects.get(user=user))
+        self.meetup = Meetup.objects.create(title='Foo Bar Baz', slug='foo-bar-baz',
+                                            date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            description='This is test Meetup',
+                                            meetup_location=location,
+                                            created_by=self.systers_users[0],
+                                            leader=self.systers_users[0])
+        for systers_user in self.systers_users:
+            Rsvp.objects.create(user=systers_user, meetup=self.meetup)
+        UserSetting.objects.filter(user__in=self.systers_users[:4]).update(reminder=True)
+
+    def test_send_reminder(self):
+        """Test that reminders are sent only to the users who enabled them"""
+        with self.settings(EMAIL_BATCH_SIZE=3):
+            self.assertEqual(send_reminder(self.meetup, timezone.now()), 4)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(send_outbox(rate=0), (4, 0))
+        self.assertCountEqual([email.to[0] for email in mail.outbox],
+                              ['foo0@test.com', 'foo1@test.com', 'foo2@test.com',
+                               'foo3@test.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Reminder for Foo Bar Baz')
+        self.assertIn('Foo Bar Baz', mail.outbox[0].alternatives[0][0])
+
+    def test_send_reminder_twice(self):
+        """Test that a reminder queued twice is sent once"""
+        now = timezone.now()
+        send_reminder(self.meetup, now)
+        send_reminder(self.meetup, now)
+        self.assertEqual(OutgoingEmail.objects.count(), 4)
+
+    def test_notify_time_back(self):
+        """Test that moving a meetup back to its former time is notified again"""
+        UserSetting.objects.update(time_change=True)
+        changed_at = timezone.now()
+        notify_time(self.meetup, changed_at)
+        notify_time(self.meetup, changed_at)
+        self.assertEqual(OutgoingEmail.objects.count(), 5)
+        notify_time(self.meetup, changed_at + timezone.timedelta(minutes=1))
+        self.assertEqual(OutgoingEmail.objects.count(), 10)
+
+    def test_send_due_reminders(self):
+        """Test that meetups starting soon are reminded exactly once"""
+        now = timezone.now()
+        start = now + timezone.timedelta(minutes=30)
+        Meetup.objects.filter(pk=self.meetup.pk).update(date=start.date(), time=start.time())
+        self.assertEqual(send_due_reminders(now - timezone.timedelta(hours=1)), [])
+        self.assertEqual(send_due_reminders(now), [self.meetup])
+        self.assertEqual(OutgoingEmail.objects.count(), 4)
+        self.assertEqual(send_due_reminders(now), [])
+        self.assertEqual(OutgoingEmail.objects.count(), 4)
+
+        self.meetup.refresh_from_db()
+        self.meetup.save()
+        self.assertIsNotNone(Meetup.objects.get(pk=self.meetup.pk).reminder_sent)
+        start = start + timezone.timedelta(minutes=10)
+        self.meetup.date, self.meetup.time = start.date(), start.time()
+        self.meetup.save()
+        self.assertEqual(send_due_reminders(now), [self.meetup])
+        self.assertEqual(OutgoingEmail.objects.count(), 8)
+
+        start = start - timezone.timedelta(minutes=10)
+        self.meetup.date, self.meetup.time = start.date(), start.time()
+        self.meetup.save()
+        later = now + timezone.timedelta(minutes=1)
+        self.assertEqual(send_due_reminders(later), [self.meetup])
+        self.assertEqual(OutgoingEmail.objects.count(), 12)
+
+    def test_send_due_reminders_failure(self):
+        """Test that a meetup whose reminder could not be queued is reminded by the next
+        sweep"""
+        now = timezone.now()
+        start = now + timezone.timedelta(minutes=30)
+        Meetup.objects.filter(pk=self.meetup.pk).update(date=start.date(), time=start.time())
+        with mock.patch('meetup.utils.queue_mass_html_mail', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                send_due_reminders(now)
+        self.assertIsNone(Meetup.objects.get(pk=self.meetup.pk).reminder_sent)
+        self.assertEqual(send_due_reminders(now), [self.meetup])
+        self.assertEqual(OutgoingEmail.objects.count(), 4)
+
+
+class GeocodeTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        City.objects.create(name='Baz', display_name='Baz, Bar', country=country,
+                            latitude=1.5, longitude=2.5)
+
+    @mock.patch('meetup.utils.geolocator')
+    def test_geocode_city(self, geolocator):
+        """Test that known cities are resolved without the geocoding service"""
+        self.assertEqual(geocode('Baz, Bar'), (1.5, 2.5))
+        self.assertEqual(geocode('baz'), (1.5, 2.5))
+        self.assertFalse(geolocator.geocode.called)
+
+    @mock.patch('meetup.utils.geolocator')
+    def test_geocode_cache(self, geolocator):
+        """Test that answers of the geocoding service are cached until they expire"""
+        Location = namedtuple('Location', ['latitude', 'longitude'])
+        geolocator.geocode.return_value = Location(3, 4)
+        self.assertEqual(geocode('Somewhere Else'), (3, 4))
+        self.assertEqual(geocode('somewhere else '), (3, 4))
+        self.assertEqual(geolocator.geocode.call_count, 1)
+
+        geolocator.geocode.return_value = None
+        self.assertIsNone(geocode('Nowhere'))
+        self.assertIsNone(geocode('Nowhere'))
+        self.assertEqual(geolocator.geocode.call_count, 2)
+
+        expired = timezone.now() - timezone.timedelta(days=365)
+        GeocodedLocation.objects.update(date_updated=expired)
+        geolocator.geocode.return_value = Location(5, 6)
+        self.assertEqual(geocode('Somewhere Else'), (5, 6))
+        self.assertEqual(geolocator.geocode.call_count, 3)
+        self.assertEqual(list(GeocodedLocation.objects.values_list('query', flat=True)),
+                         ['somewhere else'])
+
+
+class ClientLocationTestCase(SimpleTestCase):
+    def setUp(self):
+        locate_ip.cache_clear()
+        self.factory = RequestFactory()
+
+    @override_settings(GEOIP_FALLBACK_LOCATION={'city': 'Foo', 'latitude': 1, 'longitude': 2})
+    @mock.patch('meetup.utils.get_geoip')
+    def test_fallback_location(self, get_geoip):
+        """Test that private addresses get the fallback location without a GeoIP lookup"""
+        request = self.factory.get('/', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(get_client_location(request),
+                         {'city': 'Foo', 'latitude': 1, 'longitude': 2})
+        get_geoip.assert_not_called()
+
+    @mock.patch('meetup.utils.get_geoip')
+    def test_locate_ip_cache(self, get_geoip):
+        """Test that the location of an address is read from the database only once"""
+        get_geoip.return_value.city.return_value = {'city': 'Bar', 'latitude': 3,
+                                                    'longitude': 4, 'country_code': 'BR'}
+        request = self.factory.get('/', REMOTE_ADDR='8.8.8.8')
+        expected = {'city': 'Bar', 'latitude': 3, 'longitude': 4}
+        self.assertEqual(get_client_location(request), expected)
+        self.assertEqual(get_client_location(request), expected)
+        get_geoip.return_value.city.assert_called_once_with('8.8.8.8')
+
+    @override_settings(GEOIP_FALLBACK_LOCATION={'city': 'Foo', 'latitude': 1, 'longitude': 2})
+    @mock.patch('meetup.utils.get_geoip')
+    def test_locate_ip_no_coordinates(self, get_geoip):
+        """Test that an address without coordinates gets the fallback location"""
+        get_geoip.return_value.city.return_value = {'city': None, 'latitude': None,
+                                                    'longitude': None, 'country_code': 'BR'}
+        request = self.factory.get('/', REMOTE_ADDR='8.8.8.8')
+        self.assertEqual(get_client_location(request),
+                         {'city': 'Foo', 'latitude': 1, 'longitude': 2})
@@ -6,8 +6,9 @@ from django.utils import timezone
 from cities_light.models import City, Country
 from django.contrib.contenttypes.models import ContentType
 
+from meetup.constants import RSVP_FULL_MSG, RSVP_WAITLISTED_MSG
 from meetup.models import (Meetup, Rsvp, SupportRequest,
-                           RequestMeetup)
+                           RequestMeetup, GeocodedLocation)
 from users.models import SystersUser
 from common.models import Comment
 
@@ -58,6 +59,27 @@ class AllUpcomingMeetupsViewTestCase(MeetupBaseCase, TestCase):
         self.assertEqual(len(response.context['meetup_list']), 2)
 
 
+class CityLookupViewTestCase(MeetupBaseCase, TestCase):
+    def test_lookup_cities(self):
+        """Test that cities starting with the query are returned by population"""
+        country = self.meetup_location.country
+        # cities_light sets the display name of a city to "name, country" as it is saved
+        foobar = City.objects.create(name='Foobar', country=country, population=100)
+        City.objects.create(name='Barfoo', country=country)
+        url = reverse('lookup_cities')
+        response = self.client.get(url, {'query': 'fo'})
+        self.assertEqual(json.loads(response.content)['cities'],
+                         [{'id': foobar.pk, 'name': 'Foobar, Bar'},
+                          {'id': self.meetup_location.pk, 'name': 'Foo, Bar'}])
+
+        response = self.client.get(url, {'query': 'Foobar, Bar'})
+        self.assertEqual(json.loads(response.content)['cities'],
+                         [{'id': foobar.pk, 'name': 'Foobar, Bar'}])
+
+        response = self.client.get(url, {'query': 'f'})
+        self.assertEqual(json.loads(response.content), {'cities': []})
+
+
 class MeetupViewTestCase(MeetupBaseCase, TestCase):
     def test_view_meetup(self):
         """Test Meetup view for correct response"""
@@ -66,11 +88,45 @@ class MeetupViewTestCase(MeetupBaseCase, TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'meetup/meetup.html')
         self.assertEqual(response.context['meetup'], self.meetup)
+        self.assertEqual(response.context['suggested_meetups'], [])
+        self.assertEqual(response.context['coming_no'], 0)
+
+        Rsvp.objects.create(user=self.systers_user, meetup=self.meetup, plus_one=True)
+        response = self.client.get(url)
+        self.assertEqual(response.context['coming_no'], 2)
 
         nonexistent_url = reverse('view_meetup', kwargs={'slug': 'bazbar'})
         response = self.client.get(nonexistent_url)
         self.assertEqual(response.status_code, 404)
 
+    def test_meeting_status(self):
+        """Test that the provisioning status of a virtual meetup is reported"""
+        url = reverse('meeting_status', kwargs={'slug': 'foo-bar-baz'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+        Meetup.objects.filter(pk=self.meetup.pk).update(is_virtual=True,
+                                                        meeting_status='provisioning')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'status': 'provisioning', 'meet_link': None})
+
+    def test_view_meetup_suggested_meetups(self):
+        """Test that similar upcoming meetups are suggested on the Meetup view"""
+        meetup2 = Meetup.objects.create(title='Bar Baz', slug='bazbar',
+                                        date=(timezone.now() + timezone.timedelta(2)).date(),
+                                        time=timezone.now().time(),
+                                        description='This is new test Meetup',
+                                        meetup_location=self.meetup_location,
+                                        created_by=self.systers_user,
+                                        leader=self.systers_user,
+                                        last_updated=timezone.now())
+        url = reverse('view_meetup', kwargs={'slug': 'foo-bar-baz'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['suggested_meetups'], [meetup2])
+
 
 class AddMeetupViewTestCase(MeetupBaseCase, TestCase):
     def test_get_add_meetup_view(self):
@@ -650,6 +706,24 @@ class RsvpMeetupViewTestCase(MeetupBaseCase, TestCase):
         self.assertTrue(rsvp[0].user, self.systers_user)
         self.assertTrue(rsvp[0].meetup, self.meetup)
 
+    def test_post_rsvp_meetup_view_capacity(self):
+        """Test that RSVPs to a full meetup are waitlisted and a plus one is refused"""
+        Meetup.objects.filter(pk=self.meetup.pk).update(capacity=1)
+        url = reverse("rsvp_meetup", kwargs={'meetup_slug': 'foo-bar-baz'})
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(url, data={'coming': True, 'plus_one': False})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(url, data={'coming': True, 'plus_one': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response, 'form', 'plus_one', RSVP_FULL_MSG)
+        self.assertFalse(Rsvp.objects.get(user=self.systers_user).plus_one)
+
+        User.objects.create_user(username='bar', password='foobar')
+        self.client.login(username='bar', password='foobar')
+        response = self.client.post(url, data={'coming': True, 'plus_one': False}, follow=True)
+        self.assertContains(response, RSVP_WAITLISTED_MSG)
+        self.assertTrue(Rsvp.objects.get(user__user__username='bar').waitlisted)
+
 
 class RsvpGoingViewTestCase(MeetupBaseCase, TestCase):
     def setUp(self):
@@ -1141,7 +1215,10 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
                                              email='user@test.com')
         self.systers_user = SystersUser.objects.get(user=self.user)
         country = Country.objects.create(name='Bar', continent='AS')
-        self.location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.location = City.objects.create(name='Baz', display_name='Baz', country=country,
+                                            latitude=0, longitude=0)
+        City.objects.create(name='Qux', display_name='Qux, Bar', country=country,
+                            latitude=3, longitude=4)
         self.meetup = Meetup.objects.create(title='Foo Bar Baz', slug='foo-bar-baz',
                                             date=(timezone.now() + timezone.timedelta(4)).date(),
                                             time=timezone.now().time(),
@@ -1175,25 +1252,27 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
     def test_post_view(self):
         """Test post view for all search requests"""
         url = reverse('search_meetups')
-        data = {'keyword': 'Foo Baz'}
+        data = {'keyword': 'Foo Baz', 'location': 'Qux, Bar'}
         response = self.client.post(url, data, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
                          {'search_results': [{'date': self.meetup2.date.isoformat(),
                                               'meetup': 'Foo Baz',
                                               'location': 'Baz',
                                               'meetup_slug': 'foobar',
-                                              'distance': 900}],
-                          'unit': 'kilometers from your location'})
+                                              'distance': 556}],
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1})
 
-        data1 = {'keyword': 'Foo Bar'}
+        data1 = {'keyword': 'Foo Bar', 'location': 'qux'}
         response = self.client.post(url, data1, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
                          {'search_results': [{'date': self.meetup.date.isoformat(),
                                               'meetup': 'Foo Bar Baz',
                                               'location': 'Baz',
                                               'meetup_slug': 'foo-bar-baz',
-                                              'distance': 900}],
-                          'unit': 'kilometers from your location'})
+                                              'distance': 556}],
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1})
 
         data2 = {'keyword': 'Foo Bar', 'location': 'Baz'}
         response = self.client.post(url, data2, format='json')
@@ -1203,23 +1282,25 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
                                               'location': 'Baz',
                                               'meetup_slug': 'foo-bar-baz',
                                               'distance': 0}],
-                          'unit': 'kilometers from your location'})
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1})
 
-        data3 = {'keyword': 'new'}
+        data3 = {'keyword': 'new', 'location': 'Baz'}
         response = self.client.post(url, data3, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
                          {'search_results': [],
-                          'unit': ''})
+                          'unit': '', 'page': 1, 'num_pages': 1})
 
-        data4 = {'keyword': 'Foob'}
+        data4 = {'keyword': 'Foob', 'location': 'Qux'}
         response = self.client.post(url, data4, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
                          {'search_results': [{'date': self.meetup3.date.isoformat(),
                                               'meetup': 'Foob Baz',
                                               'location': 'Baz',
                                               'meetup_slug': 'foobarbaz',
-                                              'distance': 900}],
-                          'unit': 'kilometers from your location'})
+                                              'distance': 556}],
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1})
         data5 = {'keyword': 'Foo', 'location': 'Baz'}
         response = self.client.post(url, data5, format='json')
         self.assertEqual(json.loads(response.content.decode('utf-8')),
@@ -1239,4 +1320,32 @@ class UpcomingMeetupsSearchViewTestCase(MeetupBaseCase, TestCase):
                                               'meetup_slug': 'foo-bar-baz',
                                               'distance': 0},
                                              ],
-                          'unit': 'kilometers from your location'})
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1})
+
+    def test_post_view_radius(self):
+        """Test that meetups further away than the searched radius are left out"""
+        url = reverse('search_meetups')
+        data = {'keyword': 'Foob', 'location': 'Qux', 'radius': '500'}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'search_results': [], 'unit': '', 'page': 1, 'num_pages': 1})
+
+        data['radius'] = '600'
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(len(json.loads(response.content.decode('utf-8'))['search_results']), 1)
+
+    def test_post_view_cached_location(self):
+        """Test that free-text locations are resolved from the geocode cache"""
+        GeocodedLocation.objects.create(query='somewhere else', latitude=3, longitude=4)
+        url = reverse('search_meetups')
+        data = {'keyword': 'Foob', 'location': 'Somewhere Else'}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'search_results': [{'date': self.meetup3.date.isoformat(),
+                                              'meetup': 'Foob Baz',
+                                              'location': 'Baz',
+                                              'meetup_slug': 'foobarbaz',
+                                              'distance': 556}],
+                          'unit': 'kilometers from your location',
+                          'page': 1, 'num_pages': 1})
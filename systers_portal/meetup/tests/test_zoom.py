@@ -0,0 +1,129 @@
+import datetime
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from meetup.tests.fake_zoom import FakeZoomServer
+from meetup.zoom import ZoomClient, ZoomError, ZoomUnavailable
+
+
+class ZoomClientTestCase(SimpleTestCase):
+    def setUp(self):
+        self.zoom = FakeZoomServer()
+        self.zoom.__enter__()
+        self.addCleanup(self.zoom.__exit__, None, None, None)
+        self.client = ZoomClient(self.zoom.url, self.zoom.api_key, self.zoom.api_secret,
+                                 read_timeout=0.5, backoff=0, breaker_threshold=3)
+        self.addCleanup(self.client.close)
+        self.meetup = SimpleNamespace(title='Foo', description='Bar',
+                                      date=datetime.date(2030, 1, 1),
+                                      time=datetime.time(10, 30))
+
+    def test_meetings(self):
+        """Test that meetings are created, updated and read over one kept-alive connection"""
+        meeting = self.client.create_meeting('me', self.meetup)
+        self.assertEqual(meeting['topic'], 'Foo')
+        self.assertEqual(meeting['start_time'], '2030-01-01T10:30:00')
+        self.meetup.title = 'Baz'
+        self.assertIsNone(self.client.update_meeting(meeting['id'], self.meetup))
+        meeting = self.client.get_meeting(meeting['id'])
+        self.assertEqual(meeting['topic'], 'Baz')
+        self.assertEqual(meeting['join_url'], 'https://zoom.us/j/1000')
+        self.assertEqual(len(self.zoom.connections), 1)
+
+    def test_token(self):
+        """Test that the JWT is reused until it is about to expire"""
+        token = self.client.get_token()
+        expires = self.client.token_expires
+        self.assertEqual(self.client.get_token(), token)
+        self.assertEqual(self.client.token_expires, expires)
+        self.client.token_expires = time.time() + 30
+        self.client.get_token()
+        self.assertGreater(self.client.token_expires, time.time() + 60)
+
+    def test_errors(self):
+        """Test that errors returned by Zoom are raised"""
+        with self.assertRaises(ZoomError) as context:
+            self.client.get_meeting(1)
+        self.assertEqual(context.exception.status, 404)
+        self.assertEqual(str(context.exception), "Meeting does not exist.")
+
+        client = ZoomClient(self.zoom.url, self.zoom.api_key, 'wrong')
+        with self.assertRaises(ZoomError) as context:
+            client.create_meeting('me', self.meetup)
+        self.assertEqual(context.exception.status, 401)
+        client.close()
+
+    def test_retry(self):
+        """Test that failed reads are retried and failed meeting creations are not"""
+        meeting = self.client.create_meeting('me', self.meetup)
+        self.zoom.fail(500, times=2)
+        self.assertEqual(self.client.get_meeting(meeting['id'])['id'], meeting['id'])
+        self.assertEqual(len(self.zoom.requests), 4)
+
+        self.zoom.fail(500)
+        with self.assertRaises(ZoomError):
+            self.client.create_meeting('me', self.meetup)
+        self.assertEqual(len(self.zoom.meetings), 1)
+
+        self.zoom.fail(429)
+        self.client.create_meeting('me', self.meetup)
+        self.assertEqual(len(self.zoom.meetings), 2)
+
+    def test_stale_connection(self):
+        """Test that a meeting is created after the server closed the pooled connection"""
+        self.client.retries = 0
+        self.client.create_meeting('me', self.meetup)
+        self.zoom.close_connections()
+        time.sleep(0.1)
+        self.client.create_meeting('me', self.meetup)
+        self.assertEqual(len(self.zoom.meetings), 2)
+
+        # The connection may be closed after it was checked, as the request is sent
+        self.zoom.close_connections()
+        time.sleep(0.1)
+        with mock.patch('meetup.zoom.is_dropped', return_value=False):
+            self.client.create_meeting('me', self.meetup)
+        self.assertEqual(len(self.zoom.meetings), 3)
+        self.assertEqual(len(self.zoom.requests), 3)
+        self.assertEqual(len(self.zoom.connections), 3)
+
+    def test_dropped_response(self):
+        """Test that a request whose connection was closed after the server read it is only sent
+        again if it is idempotent"""
+        self.client.retries = 0
+        meeting = self.client.create_meeting('me', self.meetup)
+        self.zoom.drop()
+        with self.assertRaises(ZoomError):
+            self.client.create_meeting('me', self.meetup)
+        self.assertEqual(len(self.zoom.meetings), 2)
+        self.assertEqual(len(self.zoom.requests), 2)
+
+        self.client.get_meeting(meeting['id'])
+        self.zoom.drop()
+        self.assertEqual(self.client.get_meeting(meeting['id'])['id'], meeting['id'])
+        self.assertEqual(len(self.zoom.requests), 5)
+
+    def test_timeout(self):
+        """Test that a slow response times out"""
+        self.client.retries = 0
+        self.zoom.delay = 1
+        with self.assertRaises(ZoomError):
+            self.client.get_meeting(1)
+
+    def test_circuit_breaker(self):
+        """Test that Zoom is not called for a while after it failed repeatedly"""
+        self.client.retries = 0
+        self.zoom.fail(503, times=3)
+        for i in range(3):
+            with self.assertRaises(ZoomError):
+                self.client.get_meeting(1)
+        with self.assertRaises(ZoomUnavailable):
+            self.client.get_meeting(1)
+        self.assertEqual(len(self.zoom.requests), 3)
+
+        self.client.breaker.timeout = 0
+        meeting = self.client.create_meeting('me', self.meetup)
+        self.assertEqual(self.client.get_meeting(meeting['id'])['id'], meeting['id'])
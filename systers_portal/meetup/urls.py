@@ -11,7 +11,8 @@ from .views import (MeetupView, AddMeetupView, DeleteMeetupView,
                     ApproveRequestMeetupView, RejectMeetupRequestView, ApiForVmsView,
                     AllUpcomingMeetupsView, AddSupportRequestCommentView,
                     EditSupportRequestCommentView, DeleteSupportRequestCommentView,
-                    UpcomingMeetupsSearchView, AddResourceView, RequestVirtualMeetupView)
+                    UpcomingMeetupsSearchView, AddResourceView, RequestVirtualMeetupView,
+                    CityLookupView, MeetingStatusView)
 
 urlpatterns = [
     url(r'^upcoming/$', UpcomingMeetupsView.as_view(),
@@ -39,6 +40,8 @@ urlpatterns = [
         RejectMeetupRequestView.as_view(), name="reject_meetup_request"),
     url(r'^all/search/$', UpcomingMeetupsSearchView.as_view(),
         name='search_meetups'),
+    url(r'^all/cities/$', CityLookupView.as_view(),
+        name='lookup_cities'),
     url(r'^all/$', AllUpcomingMeetupsView.as_view(),
         name='all_upcoming_meetups'),
     url(r'^(?P<meetup_slug>[\w-]+)/add_comment/$', AddMeetupCommentView.as_view(),
@@ -88,6 +91,8 @@ urlpatterns = [
         r'(?P<comment_pk>\d+)/$',
         DeleteSupportRequestCommentView.as_view(),
         name="delete_support_request_comment"),
+    url(r'^(?P<slug>[\w-]+)/meeting_status/$', MeetingStatusView.as_view(),
+        name="meeting_status"),
     url(r'^(?P<slug>[\w-]+)/$', MeetupView.as_view(), name="view_meetup"),
     url(r'^api/v1/request_meetup_data/$', ApiForVmsView.as_view(), name='vms_api'),
 ]
@@ -1,200 +1,498 @@
-from django.contrib.auth.models import Group, Permission
-from django.core.mail import send_mail
-from django.db import transaction
-from django.template.loader import render_to_string
+from functools import lru_cache
+from itertools import islice
+from threading import Lock
 
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.contrib.gis.geoip2 import GeoIP2, GeoIP2Exception
+from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.loader import get_template
+from django.utils import timezone
+from cities_light.models import City
+from geopy import Nominatim
+from geopy.exc import GeopyError
+from geoip2.errors import AddressNotFoundError
+from ipware import get_client_ip
+
+from common.models import OutgoingEmail
+from community.utils import create_role_groups
+from meetup.constants import RSVP_CONFIRMED, RSVP_FULL, RSVP_WAITLISTED
 from meetup.permissions import groups_templates, group_permissions
 
-from meetup.models import Rsvp
+from meetup.models import GeocodedLocation, Meetup, MeetupGroup, Rsvp
+from meetup.zoom import get_zoom_client
 
-from users.models import UserSetting
+from users.models import SystersUser
 
 from systers_portal.settings.dev import FROM_EMAIL
-import http.client
-import jwt
 import datetime
-import json
 
-from systers_portal.settings.base import ZOOM_API_KEY,\
-    ZOOM_API_SECRET, ZOOM_USER_ID
+from systers_portal.settings.base import ZOOM_USER_ID
 
 
 @transaction.atomic
 def create_groups(meetup):
-    """Create groups for a Meetup Location instance using its name
+    """Create the role groups of a Meetup instance, named after its title, and map them to the
+    meetup
 
-    :param meetup:
-    :param meetup_location: string name of meetup location
-    :return: list of meetup location Group objects
+    :param meetup: Meetup object
+    :return: dict of meetup Group objects by role
     """
-    meetup_groups = []
-    for key, group_name in groups_templates.items():
-        group, created = Group.objects.get_or_create(
-            name=group_name.format(meetup))
-        meetup_groups.append(group)
-    return meetup_groups
+    names = {role: group_name.format(meetup.title)
+             for role, group_name in groups_templates.items()}
+    return create_role_groups(meetup, names, MeetupGroup)
 
 
 @transaction.atomic
 def remove_groups(meetup):
-    """Remove groups for a particular Meetup Location instance using its name
+    """Remove the role groups of a Meetup instance
+
+    :param meetup: Meetup object
     """
-    name = "{0}:".format(meetup)
-    Group.objects.filter(name__startswith=name).delete()
+    get_groups(meetup).delete()
 
 
 def get_groups(meetup):
-    """Get groups of a particular Meetup Location instance using its name
+    """Get the role groups of a Meetup instance
 
-    :param meetup:
-    :return: list of Group objects
+    :param meetup: Meetup object
+    :return: QuerySet of Group objects
     """
-    name = "{0}:".format(meetup)
-    return Group.objects.filter(name__startswith=name)
+    return Group.objects.filter(meetup_roles__meetup=meetup)
 
 
 def assign_permissions(meetup, groups):
-    """Assign row-level permissions to meetup location groups and meetup location object
-    :param groups: list of Group objects
+    """Assign permissions to meetup location groups. All permissions are looked up in a single
+    query and granted in bulk.
+
+    :param groups: dict of Group objects by role
+    """
+    codenames = set(perm for perms in group_permissions.values() for perm in perms)
+    permissions = {}
+    for permission in Permission.objects.filter(codename__in=codenames).order_by('pk'):
+        permissions.setdefault(permission.codename, permission)
+    group_perms = []
+    for key, group in groups.items():
+        group_perms.extend(Group.permissions.through(group=group, permission=permissions[perm])
+                           for perm in group_permissions[key])
+    Group.permissions.through.objects.bulk_create(group_perms, ignore_conflicts=True)
+
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most size items
+
+    :param iterable: iterable to split
+    :param size: integer maximum length of the lists
+    :return: generator of lists
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def build_html_mail(subject, message, template, recipient, context):
+    """Build an email with an html alternative for a user
+
+    :param subject: string subject of the email
+    :param message: string plain text body of the email
+    :param template: loaded Template object of the html body
+    :param recipient: SystersUser object, added to the context as user
+    :param context: dict context of the html body
+    :return: EmailMultiAlternatives object
+    """
+    email = EmailMultiAlternatives(subject, message, FROM_EMAIL, [recipient.user.email])
+    email.attach_alternative(template.render(dict(context, user=recipient)), 'text/html')
+    return email
+
+
+def queue_mass_html_mail(subject, message, template_name, recipients, context=None, key=None):
+    """Queue an html email to each of the recipients in the outbox, in batches of
+    EMAIL_BATCH_SIZE. The template is loaded once and rendered with the recipient added to the
+    shared context as user.
+
+    :param subject: string subject of the emails
+    :param message: string plain text body of the emails
+    :param template_name: string name of the html template
+    :param recipients: iterable of SystersUser objects with their users selected
+    :param context: dict context shared by all the emails
+    :param key: string deduplication key of the notification, extended with the recipient
+    :return: number of queued emails
+    """
+    template = get_template(template_name)
+    context = context or {}
+    queued = 0
+    for batch in chunked(recipients, settings.EMAIL_BATCH_SIZE):
+        batch = [recipient for recipient in batch if recipient.user.email]
+        messages = [build_html_mail(subject, message, template, recipient, context)
+                    for recipient in batch]
+        keys = ['{0}:{1}'.format(key, recipient.pk) for recipient in batch] if key else None
+        OutgoingEmail.objects.enqueue(messages, keys)
+        queued += len(messages)
+    return queued
+
+
+def get_rsvp_recipients(meetup, setting):
+    """Get the users who rsvp'd for a meetup and enabled a notification setting
+
+    :param meetup: Meetup object
+    :param setting: string name of the BooleanField of UserSetting
+    :return: QuerySet of SystersUser objects
+    """
+    return SystersUser.objects.filter(
+        rsvp__meetup=meetup, rsvp__waitlisted=False,
+        **{'usersetting__{0}'.format(setting): True}
+    ).select_related('user').distinct()
+
+
+def update_rsvp_counts(meetup_id, coming=0, plus_one=0):
+    """Add to the RSVP counters of a meetup in a single UPDATE, so that concurrent RSVPs are
+    all counted
+
+    :param meetup_id: integer id of the Meetup
+    :param coming: integer change of the number of RSVPs coming
+    :param plus_one: integer change of the number of RSVPs with a plus one
+    """
+    if coming or plus_one:
+        Meetup.objects.filter(pk=meetup_id).update(coming_count=F('coming_count') + coming,
+                                                   plus_one_count=F('plus_one_count') + plus_one)
+
+
+def lock_meetup(meetup_id):
+    """Lock the row of a meetup until the end of the transaction, which serializes the RSVPs
+    to the meetup, and get its capacity and RSVP counters
+
+    :param meetup_id: integer id of the Meetup
+    :return: Meetup object or None if it does not exist
     """
-    for key, group_name in groups_templates.items():
-        group = next(
-            g for g in groups if g.name == group_name.format(meetup.title))
-        for perm in group_permissions[key]:
-            group.permissions.add(Permission.objects.filter(codename=perm).first())
-            group.save()
+    return Meetup.objects.select_for_update().only(
+        'capacity', 'coming_count', 'plus_one_count').filter(pk=meetup_id).first()
+
+
+def get_rsvp(meetup, systers_user):
+    """Get the RSVP of a user to a meetup
+
+    :param meetup: Meetup object
+    :param systers_user: SystersUser object
+    :return: Rsvp object, unsaved if the user did not RSVP yet
+    """
+    rsvp = Rsvp.objects.filter(user=systers_user, meetup_id=meetup.pk).first()
+    if rsvp is None:
+        rsvp = Rsvp(user=systers_user, meetup=meetup, coming=False, plus_one=False)
+    return rsvp
+
+
+@transaction.atomic
+def save_rsvp(meetup, systers_user, coming, plus_one):
+    """RSVP a user to a meetup. If the meetup has a capacity and not enough seats are left,
+    the RSVP is put on the waitlist. A user already on the waitlist keeps their place there,
+    and is admitted as soon as their RSVP fits. RSVPs which give up seats let waitlisted RSVPs
+    take them.
+
+    :param meetup: Meetup object
+    :param systers_user: SystersUser object
+    :param coming: bool whether the user is coming
+    :param plus_one: bool whether the user brings a plus one
+    :return: tuple of the Rsvp object and a string status: RSVP_CONFIRMED, RSVP_WAITLISTED or
+             RSVP_FULL if the user was admitted and there is no seat left for the extra seat
+             they asked for, in which case the RSVP is not changed
+    :raises Meetup.DoesNotExist: if the meetup was deleted
+    """
+    locked_meetup = lock_meetup(meetup.pk)
+    if locked_meetup is None:
+        raise Meetup.DoesNotExist("The meetup was deleted.")
+    try:
+        with transaction.atomic():
+            return apply_rsvp(locked_meetup, meetup, systers_user, coming, plus_one)
+    except IntegrityError:
+        # The same user RSVP'd in another request, which created the RSVP first
+        return apply_rsvp(locked_meetup, meetup, systers_user, coming, plus_one)
+
+
+def apply_rsvp(locked_meetup, meetup, systers_user, coming, plus_one):
+    """Save the RSVP of a user to a meetup whose row is locked, as save_rsvp() describes
+
+    :param locked_meetup: Meetup object returned by lock_meetup()
+    :return: tuple of the Rsvp object and a string status
+    """
+    rsvp = get_rsvp(meetup, systers_user)
+    held = sum(rsvp.get_seats()) if rsvp.pk else 0
+    was_waitlisted = rsvp.pk is not None and rsvp.waitlisted
+    seats = int(coming) + int(plus_one)
+    seats_left = locked_meetup.get_seats_left()
+    if seats == 0 or seats_left is None:
+        waitlisted = False
+    elif was_waitlisted:
+        # promote_waitlist() below admits the RSVP if it fits now
+        waitlisted = True
+    elif seats <= seats_left + held:
+        waitlisted = False
+    elif held:
+        return rsvp, RSVP_FULL
+    else:
+        waitlisted = True
+    rsvp.coming, rsvp.plus_one, rsvp.waitlisted = coming, plus_one, waitlisted
+    rsvp.save()
+    if (waitlisted and was_waitlisted) or sum(rsvp.get_seats()) < held:
+        if rsvp.pk in promote_waitlist(meetup.pk):
+            rsvp.waitlisted = False
+            rsvp.snapshot()
+    return rsvp, RSVP_WAITLISTED if rsvp.waitlisted else RSVP_CONFIRMED
+
+
+@transaction.atomic
+def promote_waitlist(meetup_id):
+    """Admit the waitlisted RSVPs of a meetup which fit in the seats left, in the order they
+    were made. An RSVP which does not fit lets the next ones in. They are admitted together
+    with a single UPDATE.
+
+    :param meetup_id: integer id of the Meetup
+    :return: list of integer ids of the admitted Rsvp objects
+    """
+    meetup = lock_meetup(meetup_id)
+    if meetup is None:
+        return []
+    seats_left = meetup.get_seats_left()
+    waitlist = Rsvp.objects.filter(meetup_id=meetup_id, waitlisted=True).order_by('pk')
+    admitted = []
+    coming = plus_one = 0
+    for pk, rsvp_coming, rsvp_plus_one in waitlist.values_list(
+            'pk', 'coming', 'plus_one').iterator():
+        if seats_left == 0:
+            break
+        seats = int(rsvp_coming) + int(rsvp_plus_one)
+        if seats_left is not None:
+            if seats > seats_left:
+                continue
+            seats_left -= seats
+        admitted.append(pk)
+        coming += int(rsvp_coming)
+        plus_one += int(rsvp_plus_one)
+    if admitted:
+        Rsvp.objects.filter(pk__in=admitted).update(waitlisted=False)
+        update_rsvp_counts(meetup_id, coming, plus_one)
+    return admitted
+
+
+def get_rsvp_count(**filters):
+    """Get a subquery counting the admitted RSVPs of a meetup which match filters
+
+    :return: expression to annotate or update Meetup objects with
+    """
+    rsvps = Rsvp.objects.filter(meetup=OuterRef('pk'), waitlisted=False, **filters)
+    rsvps = rsvps.order_by().values('meetup')
+    count = rsvps.annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(count, output_field=IntegerField()), 0)
+
 
+def recount_rsvps():
+    """Repair the RSVP counters of the meetups whose counters drifted from their RSVPs
 
-def send_reminder(meetup):
-    rsvp_list = Rsvp.objects.filter(meetup=meetup)
+    :return: integer number of repaired meetups
+    """
+    coming_count = get_rsvp_count(coming=True)
+    plus_one_count = get_rsvp_count(plus_one=True)
+    drifted = Meetup.objects.annotate(actual_coming=coming_count,
+                                      actual_plus_one=plus_one_count).exclude(
+        coming_count=F('actual_coming'), plus_one_count=F('actual_plus_one'))
+    return Meetup.objects.filter(pk__in=list(drifted.values_list('pk', flat=True))).update(
+        coming_count=coming_count, plus_one_count=plus_one_count)
+
+
+def send_reminder(meetup, sent_at):
+    """Queue the reminder of a meetup. The reminder is deduplicated by the time it was marked
+    as sent, so that a meetup rescheduled back to an earlier slot is reminded again.
+
+    :param meetup: Meetup object
+    :param sent_at: aware datetime object the reminder_sent mark was set to
+    :return: integer number of queued emails
+    """
     subject = "Reminder for {0}".format(meetup)
-    for rsvp in rsvp_list:
-        setting = UserSetting.objects.get(user=rsvp.user)
-        if setting.reminder:
-            html_text = render_to_string("meetup/reminder.html",
-                                         context={'meetup': meetup,
-                                                  'user': rsvp.user})
-            send_mail(
-                subject,
-                'Reminder Mail',
-                FROM_EMAIL,
-                [rsvp.user.user.email],
-                html_message=html_text,
-            )
-
-
-def notify_location(meetup):
-    rsvp_list = Rsvp.objects.filter(meetup=meetup)
-    subject = "Notification for change in location for {0}".format(meetup)
-    for rsvp in rsvp_list:
-        setting = UserSetting.objects.get(user=rsvp.user)
-        if setting.location_change:
-            html_text = render_to_string("meetup/location_change_email.html",
-                                         context={'meetup': meetup,
-                                                  'user': rsvp.user})
-            send_mail(
-                subject,
-                'Change in Location',
-                FROM_EMAIL,
-                [rsvp.user.user.email],
-                html_message=html_text,
-            )
-
-
-def notify_time(meetup):
-    rsvp_list = Rsvp.objects.filter(meetup=meetup)
+    key = "reminder:{0}:{1}".format(meetup.pk, sent_at.isoformat())
+    return queue_mass_html_mail(subject, 'Reminder Mail', "meetup/reminder.html",
+                                get_rsvp_recipients(meetup, 'reminder'), {'meetup': meetup}, key)
+
+
+def send_due_reminders(now=None):
+    """Send the reminders of the meetups starting within REMINDER_LEAD_TIME seconds. Each
+    meetup is marked in the transaction which queues its reminder, so that it is reminded
+    only once even if sweeps overlap, and again by the next sweep if queueing fails.
+
+    :param now: aware datetime object of the sweep, defaults to the current time
+    :return: list of reminded Meetup objects
+    """
+    now = timezone.localtime(now)
+    window_end = now + datetime.timedelta(seconds=settings.REMINDER_LEAD_TIME)
+    meetups = Meetup.objects.filter(reminder_sent__isnull=True, date__gte=now.date(),
+                                    date__lte=window_end.date())
+    reminded = []
+    for meetup in meetups:
+        start = timezone.make_aware(datetime.datetime.combine(meetup.date, meetup.time))
+        if not now <= start <= window_end:
+            continue
+        with transaction.atomic():
+            if Meetup.objects.filter(pk=meetup.pk, reminder_sent__isnull=True).update(
+                    reminder_sent=now):
+                send_reminder(meetup, now)
+                reminded.append(meetup)
+    return reminded
+
+
+def notify_location(meetup, changed_at):
+    """Queue the notification of a change in the location of a meetup. It is deduplicated by
+    the time of the change, so that moving a meetup back to a former location is notified too.
+
+    :param meetup: Meetup object
+    :param changed_at: aware datetime object of the change
+    :return: integer number of queued emails
+    """
     subject = "Notification for change in location for {0}".format(meetup)
-    for rsvp in rsvp_list:
-        setting = UserSetting.objects.get(user=rsvp.user)
-        if setting.time_change:
-            html_text = render_to_string("meetup/time_change_email.html",
-                                         context={'meetup': meetup,
-                                                  'user': rsvp.user})
-            send_mail(
-                subject,
-                'Time Changed',
-                FROM_EMAIL,
-                [rsvp.user.user.email],
-                html_message=html_text,
-            )
+    key = "location_change:{0}:{1}".format(meetup.pk, changed_at.isoformat())
+    return queue_mass_html_mail(subject, 'Change in Location',
+                                "meetup/location_change_email.html",
+                                get_rsvp_recipients(meetup, 'location_change'), {'meetup': meetup},
+                                key)
+
+
+def notify_time(meetup, changed_at):
+    """Queue the notification of a change in the date or time of a meetup. It is deduplicated
+    by the time of the change, so that moving a meetup back to a former slot is notified too.
+
+    :param meetup: Meetup object
+    :param changed_at: aware datetime object of the change
+    :return: integer number of queued emails
+    """
+    subject = "Notification for change in time for {0}".format(meetup)
+    key = "time_change:{0}:{1}".format(meetup.pk, changed_at.isoformat())
+    return queue_mass_html_mail(subject, 'Time Changed', "meetup/time_change_email.html",
+                                get_rsvp_recipients(meetup, 'time_change'), {'meetup': meetup},
+                                key)
 
 
 def create_meetup(meetup):
-    conn = http.client.HTTPSConnection("api.zoom.us")
-
-    payload = {
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=30),
-        'iss': ZOOM_API_KEY
-    }
-    token = jwt.encode(payload, ZOOM_API_SECRET).decode("utf-8")
-
-    headers = {
-        'authorization': "Bearer " + token,
-        'content-type': "application/json"
-    }
-    start_datetime = datetime.datetime.combine(meetup.date, meetup.time)
-    date_str = start_datetime.strftime('%Y-%m-%dT%H:%M:%S')
-    body = {
-        "topic": meetup.title,
-        "type": 2,
-        "start_time": date_str,
-        "duration": 60,
-        "timezone": "UTC",
-        "agenda": meetup.description,
-    }
-    json_data = json.dumps(body)
-    conn.request("POST", "/v2/users/{0}/meetings".format(ZOOM_USER_ID),
-                 headers=headers, body=json_data)
-
-    res = conn.getresponse()
-    data = res.read()
-    meet_details = json.loads(data.decode("utf-8"))
-    return meet_details
+    """Create the Zoom meeting of a virtual meetup
+
+    :param meetup: Meetup object
+    :return: dict details of the meeting
+    """
+    return get_zoom_client().create_meeting(ZOOM_USER_ID, meetup)
 
 
 def edit_meetup(meetup):
-    conn = http.client.HTTPSConnection("api.zoom.us")
-
-    payload = {
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=30),
-        'iss': ZOOM_API_KEY
-    }
-    token = jwt.encode(payload, ZOOM_API_SECRET).decode("utf-8")
-
-    headers = {
-        'authorization': "Bearer " + token,
-        'content-type': "application/json"
-    }
-    start_datetime = datetime.datetime.combine(meetup.date, meetup.time)
-    date_str = start_datetime.strftime('%Y-%m-%dT%H:%M:%S')
-    body = {
-        "topic": meetup.title,
-        "type": 2,
-        "start_time": date_str,
-        "duration": 60,
-        "timezone": "UTC",
-        "agenda": meetup.description,
-    }
-    json_data = json.dumps(body)
-    conn.request("PATCH", "/v2/meetings/{0}".format(meetup.meeting_id),
-                 headers=headers, body=json_data)
+    """Update the Zoom meeting of a virtual meetup with its current details
+
+    :param meetup: Meetup object with a meeting_id
+    """
+    get_zoom_client().update_meeting(meetup.meeting_id, meetup)
 
 
 def get_meetup(meetup):
-    conn = http.client.HTTPSConnection("api.zoom.us")
-
-    payload = {
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=30),
-        'iss': ZOOM_API_KEY
-    }
-    token = jwt.encode(payload, ZOOM_API_SECRET).decode("utf-8")
-
-    headers = {
-        'authorization': "Bearer " + token,
-        'content-type': "application/json"
-    }
-    conn.request("GET", "/v2/meetings/{0}".format(meetup.meeting_id), headers=headers)
-    res = conn.getresponse()
-    data = res.read()
-    meet_details = json.loads(data.decode("utf-8"))
-    return meet_details
+    """Get the Zoom meeting of a virtual meetup
+
+    :param meetup: Meetup object with a meeting_id
+    :return: dict details of the meeting
+    """
+    return get_zoom_client().get_meeting(meetup.meeting_id)
+
+
+geolocator = Nominatim(user_agent="Anita-B Portal", timeout=6)
+
+
+def get_city_coordinates(location):
+    """Look up the coordinates of a location in the local database of cities
+
+    :param location: string name of a city, optionally followed by its region and country,
+                     e.g. the display name of a City object
+    :return: tuple (latitude, longitude) or None if no such city is known
+    """
+    location = location.strip()
+    cities = list(City.objects.filter(name__iexact=location.split(',')[0].strip(),
+                                      latitude__isnull=False, longitude__isnull=False)
+                  .order_by('-population')[:20])
+    if not cities:
+        return None
+    city = next((city for city in cities if city.display_name.lower() == location.lower()),
+                cities[0])
+    return float(city.latitude), float(city.longitude)
+
+
+def geocode(location):
+    """Resolve a free-text location to coordinates without a network round-trip whenever
+    possible. Known cities are looked up in the local database; anything else goes to the
+    geocoding service, whose answers are cached for GEOCODE_CACHE_TTL seconds.
+
+    :param location: string free-text location
+    :return: tuple (latitude, longitude) or None if the location could not be resolved
+    """
+    if not location or not location.strip():
+        return None
+    coordinates = get_city_coordinates(location)
+    if coordinates is not None:
+        return coordinates
+
+    query = location.strip().lower()[:255]
+    expiry = timezone.now() - datetime.timedelta(seconds=settings.GEOCODE_CACHE_TTL)
+    cached = GeocodedLocation.objects.filter(query=query, date_updated__gte=expiry).first()
+    if cached is not None:
+        return cached.coordinates
+    try:
+        result = geolocator.geocode(location)
+    except GeopyError:
+        return None
+    GeocodedLocation.objects.filter(date_updated__lt=expiry).delete()
+    cached, created = GeocodedLocation.objects.update_or_create(
+        query=query, defaults={'latitude': result.latitude if result else None,
+                               'longitude': result.longitude if result else None})
+    return cached.coordinates
+
+
+_geoip = None
+_geoip_lock = Lock()
+
+
+def get_geoip():
+    """Get the GeoIP2 reader shared by all requests and threads of the process. The database
+    is opened once, memory-mapped, on first use.
+
+    :return: GeoIP2 object
+    """
+    global _geoip
+    if _geoip is None:
+        with _geoip_lock:
+            if _geoip is None:
+                _geoip = GeoIP2(cache=GeoIP2.MODE_MMAP)
+    return _geoip
+
+
+@lru_cache(maxsize=settings.GEOIP_CACHE_SIZE)
+def locate_ip(ip):
+    """Look up the city and coordinates of an IP address in the GeoIP database
+
+    :param ip: string IP address
+    :return: dict with the keys city, latitude and longitude or None if the address is unknown
+        or has no coordinates, e.g. a country-level record
+    """
+    try:
+        city = get_geoip().city(ip)
+    except (AddressNotFoundError, GeoIP2Exception):
+        return None
+    if city['latitude'] is None or city['longitude'] is None:
+        return None
+    return {'city': city['city'], 'latitude': city['latitude'],
+            'longitude': city['longitude']}
+
+
+def get_client_location(request):
+    """Locate the client of a request by its IP address. Clients with a private or unknown
+    address get GEOIP_FALLBACK_LOCATION, so that no lookup of another host is needed.
+
+    :param request: HttpRequest object
+    :return: dict with the keys city, latitude and longitude
+    """
+    client_ip, is_routable = get_client_ip(request)
+    location = locate_ip(client_ip) if is_routable else None
+    return location or settings.GEOIP_FALLBACK_LOCATION
@@ -1,25 +1,22 @@
 import datetime
-import operator
 
-from django.contrib.gis.geoip2 import GeoIP2
-from django.contrib.gis.geos import Point
+from django.conf import settings
 from django.urls import reverse
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
-from django.views.generic import DeleteView, RedirectView
+from django.views.generic import DeleteView, RedirectView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, UpdateView, FormView
 from django.views.generic.list import ListView
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
-from django.http import JsonResponse
+from django.http import HttpResponseRedirect, JsonResponse
 from braces.views import FormValidMessageMixin, FormInvalidMessageMixin
-from geopy import Nominatim
-from ipware import get_client_ip
 
-from .compare import compare
+from .compare import meetup_index
 from .forms import (AddMeetupForm, EditMeetupForm, AddMeetupCommentForm,
                     EditMeetupCommentForm, RsvpForm, AddSupportRequestForm,
                     EditSupportRequestForm, AddSupportRequestCommentForm,
@@ -28,13 +25,15 @@ from .forms import (AddMeetupForm, EditMeetupForm, AddMeetupCommentForm,
 from .models import (Meetup, Rsvp, SupportRequest,
                      RequestMeetup, MeetupImages)
 from .constants import (OK, SLUG_ALREADY_EXISTS, SLUG_ALREADY_EXISTS_MSG,
-                        ERROR_MSG, SUCCESS_MEETUP_MSG)
-from users.models import SystersUser
+                        ERROR_MSG, SUCCESS_MEETUP_MSG, RSVP_FULL, RSVP_FULL_MSG,
+                        RSVP_WAITLISTED_MSG)
+from common.middleware import get_cached_object_or_404
 from common.models import Comment
 from rest_framework.views import APIView
 from cities_light.models import City
 
-from .utils import create_meetup
+from .tasks import provision_meeting_on_commit
+from .utils import geocode, get_client_location
 
 
 class RequestMeetupView(LoginRequiredMixin, CreateView):
@@ -130,25 +129,18 @@ class ApproveRequestMeetupView(LoginRequiredMixin, PermissionRequiredMixin, Redi
         if not meetup_request.is_virtual:
             new_meetup.venue = meetup_request.venue
             new_meetup.meetup_location = meetup_request.meetup_location
-        if meetup_request.is_virtual:
-            try:
-                meet_data = create_meetup(new_meetup)
-                new_meetup.meet_link = meet_data['join_url']
-                new_meetup.is_virtual = meetup_request.is_virtual
-                new_meetup.meeting_id = meet_data['id']
-                new_meetup.start_url = meet_data['start_url']
-            except KeyError as e:
-                print(e)
+        new_meetup.is_virtual = meetup_request.is_virtual
         new_meetup.leader = meetup_request.created_by
         meetup_request.is_approved = True
-        meetup_request.approved_by = get_object_or_404(
-            SystersUser, user=self.request.user)
+        meetup_request.approved_by = self.request.systers_user
         meetup_request.save()
         self.slug_meetup_request = meetup_request.slug
         status, message, level = self.process_request()
         messages.add_message(self.request, level, message)
         if status == OK:
             new_meetup.save()
+            if new_meetup.is_virtual:
+                provision_meeting_on_commit(new_meetup)
             return reverse('view_meetup', kwargs={'slug': new_meetup.slug})
         else:
             return reverse('new_meetup_requests')
@@ -206,17 +198,26 @@ class AllUpcomingMeetupsView(ListView):
         meetup_list = Meetup.objects.filter(
             date__gte=datetime.date.today()).order_by('date', 'time')
         context = super(AllUpcomingMeetupsView, self).get_context_data(**kwargs)
-        context['cities_list'] = City.objects.all()
         context['meetup_list'] = meetup_list
-        g = GeoIP2()
-        client_ip, is_routable = get_client_ip(self.request)
-        if is_routable:
-            context['current_city'] = g.city(client_ip)['city']
-        else:
-            context['current_city'] = g.city("google.com")['city']
+        context['current_city'] = get_client_location(self.request)['city']
         return context
 
 
+class CityLookupView(View):
+    """Look up the cities whose name starts with a query, for the location typeahead"""
+    min_length = 2
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('query', '').split(',')[0].strip()
+        cities = list()
+        if len(query) >= self.min_length:
+            cities = City.objects.filter(name__istartswith=query).order_by(
+                F('population').desc(nulls_last=True), 'name').values(
+                'id', 'display_name')[:settings.CITY_LOOKUP_LIMIT]
+        return JsonResponse({'cities': [{'id': city['id'], 'name': city['display_name']}
+                                        for city in cities]})
+
+
 class MeetupView(DetailView):
     """View details of a meetup, including date, time, venue, description, number of users who
     rsvp'd and comments."""
@@ -231,29 +232,26 @@ class MeetupView(DetailView):
             content_type=ContentType.objects.get(app_label='meetup', model='meetup'),
             object_id=self.object.id,
             is_approved=True).order_by('date_created')
-        coming_list = Rsvp.objects.filter(meetup=self.object, coming=True)
-        plus_one_list = Rsvp.objects.filter(meetup=self.object, plus_one=True)
-        context['coming_no'] = len(coming_list) + len(plus_one_list)
+        context['coming_no'] = self.object.coming_count + self.object.plus_one_count
         context['share_message'] = self.object.title + " @systers_org "
         context['images'] = MeetupImages.objects.filter(meetup=self.object)
-        meetups =\
-            Meetup.objects.filter(~Q(slug=self.object.slug)).filter(date__gte=datetime.date.today())
-        compare_scores = []
-        if meetups:
-            for meetup in meetups:
-                val = compare(self.object.description, meetup.description)
-                compare_scores.append({'id': meetup.id, 'score': val})
-            compare_scores.sort(key=operator.itemgetter('score'), reverse=True)
-            suggested_meetups = []
-            for item in compare_scores[0:3]:
-                obj = Meetup.objects.get(id=item['id'])
-                suggested_meetups.append(obj)
-            context['suggested_meetups'] = suggested_meetups
-        else:
-            context['suggested_meetups'] = []
+        suggested_ids = meetup_index.top_k(self.object, k=3)
+        suggested_meetups = Meetup.objects.in_bulk(suggested_ids)
+        context['suggested_meetups'] = [suggested_meetups[pk] for pk in suggested_ids
+                                        if pk in suggested_meetups]
         return context
 
 
+class MeetingStatusView(View):
+    """Report whether the Zoom meeting of a virtual meetup is set up, for the meetup page to poll
+    while it is being provisioned"""
+
+    def get(self, request, *args, **kwargs):
+        meetup = get_cached_object_or_404(self.request, Meetup,
+                                          slug=self.kwargs['slug'], is_virtual=True)
+        return JsonResponse({'status': meetup.meeting_status, 'meet_link': meetup.meet_link})
+
+
 class AddMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequiredMixin,
                     PermissionRequiredMixin, CreateView):
     """Add new meetup"""
@@ -315,12 +313,15 @@ class EditMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         """Redirect to meetup view page in case of successful submit"""
         return reverse("view_meetup", kwargs={"slug": self.object.slug})
 
+    def get_object(self, queryset=None):
+        """Get the meetup through the objects already fetched during the request"""
+        return get_cached_object_or_404(self.request, Meetup, slug=self.kwargs['meetup_slug'])
+
     def get_context_data(self, **kwargs):
         """Add Meetup and MeetupLocation objects to the context"""
         context = super(EditMeetupView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        context['meetup'] = self.meetup
-        context['meetup_location'] = self.meetup.meetup_location
+        context['meetup'] = self.object
+        context['meetup_location'] = self.object.meetup_location
         return context
 
     def check_permissions(self, request):
@@ -373,7 +374,8 @@ class AddMeetupCommentView(FormValidMessageMixin, FormInvalidMessageMixin, Login
         """Add meetup object and request user to the form kwargs. Used to autofill form fields with
         content_object and author without explicitly filling them up in the form."""
         kwargs = super(AddMeetupCommentView, self).get_form_kwargs()
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         kwargs.update({'content_object': self.meetup})
         kwargs.update({'author': self.request.user})
         return kwargs
@@ -403,13 +405,14 @@ class EditMeetupCommentView(FormValidMessageMixin, FormInvalidMessageMixin, Logi
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(EditMeetupCommentView, self).get_context_data(**kwargs)
-        context['meetup'] = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        context['meetup'] = get_cached_object_or_404(self.request, Meetup,
+                                                     slug=self.kwargs['meetup_slug'])
         return context
 
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a meetup comment."""
         self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        systersuser = request.systers_user
         return systersuser == self.comment.author
 
 
@@ -427,13 +430,14 @@ class DeleteMeetupCommentView(LoginRequiredMixin, PermissionRequiredMixin, Delet
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(DeleteMeetupCommentView, self).get_context_data(**kwargs)
-        context['meetup'] = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        context['meetup'] = get_cached_object_or_404(self.request, Meetup,
+                                                     slug=self.kwargs['meetup_slug'])
         return context
 
     def check_permissions(self, request):
         """Check if the request user has the permission to delete a meetup comment."""
         self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        systersuser = request.systers_user
         return systersuser == self.comment.author
 
 
@@ -455,7 +459,8 @@ class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         """Add request user and meetup object to the form kwargs. Used to autofill form fields
         with user and meetup without explicitly filling them up in the form."""
         kwargs = super(RsvpMeetupView, self).get_form_kwargs()
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         kwargs.update({'user': self.request.user})
         kwargs.update({'meetup': self.meetup})
         currState = Rsvp.objects.filter(user__user=self.request.user, meetup=self.meetup)
@@ -463,6 +468,22 @@ class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
             kwargs.update({'instance': currState.first()})
         return kwargs
 
+    def form_valid(self, form):
+        """Save the RSVP against the capacity of the meetup. A plus one is refused to an
+        admitted user if no seat is left for it."""
+        self.object = form.save()
+        if form.status == RSVP_FULL:
+            form.add_error('plus_one', RSVP_FULL_MSG)
+            return self.form_invalid(form)
+        messages.add_message(self.request, messages.SUCCESS, self.get_form_valid_message())
+        return HttpResponseRedirect(self.get_success_url())
+
+    def get_form_valid_message(self):
+        """Tell the user if the RSVP was put on the waitlist"""
+        if self.object.waitlisted:
+            return RSVP_WAITLISTED_MSG
+        return super(RsvpMeetupView, self).get_form_valid_message()
+
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(RsvpMeetupView, self).get_context_data(**kwargs)
@@ -477,9 +498,11 @@ class RsvpGoingView(LoginRequiredMixin, ListView):
     paginated_by = 30
 
     def get_queryset(self, **kwargs):
-        """Set ListView queryset to all rsvps whose 'coming' attribute is set to True"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        rsvp_list = Rsvp.objects.filter(meetup=self.meetup, coming=True)
+        """Set ListView queryset to all admitted rsvps whose 'coming' attribute is set to
+        True"""
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
+        rsvp_list = Rsvp.objects.filter(meetup=self.meetup, coming=True, waitlisted=False)
         return rsvp_list
 
     def get_context_data(self, **kwargs):
@@ -508,7 +531,8 @@ class AddSupportRequestView(FormValidMessageMixin, FormInvalidMessageMixin,
         """Add request user and meetup object to the form kwargs. Used to autofill form fields
         with volunteer and meetup without explicitly filling them up in the form."""
         kwargs = super(AddSupportRequestView, self).get_form_kwargs()
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         kwargs.update({'volunteer': self.request.user})
         kwargs.update({'meetup': self.meetup})
         return kwargs
@@ -538,14 +562,15 @@ class EditSupportRequestView(FormValidMessageMixin, FormInvalidMessageMixin,
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(EditSupportRequestView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         context['meetup'] = self.meetup
         return context
 
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a Support Request for a meetup.
         The permission holds true for superusers."""
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        systersuser = request.systers_user
         self.suppportrequest = get_object_or_404(SupportRequest, pk=self.kwargs["pk"])
         return systersuser == self.suppportrequest.volunteer
 
@@ -564,7 +589,7 @@ class DeleteSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin, Dele
     def check_permissions(self, request):
         """Check if the request user has the permission to delete a Support Request for a meetup.
         The permission holds true for superusers."""
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        systersuser = request.systers_user
         self.suppportrequest = get_object_or_404(SupportRequest, pk=self.kwargs["pk"])
         return systersuser == self.suppportrequest.volunteer
 
@@ -577,7 +602,8 @@ class SupportRequestView(DetailView):
     def get_context_data(self, **kwargs):
         """Add Meetup object, SupportRequest object and approved comments to the context"""
         context = super(SupportRequestView, self).get_context_data(**kwargs)
-        context['meetup'] = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        context['meetup'] = get_cached_object_or_404(self.request, Meetup,
+                                                     slug=self.kwargs['meetup_slug'])
         context['support_request'] = self.object
         context['comments'] = Comment.objects.filter(
             content_type=ContentType.objects.get(app_label='meetup', model='supportrequest'),
@@ -594,7 +620,8 @@ class SupportRequestsListView(ListView):
 
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all approved support requests of the meetup"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         supportrequest_list = SupportRequest.objects.filter(meetup=self.meetup, is_approved=True)
         return supportrequest_list
 
@@ -613,7 +640,7 @@ class UnapprovedSupportRequestsListView(LoginRequiredMixin, PermissionRequiredMi
 
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all unapproved support requests of the meetup"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup, slug=self.kwargs['slug'])
         supportrequest_list = SupportRequest.objects.filter(
             meetup=self.meetup, is_approved=False)
         return supportrequest_list
@@ -639,7 +666,8 @@ class ApproveSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin,
     def get_redirect_url(self, *args, **kwargs):
         """Approve the support request, send the user a notification and redirect to the unapproved
         support requests' page"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         support_request.is_approved = True
         support_request.save()
@@ -658,7 +686,8 @@ class RejectSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin, Redi
 
     def get_redirect_url(self, *args, **kwargs):
         """Delete the support request and redirect to the unapproved support requests' page"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         support_request.delete()
         return reverse('unapproved_support_requests', kwargs={'slug': self.meetup.slug})
@@ -688,7 +717,8 @@ class AddSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMixi
         """Add support request object and request user to the form kwargs. Used to autofill form
         fields with content_object and author without explicitly filling them up in the form."""
         kwargs = super(AddSupportRequestCommentView, self).get_form_kwargs()
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         kwargs.update({'content_object': self.support_request})
         kwargs.update({'author': self.request.user})
@@ -716,7 +746,8 @@ class EditSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMix
 
     def get_success_url(self):
         """Redirect to the support request view page in case of successful submission"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         return reverse("view_support_request", kwargs={"meetup_slug": self.meetup.slug,
                                                        "pk": self.support_request.pk})
@@ -724,7 +755,8 @@ class EditSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMix
     def get_context_data(self, **kwargs):
         """Add Meetup and SupportRequest objects to the context"""
         context = super(EditSupportRequestCommentView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         context['meetup'] = self.meetup
         context['support_request'] = self.support_request
@@ -733,7 +765,7 @@ class EditSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMix
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a comment to a Support Request"""
         self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        systersuser = request.systers_user
         return systersuser == self.comment.author
 
 
@@ -747,7 +779,8 @@ class DeleteSupportRequestCommentView(LoginRequiredMixin, PermissionRequiredMixi
 
     def get_success_url(self):
         """Redirect to the support request view page in case of successful submission"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         return reverse("view_support_request", kwargs={"meetup_slug": self.meetup.slug,
                                                        "pk": self.support_request.pk})
@@ -755,7 +788,8 @@ class DeleteSupportRequestCommentView(LoginRequiredMixin, PermissionRequiredMixi
     def get_context_data(self, **kwargs):
         """Add Meetup and SupportRequest objects to the context"""
         context = super(DeleteSupportRequestCommentView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
         context['meetup'] = self.meetup
         context['support_request'] = self.support_request
@@ -764,7 +798,7 @@ class DeleteSupportRequestCommentView(LoginRequiredMixin, PermissionRequiredMixi
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a Support Request for a meetup"""
         self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        systersuser = request.systers_user
         return systersuser == self.comment.author
 
 
@@ -806,47 +840,52 @@ class UpcomingMeetupsSearchView(ListView):
     """Search Upcoming Meetups By  Keyword and Filter Date and Distance"""
     template_name = "meetup/list_meetup.html"
     model = Meetup
+    paginate_by = 30
 
     @csrf_exempt
     def post(self, request):
         if request.method == 'POST':
             keyword = request.POST.get('keyword')
             location = request.POST.get('location')
-            searched_meetups = Meetup.objects.filter(Q(date__gte=datetime.date.today()),
-                                                     Q(title__icontains=keyword))
+            searched_meetups = Meetup.objects.upcoming().filter(
+                title__icontains=keyword,
+                meetup_location__isnull=False).select_related('meetup_location')
+            if location is None or location == "Current Location":
+                client_location = get_client_location(request)
+                user_coordinates = (client_location['latitude'], client_location['longitude'])
+            else:
+                user_coordinates = geocode(location)
+            if user_coordinates is not None:
+                searched_meetups = searched_meetups.within(*user_coordinates,
+                                                           radius=self.get_radius())
+            else:
+                searched_meetups = searched_meetups.order_by('date', 'time')
+
+            paginator = Paginator(searched_meetups, self.paginate_by)
+            page = paginator.get_page(request.POST.get('page'))
             results = list()
-            unit = ''
-            for meetup in searched_meetups:
-                if meetup.meetup_location:
-                    distance = ''
-                    geolocator = Nominatim(user_agent="Anita-B Portal", timeout=6)
-                    g = GeoIP2()
-                    if location == "Current Location":
-                        client_ip, is_routable = get_client_ip(request)
-                        if is_routable:
-                            lat, long = g.lat_lon(client_ip)
-                        else:
-                            lat, long = g.lat_lon("google.com")
-                        user_point = Point(float(long),
-                                           float(lat))
-                    else:
-                        user_loc = geolocator.geocode(location)
-                        user_point = Point(float(user_loc.raw['lon']), float(user_loc.raw['lat']))
-                    meetup_loc = geolocator.geocode(meetup.meetup_location)
-                    meetup_point = Point(float(meetup_loc.raw['lon']),
-                                         float(meetup_loc.raw['lat']))
-                    distance = int(user_point.distance(meetup_point)) * 100
-                    unit = 'kilometers from your location'
-
-                    results.append({'date': meetup.date,
-                                    'meetup': meetup.title,
-                                    'distance': distance,
-                                    'location': meetup.meetup_location.name,
-                                    'meetup_slug': meetup.slug})
-
-            results.sort(key=operator.itemgetter('date'))
-            results.sort(key=operator.itemgetter('distance'))
-            return JsonResponse({'search_results': results, 'unit': unit}, safe=False)
+            for meetup in page:
+                distance = getattr(meetup, 'distance', None)
+                results.append({'date': meetup.date,
+                                'meetup': meetup.title,
+                                'distance': round(distance) if distance is not None else '',
+                                'location': meetup.meetup_location.name,
+                                'meetup_slug': meetup.slug})
+            unit = 'kilometers from your location' \
+                if results and user_coordinates is not None else ''
+            return JsonResponse({'search_results': results, 'unit': unit,
+                                 'page': page.number, 'num_pages': paginator.num_pages},
+                                safe=False)
+
+    def get_radius(self):
+        """Get the maximum distance of the searched meetups in kilometres
+
+        :return: float radius or None if no valid radius was submitted
+        """
+        try:
+            return float(self.request.POST['radius'])
+        except (KeyError, ValueError):
+            return None
 
 
 class AddResourceView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequiredMixin,
@@ -867,7 +906,8 @@ class AddResourceView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequi
     def get_context_data(self, **kwargs):
         """Add Meetup and MeetupLocation objects to the context"""
         context = super(AddResourceView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = get_cached_object_or_404(self.request, Meetup,
+                                               slug=self.kwargs['meetup_slug'])
         context['meetup'] = self.meetup
         context['meetup_location'] = self.meetup.meetup_location
         return context
@@ -0,0 +1,302 @@
+import datetime
+import http.client
+import json
+import queue
+import random
+import select
+import threading
+import time
+from urllib.parse import urlsplit
+
+import jwt
+from django.conf import settings
+
+# Methods which can be sent again without side effects if the response was lost
+IDEMPOTENT_METHODS = frozenset(['GET', 'PATCH', 'PUT', 'DELETE'])
+# Errors of a pooled connection which the server closed while it was idle. Raised while the
+# request is written, the server did not get it whole; raised while the response is read, e.g.
+# as http.client.RemoteDisconnected, the server may have read and processed it.
+STALE_CONNECTION_ERRORS = (BrokenPipeError, ConnectionResetError)
+
+
+class ZoomError(Exception):
+    """Error returned by the Zoom API or raised while talking to it"""
+
+    def __init__(self, message, status=None):
+        super(ZoomError, self).__init__(message)
+        self.status = status
+
+
+class ZoomUnavailable(ZoomError):
+    """Zoom failed too often recently, so requests are not even attempted"""
+
+
+class CircuitBreaker:
+    """Stop calling a service after threshold consecutive failures. After timeout seconds a
+    single trial call is let through; if it succeeds the circuit closes again."""
+
+    def __init__(self, threshold, timeout):
+        self.threshold = threshold
+        self.timeout = timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Check whether a call may be attempted
+
+        :return: True if the circuit is closed or a trial call is due
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.timeout:
+                # Let one trial call through and keep the others out until it returns
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class ZoomClient:
+    """Client of the Zoom REST API. It keeps a pool of keep-alive connections and reuses its
+    JWT until shortly before it expires, so that it can be shared by all threads. Requests
+    time out, transient failures are retried with jittered exponential backoff and a circuit
+    breaker stops calling Zoom while it keeps failing."""
+
+    def __init__(self, url, api_key, api_secret, pool_size=4, connect_timeout=3,
+                 read_timeout=10, retries=2, backoff=0.5, token_lifetime=3600,
+                 breaker_threshold=5, breaker_timeout=30):
+        url = urlsplit(url)
+        self.connection_class = (http.client.HTTPSConnection if url.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.host = url.hostname
+        self.port = url.port
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.token_lifetime = token_lifetime
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_timeout)
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+        self.token = None
+        self.token_expires = 0
+        self.token_lock = threading.Lock()
+
+    def get_token(self):
+        """Get a JWT for the API key, minting a new one when the cached one is about to expire
+
+        :return: string JWT
+        """
+        with self.token_lock:
+            if time.time() > self.token_expires - min(60, self.token_lifetime / 10):
+                expires = datetime.datetime.utcnow() + datetime.timedelta(
+                    seconds=self.token_lifetime)
+                token = jwt.encode({'exp': expires, 'iss': self.api_key}, self.api_secret)
+                self.token = token.decode('utf-8') if isinstance(token, bytes) else token
+                self.token_expires = time.time() + self.token_lifetime
+            return self.token
+
+    def get_connection(self, pooled=True):
+        """Get a pooled connection or open a new one. Pooled connections which the server
+        closed while they were idle are dropped.
+
+        :param pooled: bool whether a pooled connection may be used
+        :return: tuple of the connection and whether it was pooled
+        """
+        while pooled:
+            try:
+                connection = self.pool.get_nowait()
+            except queue.Empty:
+                break
+            if not is_dropped(connection):
+                return connection, True
+            connection.close()
+        connection = self.connection_class(self.host, self.port, timeout=self.connect_timeout)
+        connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        return connection, False
+
+    def release_connection(self, connection):
+        try:
+            self.pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        """Close the pooled connections"""
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def send(self, connection, pooled, method, path, body):
+        """Send a single request over a connection, which is returned to the pool afterwards.
+        If the server closed a pooled connection before the request was written, the request
+        is sent once more over a new connection. If it closed the connection before answering,
+        it may have processed the request, which is then only sent again if it is idempotent.
+
+        :param connection: connection from get_connection()
+        :param pooled: bool whether the connection was pooled
+        :return: tuple of the integer status and the decoded JSON response or None
+        :raises OSError, http.client.HTTPException: if the request failed
+        """
+        headers = {
+            'authorization': "Bearer " + self.get_token(),
+            'content-type': "application/json",
+        }
+        written = False
+        try:
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                written = True
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not pooled or (written and method not in IDEMPOTENT_METHODS):
+                    raise
+                connection.close()
+                connection, pooled = self.get_connection(pooled=False)
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self.release_connection(connection)
+        return response.status, json.loads(data.decode('utf-8')) if data else None
+
+    def request(self, method, path, data=None):
+        """Call the API. Connection errors, timeouts, 429 and 5xx responses are retried up to
+        retries times; a POST which reached Zoom is not, so that it is never applied twice.
+
+        :param method: string HTTP method
+        :param path: string path of the endpoint
+        :param data: dict JSON body of the request
+        :return: decoded JSON response or None if the response has no body
+        :raises ZoomUnavailable: if the circuit breaker is open
+        :raises ZoomError: if the request failed
+        """
+        body = json.dumps(data) if data is not None else None
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise ZoomUnavailable("Zoom is unavailable")
+            retry = attempt < self.retries
+            try:
+                connection, pooled = self.get_connection()
+            except OSError as connect_error:
+                # Nothing was sent, so any request can be tried again
+                error = ZoomError(repr(connect_error))
+            else:
+                try:
+                    status, response = self.send(connection, pooled, method, path, body)
+                except (OSError, http.client.HTTPException) as request_error:
+                    error = ZoomError(repr(request_error))
+                    retry = retry and method in IDEMPOTENT_METHODS
+                else:
+                    if status < 500 and status != 429:
+                        # Zoom answered, even if it rejected the request
+                        self.breaker.record_success()
+                        if status >= 400:
+                            raise get_error(status, response)
+                        return response
+                    error = get_error(status, response)
+                    # Zoom may have created the meeting before failing with a 5xx
+                    retry = retry and (method in IDEMPOTENT_METHODS or status in (429, 503))
+            self.breaker.record_failure()
+            if not retry:
+                raise error
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def create_meeting(self, user_id, meetup):
+        return self.request('POST', "/v2/users/{0}/meetings".format(user_id),
+                            get_meeting_data(meetup))
+
+    def update_meeting(self, meeting_id, meetup):
+        return self.request('PATCH', "/v2/meetings/{0}".format(meeting_id),
+                            get_meeting_data(meetup))
+
+    def get_meeting(self, meeting_id):
+        return self.request('GET', "/v2/meetings/{0}".format(meeting_id))
+
+
+def is_dropped(connection):
+    """Check whether the server closed an idle connection. An idle connection has nothing to
+    read, unless the server closed it or sent something unexpected, and it can't be reused in
+    either case.
+
+    :param connection: http.client.HTTPConnection object
+    :return: True if the connection can't be reused
+    """
+    if connection.sock is None:
+        return True
+    try:
+        return bool(select.select([connection.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def get_error(status, response):
+    """Get the error of a failed API response
+
+    :param status: integer HTTP status
+    :param response: decoded JSON response
+    :return: ZoomError object
+    """
+    message = response.get('message') if isinstance(response, dict) else None
+    return ZoomError(message or "Zoom returned {0}".format(status), status)
+
+
+def get_meeting_data(meetup):
+    """Get the Zoom meeting settings of a meetup
+
+    :param meetup: Meetup object
+    :return: dict JSON body of the meeting
+    """
+    start_datetime = datetime.datetime.combine(meetup.date, meetup.time)
+    return {
+        "topic": meetup.title,
+        "type": 2,
+        "start_time": start_datetime.strftime('%Y-%m-%dT%H:%M:%S'),
+        "duration": 60,
+        "timezone": "UTC",
+        "agenda": meetup.description,
+    }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_zoom_client():
+    """Get the Zoom client shared by all requests and threads of the process
+
+    :return: ZoomClient object
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ZoomClient(
+                    settings.ZOOM_API_URL, settings.ZOOM_API_KEY, settings.ZOOM_API_SECRET,
+                    pool_size=settings.ZOOM_POOL_SIZE,
+                    connect_timeout=settings.ZOOM_CONNECT_TIMEOUT,
+                    read_timeout=settings.ZOOM_READ_TIMEOUT, retries=settings.ZOOM_RETRIES,
+                    breaker_threshold=settings.ZOOM_BREAKER_THRESHOLD,
+                    breaker_timeout=settings.ZOOM_BREAKER_TIMEOUT)
+    return _client
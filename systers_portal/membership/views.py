@@ -10,6 +10,8 @@ from community.models import Community
 from membership.constants import *  # NOQA
 from membership.forms import TransferOwnershipForm
 from membership.models import JoinRequest
+from common.middleware import get_cached_object_or_404
+from common.permissions import has_perm
 from users.models import SystersUser
 
 
@@ -35,9 +37,8 @@ class CommunityJoinRequestListView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve join
         requests. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("approve_community_joinrequest",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "approve_community_joinrequest", self.community)
 
 
 class ApproveCommunityJoinRequestView(LoginRequiredMixin,
@@ -81,9 +82,8 @@ class ApproveCommunityJoinRequestView(LoginRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve join
         requests. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("approve_community_joinrequest",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "approve_community_joinrequest", self.community)
 
 
 class RejectCommunityJoinRequestView(LoginRequiredMixin,
@@ -125,9 +125,8 @@ class RejectCommunityJoinRequestView(LoginRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve/reject join
         requests. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm("approve_community_joinrequest",
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, "approve_community_joinrequest", self.community)
 
 
 class RequestJoinCommunityView(LoginRequiredMixin, SingleObjectMixin,
@@ -146,7 +145,7 @@ class RequestJoinCommunityView(LoginRequiredMixin, SingleObjectMixin,
     def get(self, request, *args, **kwargs):
         """Attempt to create a join request and add a message about the result.
         """
-        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        systers_user = self.request.systers_user
         community = self.get_object()
         join_request, status = JoinRequest.objects.create_join_request(
             systers_user, community)
@@ -181,7 +180,7 @@ class CancelCommunityJoinRequestView(LoginRequiredMixin, SingleObjectMixin,
 
     def get(self, request, *args, **kwargs):
         """Attempt to cancel user join request towards a community"""
-        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        systers_user = self.request.systers_user
         community = self.get_object()
         status = JoinRequest.objects.cancel_join_request(systers_user,
                                                          community)
@@ -215,7 +214,7 @@ class LeaveCommunityView(LoginRequiredMixin, SingleObjectMixin, RedirectView):
 
     def get(self, request, *args, **kwargs):
         """Attempt to leave a community"""
-        systers_user = get_object_or_404(SystersUser, user=self.request.user)
+        systers_user = self.request.systers_user
         community = self.get_object()
         status = systers_user.leave_community(community)
         if status == OK:
@@ -277,7 +276,7 @@ class TransferOwnershipView(LoginRequiredMixin, PermissionRequiredMixin,
         """Check if the request user is the community admin. Only the admin
         has the permission to transfer community ownership to another member
         of the community."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
         return request.user == self.community.admin.user
 
 
@@ -328,6 +327,5 @@ class RemoveCommunityMemberView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permission to remove systers users
         from a community. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
-        return request.user.has_perm('delete_community_systersuser',
-                                     self.community)
+        self.community = get_cached_object_or_404(self.request, Community, slug=self.kwargs['slug'])
+        return has_perm(request, 'delete_community_systersuser', self.community)
@@ -0,0 +1,14 @@
+// Reloading the meetup page once its Zoom meeting has been set up
+let meeting_status_delay = 2000;
+function poll_meeting_status() {
+	let status_url = $("#meeting-status").data("status-url");
+	$.getJSON(status_url, function(response) {
+		if (response.status !== "provisioning") {
+			window.location.reload();
+			return;
+		}
+		meeting_status_delay = Math.min(meeting_status_delay * 2, 30000);
+		setTimeout(poll_meeting_status, meeting_status_delay);
+	});
+}
+setTimeout(poll_meeting_status, meeting_status_delay);
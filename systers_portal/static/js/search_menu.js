@@ -15,11 +15,29 @@ function getCookie(name) {
             return cookieValue;
         }
 
+// Suggesting cities matching the typed location
+let city_lookup_timeout = false;
+$("#location").on("input", function() {
+	let query = $(this).val();
+	let lookup_url = $(this).data("lookup-url");
+	if (city_lookup_timeout) {
+		clearTimeout(city_lookup_timeout);
+	}
+	city_lookup_timeout = setTimeout(function() {
+		$.getJSON(lookup_url, {"query": query}, function(response) {
+			$("#cities").empty();
+			for (let city of response.cities) {
+				$("#cities").append($("<option>").attr("value", city.name));
+			}
+		});
+	}, 300);
+});
+
 // Getting data from the search bars
 $("#go-btn").click(function() {
 
 	let Keyword = document.getElementById("keyword-input").value;
-	let Location = document.getElementById("location").options[document.getElementById("location").selectedIndex].text;
+	let Location = document.getElementById("location").value.trim() || "Current Location";
 	let csrftoken = getCookie("csrftoken");
 	let Data = {
 	  "csrfmiddlewaretoken": csrftoken,
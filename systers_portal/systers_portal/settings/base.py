@@ -16,6 +16,28 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 ZOOM_API_KEY = config('ZOOM_API_KEY')
 ZOOM_API_SECRET = config('ZOOM_API_SECRET')
 ZOOM_USER_ID = config('ZOOM_USER_ID')
+# Zoom API client: requests time out after the connect and read timeouts in seconds and
+# failures are retried ZOOM_RETRIES times. After ZOOM_BREAKER_THRESHOLD consecutive failures
+# Zoom is not called for ZOOM_BREAKER_TIMEOUT seconds.
+ZOOM_API_URL = config('ZOOM_API_URL', default='https://api.zoom.us')
+ZOOM_POOL_SIZE = 4
+ZOOM_CONNECT_TIMEOUT = 3
+ZOOM_READ_TIMEOUT = 10
+ZOOM_RETRIES = 2
+ZOOM_BREAKER_THRESHOLD = 5
+ZOOM_BREAKER_TIMEOUT = 30
+# Zoom meetings of virtual meetups are created in the background after the meetup is saved.
+# A failed attempt is retried after ZOOM_PROVISION_RETRY_DELAY seconds, doubling each time,
+# until ZOOM_PROVISION_ATTEMPTS attempts were made. The meeting is then marked as failed and
+# tried again every ZOOM_PROVISION_FAILED_RETRY_DELAY seconds until the meetup starts. A sweep
+# running every ZOOM_PROVISION_SWEEP_INTERVAL seconds picks up the attempts which are due, e.g.
+# because the process which queued them stopped. An attempt holds the meeting for
+# ZOOM_PROVISION_CLAIM_TIMEOUT seconds, so that it is never provisioned twice at once.
+ZOOM_PROVISION_ATTEMPTS = 5
+ZOOM_PROVISION_RETRY_DELAY = 30
+ZOOM_PROVISION_FAILED_RETRY_DELAY = 60 * 60
+ZOOM_PROVISION_SWEEP_INTERVAL = 60
+ZOOM_PROVISION_CLAIM_TIMEOUT = 5 * 60
 GOOGLE_MAPS_API_KEY = config('GOOGLE_MAPS_API_KEY')
 
 # Quick-start development settings - unsuitable for production
@@ -62,19 +84,42 @@ INSTALLED_APPS = (
     'django_apscheduler',
 )
 
-# SCHEDULER_CONFIG = {
-#     "apscheduler.jobstores.default": {
-#         "class": "django_apscheduler.jobstores:DjangoJobStore"
-#     },
-#     'apscheduler.executors.processpool': {
-#         "type": "threadpool"
-#     },
-# }
+# Scheduled jobs are stored in the database and run by a single process, the one holding the
+# scheduler lease. The lease lasts SCHEDULER_LEASE_DURATION seconds; if its owner stops renewing
+# it, another process takes over and runs the jobs missed in the meantime.
+SCHEDULER_CONFIG = {
+    "apscheduler.jobstores.default": {
+        "class": "django_apscheduler.jobstores:DjangoJobStore"
+    },
+    "apscheduler.job_defaults.coalesce": True,
+    "apscheduler.job_defaults.misfire_grace_time": 60 * 60,
+}
+SCHEDULER_LEASE_DURATION = 60
+
+# Meetup reminders are sent REMINDER_LEAD_TIME seconds before the start of a meetup, by a job
+# looking for due reminders every REMINDER_SWEEP_INTERVAL seconds
+REMINDER_LEAD_TIME = 60 * 60
+REMINDER_SWEEP_INTERVAL = 5 * 60
+
+# The cache is shared by all processes through the database, so that the versions which the
+# community and meetup signals move on reach every worker; it can be pointed to memcached
+# instead. The community list of the navigation bar is cached for at most
+# COMMUNITY_NAV_CACHE_TIMEOUT seconds and dropped whenever a community is saved or deleted.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'common_cache',
+    }
+}
+COMMUNITY_NAV_CACHE_TIMEOUT = 5 * 60
+
 MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.SystersUserMiddleware',
+    'common.middleware.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -94,6 +139,7 @@ TEMPLATES = [
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
+                'common.context_processors.permissions_processor',
                 'community.context_processors.communities_processor',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
@@ -179,3 +225,41 @@ ANONYMOUS_USER_ID = None
 CRISPY_TEMPLATE_PACK = 'bootstrap3'
 
 GEOIP_PATH = os.path.join(BASE_DIR, "GeoLite2-City_20200616/GeoLite2-City.mmdb")
+
+# Number of IP addresses whose GeoIP location is cached per process, and the location used for
+# clients whose address is private or not in the GeoIP database
+GEOIP_CACHE_SIZE = 4096
+GEOIP_FALLBACK_LOCATION = {
+    'city': 'Mountain View',
+    'latitude': 37.386,
+    'longitude': -122.0838,
+}
+
+# Notification emails are queued in the outbox in batches of EMAIL_BATCH_SIZE and sent by the
+# send_outbox command, at most EMAIL_OUTBOX_RATE per second (0 for no limit). An email that
+# fails is retried after EMAIL_OUTBOX_RETRY_DELAY seconds, doubling the delay every time, until
+# it has been tried EMAIL_OUTBOX_MAX_ATTEMPTS times. Sent and failed emails are deleted after
+# EMAIL_OUTBOX_RETENTION seconds, which has to outlast the weekly digest they deduplicate.
+EMAIL_BATCH_SIZE = 100
+EMAIL_OUTBOX_RATE = 10
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_MAX_ATTEMPTS = 10
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 5 * 60
+EMAIL_OUTBOX_POLL_INTERVAL = 10
+EMAIL_OUTBOX_RETENTION = 60 * 60 * 24 * 30
+
+# Maximum number of cities returned by the location typeahead of the meetup search
+CITY_LOOKUP_LIMIT = 10
+
+# Number of seconds the coordinates of free-text locations returned by the geocoding service
+# are cached for
+GEOCODE_CACHE_TTL = 60 * 60 * 24 * 30
+
+# Similarity of meetup descriptions. The backend builds the gensim index used to compare
+# texts; the default one keeps the index in memory and only shards it to a private
+# temporary directory when it has more documents than SIMILARITY_MAX_IN_MEMORY_DOCUMENTS.
+SIMILARITY_BACKEND = 'meetup.similarity.default_similarity_backend'
+SIMILARITY_MAX_IN_MEMORY_DOCUMENTS = 10000
+# The suggested meetups index of a process syncs with the database when a meetup is saved or
+# deleted, and at least every SIMILARITY_SYNC_INTERVAL seconds
+SIMILARITY_SYNC_INTERVAL = 60
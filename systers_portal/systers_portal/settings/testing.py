@@ -17,6 +17,13 @@ DATABASES = {
 
 INTERNAL_IPS = ('127.0.0.1',)
 
+# The tests run in a single process, which needs no shared cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 ROOT_URLCONF = 'systers_portal.systers_portal.urls'
 
 TEST_RUNNER = 'django_nose.NoseTestSuiteRunner'
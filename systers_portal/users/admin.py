@@ -1,6 +1,7 @@
 from django.contrib import admin
-from users.models import SystersUser, UserSetting
+from users.models import SystersUser, UserSetting, WeeklyDigestRun
 
 
 admin.site.register(SystersUser)
 admin.site.register(UserSetting)
+admin.site.register(WeeklyDigestRun)
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.template.loader import get_template
+from django.utils import timezone
+
+from common.models import OutgoingEmail
+from community.models import Community
+from meetup.utils import build_html_mail, chunked
+from users.models import SystersUser, WeeklyDigestRun
+
+
+def get_week(date=None):
+    """Get the first day of the week of a date
+
+    :param date: date object, defaults to today
+    :return: date object of the Monday of the week
+    """
+    date = date or timezone.now().date()
+    return date - timedelta(days=date.weekday())
+
+
+def get_digest_subject(communities):
+    """Get the subject of the weekly digest of a user
+
+    :param communities: list of Community objects the user is a member of
+    :return: string subject
+    """
+    if len(communities) == 1:
+        return "Weekly update from {0}".format(communities[0])
+    return "Weekly update from your communities"
+
+
+def send_weekly_digest(week=None):
+    """Queue for every user who did not opt out one weekly digest about all their communities.
+    Members are streamed in chunks of EMAIL_BATCH_SIZE. Each chunk is queued in the outbox
+    together with the progress of the run, so that running it again for the same week continues
+    where an interrupted run stopped.
+
+    :param week: date object of the first day of the week, defaults to the current week
+    :return: number of emails queued by this call
+    """
+    run, created = WeeklyDigestRun.objects.get_or_create(week=week or get_week())
+    if run.completed:
+        return 0
+    communities = {community.pk: community for community in
+                   Community.objects.annotate(member_count=Count('members'))}
+    membership_model = Community.members.through
+    template = get_template("community/weekly_digest_email.html")
+    recipients = SystersUser.objects.filter(
+        pk__gt=run.last_user_id, communities__isnull=False, usersetting__weekly_digest=True
+    ).select_related('user').distinct().order_by('pk')
+    queued = 0
+    for batch in chunked(recipients.iterator(chunk_size=settings.EMAIL_BATCH_SIZE),
+                         settings.EMAIL_BATCH_SIZE):
+        memberships = defaultdict(list)
+        for user_id, community_id in membership_model.objects.filter(
+                systersuser__in=batch).values_list('systersuser_id', 'community_id'):
+            if community_id in communities:
+                memberships[user_id].append(communities[community_id])
+        messages, keys = [], []
+        for recipient in batch:
+            user_communities = sorted(memberships[recipient.pk], key=lambda c: c.name)
+            if recipient.user.email and user_communities:
+                messages.append(build_html_mail(get_digest_subject(user_communities),
+                                                'Weekly Digest', template, recipient,
+                                                {'communities': user_communities}))
+                keys.append("weekly_digest:{0}:{1}".format(run.week, recipient.pk))
+        with transaction.atomic():
+            OutgoingEmail.objects.enqueue(messages, keys)
+            run.last_user_id = batch[-1].pk
+            run.sent += len(messages)
+            run.save(update_fields=['last_user_id', 'sent', 'date_updated'])
+        queued += len(messages)
+    run.completed = True
+    run.save(update_fields=['completed', 'date_updated'])
+    return queued
@@ -70,7 +70,7 @@ class EditUserSettings(ModelFormWithHelper):
     def save(self, commit=True):
         """Override save to add user field to the instance"""
         instance = super(EditUserSettings, self).save(commit=False)
-        instance.user = SystersUser.objects.get(user=self.user)
+        instance.user = self.user.systersuser
         if commit:
             instance.save()
         return instance
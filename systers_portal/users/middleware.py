@@ -0,0 +1,31 @@
+from django.utils.functional import SimpleLazyObject
+
+from users.models import SystersUser
+
+
+def get_systers_user(request):
+    """Get the SystersUser of the request user. It is cached on the user object, so it is
+    fetched at most once per request.
+
+    :param request: HttpRequest object
+    :return: SystersUser object or None for anonymous users
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.systersuser
+    except SystersUser.DoesNotExist:
+        return None
+
+
+class SystersUserMiddleware:
+    """Set request.systers_user to the SystersUser of the request user, loaded on first access.
+    It has to come after the AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.systers_user = SimpleLazyObject(lambda: get_systers_user(request))
+        return self.get_response(request)
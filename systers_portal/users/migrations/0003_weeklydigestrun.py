@@ -0,0 +1,24 @@
+# Generated by Django 3.0.9 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_auto_20200825_1932'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyDigestRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(unique=True, verbose_name='Week')),
+                ('last_user_id', models.PositiveIntegerField(default=0, verbose_name='Last emailed user')),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='Sent emails')),
+                ('completed', models.BooleanField(default=False, verbose_name='Completed')),
+                ('date_updated', models.DateTimeField(auto_now=True, verbose_name='Date updated')),
+            ],
+        ),
+    ]
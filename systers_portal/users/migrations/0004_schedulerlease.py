@@ -0,0 +1,22 @@
+# Generated by Django 3.0.9 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_weeklydigestrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Name')),
+                ('owner', models.CharField(blank=True, max_length=255, verbose_name='Owner')),
+                ('expires', models.DateTimeField(verbose_name='Expires')),
+            ],
+        ),
+    ]
@@ -40,23 +40,49 @@ class SystersUser(models.Model):
 
         :param group: Group object
         """
-        group.user_set.add(self.user)
+        self.update_groups(join=[group])
 
     def leave_group(self, group):
         """Remove user from group members
 
         :param group: Group object
         """
-        group.user_set.remove(self.user)
+        self.update_groups(leave=[group])
 
-    def leave_groups(self, community_name):
+    def leave_groups(self, community):
         """Leave all groups that are related to a community.
 
-        :param community: string name of Community
+        :param community: Community object
+        """
+        self.update_groups(leave=get_groups(community))
+
+    def get_group_ids(self, groups=None):
+        """Get the ids of the groups of which the user is a member in a single query
+
+        :param groups: QuerySet or list of Group objects to limit the lookup to
+        :return: set of integer Group ids
         """
-        groups = get_groups(community_name)
-        for group in groups:
-            self.leave_group(group)
+        memberships = User.groups.through.objects.filter(user_id=self.user_id)
+        if groups is not None:
+            memberships = memberships.filter(group__in=groups)
+        return set(memberships.values_list('group_id', flat=True))
+
+    def update_groups(self, join=(), leave=()):
+        """Join and leave groups with at most one query each. Joining a group
+        of which the user is already a member is a no-op.
+
+        :param join: iterable of Group objects or ids to join
+        :param leave: QuerySet or iterable of Group objects or ids to leave
+        """
+        Membership = User.groups.through
+        if isinstance(leave, models.QuerySet) or leave:
+            Membership.objects.filter(user_id=self.user_id,
+                                      group__in=leave).delete()
+        group_ids = {getattr(group, 'pk', group) for group in join}
+        if group_ids:
+            Membership.objects.bulk_create(
+                [Membership(user_id=self.user_id, group_id=group_id)
+                 for group_id in group_ids], ignore_conflicts=True)
 
     def get_fields(self):
         """Get model fields of a SystersUser object
@@ -88,11 +114,9 @@ class SystersUser(models.Model):
         :param groups: list of Group objects
         :return: list of filtered Group object of which the user is a member
         """
-        member_groups = []
-        for group in groups:
-            if self.is_group_member(group.name):
-                member_groups.append(group)
-        return member_groups
+        groups = list(groups)
+        group_ids = self.get_group_ids(groups)
+        return [group for group in groups if group.pk in group_ids]
 
     def get_last_join_request(self, community):
         """Get the last join request made by the user to a community
@@ -158,7 +182,7 @@ class SystersUser(models.Model):
             return NOT_MEMBER
         if self == community.admin:
             return IS_ADMIN
-        self.leave_groups(community.name)
+        self.leave_groups(community)
         community.remove_member(self)
         community.save()
         return OK
@@ -209,3 +233,27 @@ class UserSetting(models.Model):
 
     def __str__(self):
         return "Settings for {0}".format(self.user)
+
+
+class WeeklyDigestRun(models.Model):
+    """Progress of sending the weekly digest of a week. Users are emailed in order of their
+    primary key, so that an interrupted run can continue after the last user it reached."""
+    week = models.DateField(unique=True, verbose_name="Week")
+    last_user_id = models.PositiveIntegerField(default=0, verbose_name="Last emailed user")
+    sent = models.PositiveIntegerField(default=0, verbose_name="Sent emails")
+    completed = models.BooleanField(default=False, verbose_name="Completed")
+    date_updated = models.DateTimeField(auto_now=True, verbose_name="Date updated")
+
+    def __str__(self):
+        return "Weekly digest of {0}".format(self.week)
+
+
+class SchedulerLease(models.Model):
+    """Lease of the process that runs the scheduled jobs. The owner renews it while it is
+    alive; once it expires another process may take it over."""
+    name = models.CharField(max_length=100, unique=True, verbose_name="Name")
+    owner = models.CharField(max_length=255, blank=True, verbose_name="Owner")
+    expires = models.DateTimeField(verbose_name="Expires")
+
+    def __str__(self):
+        return "{0} lease of {1}".format(self.name, self.owner)
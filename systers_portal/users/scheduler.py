@@ -1,53 +1,121 @@
-import datetime
+import atexit
 import logging
+import os
+import socket
+import uuid
 from datetime import timedelta
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django_apscheduler.jobstores import register_events, register_job
+from apscheduler.schedulers.base import STATE_PAUSED
+from django_apscheduler.jobstores import register_job
 
 from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.db.models import Q
+from django.utils import timezone
 
-from meetup.utils import send_reminder
-from meetup.models import Meetup
+from common.models import OutgoingEmail
+from common.permissions import prune_object_permissions
+from meetup.tasks import provision_due_meetings
+from meetup.utils import send_due_reminders
 
-from community.models import Community
+from users.digest import get_week, send_weekly_digest
+from users.models import SchedulerLease, WeeklyDigestRun
 
-from systers_portal.settings.dev import FROM_EMAIL
+# Every process adds jobs to the shared job store, but only the process holding the scheduler
+# lease runs them. The others keep their scheduler paused and campaign for the lease.
+scheduler = BackgroundScheduler(settings.SCHEDULER_CONFIG)
+election = BackgroundScheduler()
 
-scheduler = BackgroundScheduler()
+LEASE_NAME = 'scheduler'
+PROCESS_ID = '{0}:{1}:{2}'.format(socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])
 
 
 @register_job(scheduler, 'cron', day_of_week='mon', hour=5, minute=30, replace_existing=True)
 def weekly_digest():
-    communities = Community.objects.all()
-    for community in communities:
-        subject = "Weekly update from {0}".format(community)
-        count = community.members.count()
-        for member in community.members:
-            html_text = \
-                render_to_string("community/weekly_digest_email.html",
-                                 {'user': member,
-                                  'count': count,
-                                  'community': community})
-            send_mail(
-                subject,
-                'Weekly Digest',
-                FROM_EMAIL,
-                [member.user.email],
-                html_message=html_text,
-            )
+    send_weekly_digest()
+
+
+@register_job(scheduler, 'interval', seconds=settings.REMINDER_SWEEP_INTERVAL,
+              replace_existing=True)
+def meetup_reminders():
+    send_due_reminders()
+
+
+@register_job(scheduler, 'interval', seconds=settings.ZOOM_PROVISION_SWEEP_INTERVAL,
+              replace_existing=True)
+def meeting_provisioning():
+    provision_due_meetings()
+
+
+@register_job(scheduler, 'cron', hour=4, minute=0, replace_existing=True)
+def object_permissions_cleanup():
+    prune_object_permissions()
+
+
+@register_job(scheduler, 'cron', hour=4, minute=30, replace_existing=True)
+def outbox_cleanup():
+    OutgoingEmail.objects.prune()
+
+
+def acquire_lease(owner=PROCESS_ID):
+    """Take or renew the scheduler lease for SCHEDULER_LEASE_DURATION seconds. The lease is
+    only taken over from another process once it has expired.
+
+    :param owner: string identifier of the process
+    :return: True if the process holds the lease
+    """
+    now = timezone.now()
+    try:
+        # A new lease starts out expired, so that the first process to claim it takes it
+        SchedulerLease.objects.get_or_create(
+            name=LEASE_NAME, defaults={'owner': '', 'expires': now - timedelta(seconds=1)})
+    except IntegrityError:
+        pass
+    expires = now + timedelta(seconds=settings.SCHEDULER_LEASE_DURATION)
+    return SchedulerLease.objects.filter(
+        Q(owner=owner) | Q(expires__lte=now), name=LEASE_NAME
+    ).update(owner=owner, expires=expires) == 1
+
+
+def release_lease(owner=PROCESS_ID):
+    """Give up the scheduler lease, so that another process can take it over right away
+
+    :param owner: string identifier of the process
+    """
+    SchedulerLease.objects.filter(name=LEASE_NAME, owner=owner).update(expires=timezone.now())
+
+
+def campaign():
+    """Run the scheduled jobs in this process while it holds the lease and stay idle
+    otherwise. The leader also picks up jobs that other processes added to the job store."""
+    try:
+        if acquire_lease():
+            if scheduler.state == STATE_PAUSED:
+                scheduler.resume()
+            else:
+                scheduler.wakeup()
+        elif scheduler.state != STATE_PAUSED:
+            scheduler.pause()
+    finally:
+        close_old_connections()
+
+
+def stop():
+    election.shutdown(wait=False)
+    scheduler.shutdown(wait=False)
+    release_lease()
 
 
 def start():
     if settings.DEBUG:
         logging.basicConfig()
         logging.getLogger('apscheduler').setLevel(logging.DEBUG)
-    register_events(scheduler)
-    scheduler.start()
-    meetup_list = Meetup.objects.filter(date__gte=datetime.date.today())
-    for meetup in meetup_list:
-        name = "Reminder for {0}".format(meetup.title)
-        scheduler.add_job(send_reminder, "date", run_date=meetup.date - timedelta(hours=1),
-                          args=[meetup], id=name, replace_existing=True)
+    scheduler.start(paused=True)
+    election.add_job(campaign, 'interval', seconds=settings.SCHEDULER_LEASE_DURATION / 3,
+                     next_run_time=timezone.now(), max_instances=1, coalesce=True)
+    election.start()
+    atexit.register(stop)
+    if WeeklyDigestRun.objects.filter(week=get_week(), completed=False).exists():
+        # Continue the digest of this week if the process stopped while sending it
+        scheduler.add_job(weekly_digest, id="Resume weekly digest", replace_existing=True)
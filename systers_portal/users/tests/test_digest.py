@@ -0,0 +1,78 @@
+from unittest import mock
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from common.mail import drain_outbox
+from common.models import OutgoingEmail
+from community.models import Community
+from users.digest import get_week, send_weekly_digest
+from users.models import SystersUser, UserSetting, WeeklyDigestRun
+
+
+@override_settings(EMAIL_BATCH_SIZE=2)
+class WeeklyDigestTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        self.systers_users = []
+        for i in range(5):
+            user = User.objects.create_user(username='foo{0}'.format(i), password='foobar',
+                                            email='foo{0}@test.com'.format(i))
+            self.systers_users.append(SystersUser.objects.get(user=user))
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  location=location,
+                                                  admin=self.systers_users[0])
+        self.other_community = Community.objects.create(name="Bar", slug="bar", order=2,
+                                                        location=location,
+                                                        admin=self.systers_users[0])
+        self.community.members.add(*self.systers_users[:4])
+        self.other_community.members.add(self.systers_users[0])
+        UserSetting.objects.filter(user=self.systers_users[3]).update(weekly_digest=False)
+
+    def test_send_weekly_digest(self):
+        """Test that members get one digest about all their communities unless they opted out"""
+        self.assertEqual(send_weekly_digest(), 3)
+        drain_outbox(rate=0)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox),
+                         ['foo0@test.com', 'foo1@test.com', 'foo2@test.com'])
+        emails = {email.to[0]: email for email in mail.outbox}
+        self.assertEqual(emails['foo0@test.com'].subject, "Weekly update from your communities")
+        self.assertIn("Bar, Foo", emails['foo0@test.com'].alternatives[0][0])
+        self.assertEqual(emails['foo1@test.com'].subject, "Weekly update from Foo")
+        self.assertIn("Foo has 4 members", emails['foo1@test.com'].alternatives[0][0])
+
+        run = WeeklyDigestRun.objects.get(week=get_week())
+        self.assertTrue(run.completed)
+        self.assertEqual(run.sent, 3)
+        self.assertEqual(send_weekly_digest(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_resume_weekly_digest(self):
+        """Test that an interrupted digest continues after the last emailed user"""
+        enqueue = OutgoingEmail.objects.enqueue
+        calls = []
+
+        def failing_enqueue(messages, keys=None):
+            calls.append(len(messages))
+            if len(calls) > 1:
+                raise RuntimeError()
+            return enqueue(messages, keys)
+
+        with mock.patch.object(OutgoingEmail.objects, 'enqueue', failing_enqueue):
+            with self.assertRaises(RuntimeError):
+                send_weekly_digest()
+        run = WeeklyDigestRun.objects.get(week=get_week())
+        self.assertFalse(run.completed)
+        self.assertEqual(run.last_user_id, self.systers_users[1].pk)
+
+        self.assertEqual(send_weekly_digest(), 1)
+        drain_outbox(rate=0)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox),
+                         ['foo0@test.com', 'foo1@test.com', 'foo2@test.com'])
+
+        next_week = get_week() + timezone.timedelta(days=7)
+        self.assertEqual(send_weekly_digest(next_week), 3)
@@ -39,26 +39,35 @@ class SystersUserTestCase(TestCase):
         self.systers_user.leave_group(group)
         self.assertSequenceEqual(self.systers_user.user.groups.all(), [])
 
+    def create_community(self, name, order):
+        user = User.objects.create_user(username=name, password='foobar')
+        country, created = Country.objects.get_or_create(name='Bar', continent='AS')
+        location, created = City.objects.get_or_create(name='Foo', display_name='Foo',
+                                                       country=country)
+        community = Community.objects.create(name=name, slug=name.lower(),
+                                             order=order, location=location,
+                                             admin=SystersUser.objects.get(user=user))
+        create_groups(community, groups_templates)
+        return community
+
     def test_leave_groups(self):
         """Test SystersUser leaving all Community groups"""
-        name = "Baz"
-        self.systers_user.leave_groups(name)
+        community = self.create_community("Baz", 1)
+        self.systers_user.leave_groups(community)
         self.assertSequenceEqual(self.systers_user.user.groups.all(), [])
-        create_groups(name, groups_templates)
         content_manager_group = Group.objects.get(name="Baz: Content Manager")
         self.systers_user.join_group(content_manager_group)
         self.assertSequenceEqual(self.systers_user.user.groups.all(),
                                  [content_manager_group])
-        self.systers_user.leave_groups(name)
+        self.systers_user.leave_groups(community)
         self.assertSequenceEqual(self.systers_user.user.groups.all(), [])
-        other_name = "Foo"
-        create_groups(other_name, groups_templates)
+        self.create_community("Foo", 2)
         admin_group = Group.objects.get(name="Foo: Community Admin")
         self.systers_user.join_group(admin_group)
         self.systers_user.join_group(content_manager_group)
         self.assertCountEqual(list(self.systers_user.user.groups.all()),
                               [content_manager_group, admin_group])
-        self.systers_user.leave_groups(name)
+        self.systers_user.leave_groups(community)
         self.assertSequenceEqual(self.systers_user.user.groups.all(),
                                  [admin_group])
 
@@ -86,7 +95,7 @@ class SystersUserTestCase(TestCase):
 
     def test_get_member_groups(self):
         """Test getting groups of which the user is a member"""
-        groups = create_groups("Bar", groups_templates)
+        groups = list(create_groups(self.create_community("Bar", 1), groups_templates).values())
         self.assertEqual(self.systers_user.get_member_groups(groups), [])
         first_group = groups[0]
         self.systers_user.join_group(first_group)
@@ -101,6 +110,25 @@ class SystersUserTestCase(TestCase):
         self.assertCountEqual(self.systers_user.get_member_groups(groups),
                               [first_group, last_group])
 
+    def test_update_groups(self):
+        """Test joining and leaving several groups with one query each"""
+        groups = [Group.objects.create(name=name) for name in ("Foo", "Bar", "Baz")]
+        with self.assertNumQueries(1):
+            self.systers_user.update_groups(join=groups[:2])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.systers_user.get_group_ids(),
+                             {groups[0].pk, groups[1].pk})
+        with self.assertNumQueries(2):
+            self.systers_user.update_groups(join=[groups[1].pk, groups[2]],
+                                            leave=[groups[0]])
+        self.assertCountEqual(self.systers_user.user.groups.all(), groups[1:])
+        with self.assertNumQueries(1):
+            self.systers_user.update_groups(
+                leave=Group.objects.filter(name__in=["Foo", "Bar"]))
+        self.assertEqual(self.systers_user.get_group_ids(groups), {groups[2].pk})
+        with self.assertNumQueries(0):
+            self.systers_user.update_groups()
+
     def test_get_last_join_request(self):
         """Test fetching last join request made to a community"""
         country = Country.objects.create(name='Bar', continent='AS')
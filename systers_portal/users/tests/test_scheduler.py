@@ -0,0 +1,29 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import SchedulerLease
+from users.scheduler import acquire_lease, release_lease
+
+
+class SchedulerLeaseTestCase(TestCase):
+    def test_acquire_lease(self):
+        """Test that only one process at a time holds the scheduler lease"""
+        self.assertTrue(acquire_lease('foo'))
+        self.assertTrue(acquire_lease('foo'))
+        self.assertFalse(acquire_lease('bar'))
+        self.assertEqual(SchedulerLease.objects.get().owner, 'foo')
+
+    def test_expired_lease(self):
+        """Test that another process takes over a lease which was not renewed"""
+        self.assertTrue(acquire_lease('foo'))
+        SchedulerLease.objects.update(expires=timezone.now() - timezone.timedelta(seconds=1))
+        self.assertTrue(acquire_lease('bar'))
+        self.assertFalse(acquire_lease('foo'))
+
+    def test_release_lease(self):
+        """Test that a released lease can be taken over right away"""
+        self.assertTrue(acquire_lease('foo'))
+        release_lease('bar')
+        self.assertFalse(acquire_lease('bar'))
+        release_lease('foo')
+        self.assertTrue(acquire_lease('bar'))
@@ -5,6 +5,7 @@ from django.views.generic import TemplateView
 from django.views.generic.edit import UpdateView
 from braces.views import LoginRequiredMixin, MultiplePermissionsRequiredMixin
 
+from common.permissions import has_perm_on_any
 from membership.models import JoinRequest
 from users.forms import UserForm, EditUserSettings
 from users.models import SystersUser, UserSetting
@@ -80,15 +81,11 @@ class UserProfileView(LoginRequiredMixin, MultiplePermissionsRequiredMixin,
         * has the permission to change a community systersuser, if systersuser
           is member of any of those communities
         """
-        permissions = []
-        communities = self.systersuser.communities.all()
-        for community in communities:
-            permissions.extend([
-                request.user.has_perm("change_community_systersuser",
-                                      community)])
-        permissions.extend([request.user.is_superuser])
-        permissions.extend([request.user == self.user])
-        return any(permissions)
+        if request.user.is_superuser or request.user == self.user:
+            return True
+        communities = list(self.systersuser.communities.all())
+        return has_perm_on_any(request, "change_community_systersuser",
+                               communities)
 
 
 class EditSettings(LoginRequiredMixin, UpdateView):
@@ -115,7 +112,7 @@ class EditSettings(LoginRequiredMixin, UpdateView):
         return kwargs
 
     def get_object(self):
-        systersuser = SystersUser.objects.get(user=self.request.user)
+        systersuser = self.request.systers_user
         return UserSetting.objects.get(user=systersuser)
 
 
@@ -124,7 +121,7 @@ class UserPinsListView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(UserPinsListView, self).get_context_data(**kwargs)
-        user = SystersUser.objects.get(user=self.request.user)
+        user = self.request.systers_user
         user_pins = UserPins.objects.filter(user=user)
         if user_pins:
             context['pins'] = user_pins.first().pins.all()